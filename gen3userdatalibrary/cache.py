@@ -0,0 +1,518 @@
+"""
+Caches of serialized list responses (GET /lists and GET /lists/{id}).
+
+Each worker has an in-process LRU cache, and optionally a second tier in a sqlite file shared
+by all the workers on a host (e.g. under /dev/shm), so a list fetched by one worker is a hit
+for the others too and the hot lists aren't held once per worker.
+
+Entries are tagged with the ids of the lists and the creator they were built from, and are
+dropped when a write to any of them commits: locally right after the commit (see
+`get_data_access_layer`) and in every other worker and pod through the list events
+LISTEN/NOTIFY channel (see `gen3userdatalibrary.events`). Without a live LISTEN connection
+invalidations could be missed, so the caches are bypassed until one is (re)established.
+
+Reads take a token from `ListCache.begin_read` before going to the database, and their
+responses are only cached if nothing they were built from was invalidated meanwhile (by any
+worker, for the shared tier), so a response read before a write committed can't be cached
+after the write's invalidation.
+"""
+
+import json
+import os
+import sqlite3
+from collections import OrderedDict, defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from gen3userdatalibrary import config
+from gen3userdatalibrary.config import logging
+
+# rough per-entry bookkeeping cost (key, tags, index) counted towards the byte limit
+ENTRY_OVERHEAD_BYTES = 256
+
+# tag invalidated by clearing a whole cache
+ALL_TAGS = "*"
+
+
+def list_cache_is_configured() -> bool:
+    """
+    Returns:
+        True if either list cache tier is enabled
+    """
+    return config.LIST_CACHE_MAX_BYTES > 0 or bool(config.LIST_CACHE_SHARED_PATH)
+
+
+class CachedResponse:
+    """
+    A cached response body with its ETag
+    """
+
+    def __init__(self, body: bytes, etag: str, tags: Iterable[str]):
+        self.body = body
+        self.etag = etag
+        self.tags = tuple(tags)
+        self.size = len(body) + ENTRY_OVERHEAD_BYTES
+
+
+class SharedListCache:
+    """
+    Approximately LRU cache of response bodies, bounded by their total size in bytes, in a
+    sqlite file that every worker on the host opens.
+
+    Invalidated tags are logged (the last `invalidation_log_size` of them), and a response is
+    only cached if none of its tags were invalidated since its read began. Lookups and puts
+    give up instead of waiting on another worker's lock for long, invalidations wait longer
+    since skipping one would leave stale entries.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        read_timeout: float = 0.05,
+        invalidate_timeout: float = 2,
+        invalidation_log_size: int = 10000,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.read_timeout = read_timeout
+        self.invalidate_timeout = invalidate_timeout
+        self.invalidation_log_size = invalidation_log_size
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Returns:
+            this process's connection to the cache file, opened (and the file set up) on
+            first use, since connections can't be shared with forked workers
+        """
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.invalidate_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        # the contents can always be rebuilt from the database, so durability isn't needed
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                used INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+            CREATE TABLE IF NOT EXISTS entry_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            );
+            CREATE INDEX IF NOT EXISTS entry_tags_key ON entry_tags (key);
+            CREATE TABLE IF NOT EXISTS invalidations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tag TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS invalidations_tag ON invalidations (tag, id);
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO counters VALUES ('size', 0), ('clock', 0);
+            """)
+        self._connection, self._pid = connection, os.getpid()
+        return connection
+
+    def _set_timeout(self, connection: sqlite3.Connection, timeout: float):
+        connection.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+
+    def begin_read(self) -> Optional[int]:
+        """
+        Returns:
+            the id of the last invalidation, to pass to `put`, or None if the cache is busy
+        """
+        connection = self._connect()
+        self._set_timeout(connection, self.read_timeout)
+        try:
+            return connection.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM invalidations"
+            ).fetchone()[0]
+        except sqlite3.OperationalError:
+            return None
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """
+        Args:
+            key: key the response was cached under
+
+        Returns:
+            the cached response, or None if there isn't one or the cache is busy
+        """
+        connection = self._connect()
+        self._set_timeout(connection, self.read_timeout)
+        cache_key = json.dumps(key, default=str)
+        try:
+            row = connection.execute(
+                "SELECT body, etag FROM entries WHERE key = ?", (cache_key,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        if row is None:
+            return None
+        try:
+            connection.execute(
+                "UPDATE entries SET used = "
+                "(SELECT value FROM counters WHERE name = 'clock') WHERE key = ?",
+                (cache_key,),
+            )
+        except sqlite3.OperationalError:
+            # another worker is writing, the entry just isn't marked as recently used
+            pass
+        return CachedResponse(row[0], row[1], ())
+
+    def put(
+        self, key: Hashable, entry: CachedResponse, read_token: Optional[int]
+    ) -> int:
+        """
+        Cache a response, evicting the least recently used ones to make room
+
+        Args:
+            key: key to cache the response under
+            entry: the response
+            read_token: `begin_read` from before the response was read from the database
+
+        Returns:
+            the number of entries evicted
+        """
+        if read_token is None or entry.size > self.max_bytes:
+            return 0
+        connection = self._connect()
+        self._set_timeout(connection, self.read_timeout)
+        cache_key = json.dumps(key, default=str)
+        tags = [*entry.tags, ALL_TAGS]
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            return 0
+        try:
+            oldest_logged = connection.execute(
+                "SELECT MIN(id) FROM invalidations"
+            ).fetchone()[0]
+            tag_params = ",".join("?" * len(tags))
+            invalidated = connection.execute(
+                f"SELECT 1 FROM invalidations WHERE id > ? AND tag IN ({tag_params}) "
+                "LIMIT 1",
+                (read_token, *tags),
+            ).fetchone()
+            # if invalidations after the read began were pruned, they can't be checked
+            if invalidated or (oldest_logged or 0) > read_token + 1:
+                return 0
+            self._remove(connection, [cache_key])
+            clock = self._tick(connection)
+            connection.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                (cache_key, entry.body, entry.etag, entry.size, clock),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO entry_tags VALUES (?, ?)",
+                [(tag, cache_key) for tag in entry.tags],
+            )
+            self._add_size(connection, entry.size)
+            return self._evict(connection)
+        finally:
+            connection.execute("COMMIT")
+
+    def invalidate(self, tags: Iterable[str]):
+        """
+        Drop the responses built from any of the tags
+
+        Args:
+            tags: creator and/or list ids that changed, or `ALL_TAGS` to drop everything
+        """
+        tags = list(tags)
+        connection = self._connect()
+        self._set_timeout(connection, self.invalidate_timeout)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            logging.warning("Shared list cache is locked, couldn't invalidate it")
+            return
+        try:
+            connection.executemany(
+                "INSERT INTO invalidations (tag) VALUES (?)", [(tag,) for tag in tags]
+            )
+            connection.execute(
+                "DELETE FROM invalidations WHERE id <= "
+                "(SELECT MAX(id) FROM invalidations) - ?",
+                (self.invalidation_log_size,),
+            )
+            if ALL_TAGS in tags:
+                connection.execute("DELETE FROM entries")
+                connection.execute("DELETE FROM entry_tags")
+                connection.execute("UPDATE counters SET value = 0 WHERE name = 'size'")
+                return
+            tag_params = ",".join("?" * len(tags))
+            keys = [
+                row[0]
+                for row in connection.execute(
+                    f"SELECT DISTINCT key FROM entry_tags WHERE tag IN ({tag_params})",
+                    tags,
+                )
+            ]
+            self._remove(connection, keys)
+        finally:
+            connection.execute("COMMIT")
+
+    def clear(self):
+        """
+        Drop every entry
+        """
+        self.invalidate([ALL_TAGS])
+
+    def close(self):
+        """
+        Close this process's connection to the cache file
+        """
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def _remove(self, connection: sqlite3.Connection, keys: List[str]):
+        """
+        Drop entries, inside a write transaction
+        """
+        for key in keys:
+            row = connection.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                continue
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute("DELETE FROM entry_tags WHERE key = ?", (key,))
+            self._add_size(connection, -row[0])
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        """
+        Drop the least recently used entries until the cache fits, inside a write transaction
+
+        Returns:
+            the number of entries dropped
+        """
+        size = connection.execute(
+            "SELECT value FROM counters WHERE name = 'size'"
+        ).fetchone()[0]
+        if size <= self.max_bytes:
+            return 0
+        to_remove = []
+        for key, entry_size in connection.execute(
+            "SELECT key, size FROM entries ORDER BY used"
+        ):
+            to_remove.append(key)
+            size -= entry_size
+            if size <= self.max_bytes:
+                break
+        self._remove(connection, to_remove)
+        return len(to_remove)
+
+    @staticmethod
+    def _tick(connection: sqlite3.Connection) -> int:
+        connection.execute("UPDATE counters SET value = value + 1 WHERE name = 'clock'")
+        return connection.execute(
+            "SELECT value FROM counters WHERE name = 'clock'"
+        ).fetchone()[0]
+
+    @staticmethod
+    def _add_size(connection: sqlite3.Connection, size: int):
+        connection.execute(
+            "UPDATE counters SET value = value + ? WHERE name = 'size'", (size,)
+        )
+
+
+class ListCache:
+    """
+    LRU cache of response bodies bounded by their total size in bytes, in front of an
+    optional `SharedListCache`
+    """
+
+    def __init__(self, max_bytes: int, shared: Optional[SharedListCache] = None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.size = 0
+        self.generation = 0
+        self.broker = None
+        self.metrics = None
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[Hashable]] = defaultdict(set)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Returns:
+            True if the cache can be used, i.e. it has room and is told about every write
+        """
+        return (
+            (self.max_bytes > 0 or self.shared is not None)
+            and self.broker is not None
+            and self.broker.is_listening
+        )
+
+    def attach(self, broker, metrics=None):
+        """
+        Start caching, invalidating entries as the broker hears about writes. The shared
+        tier is emptied first, since writes made while no worker was listening were missed.
+
+        Args:
+            broker (ListEventBroker): this worker's list events broker
+            metrics (Metrics): where to count hits, misses and evictions
+        """
+        self.broker = broker
+        self.metrics = metrics
+        broker.add_change_listener(self.invalidate)
+        if self.shared is not None:
+            self.shared.clear()
+
+    def detach(self):
+        """
+        Stop caching and drop every entry in this worker
+        """
+        self.broker = None
+        self._clear_local()
+        if self.shared is not None:
+            self.shared.close()
+
+    def begin_read(self) -> Tuple[int, Optional[int]]:
+        """
+        Returns:
+            a token to pass to `put` for a response about to be read from the database
+        """
+        shared_token = None
+        if self.shared is not None and self.enabled:
+            shared_token = self.shared.begin_read()
+        return self.generation, shared_token
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """
+        Args:
+            key: key the response was cached under
+
+        Returns:
+            the cached response, or None if there isn't one (or the cache is disabled)
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._count("hit", "local")
+            return entry
+        if self.shared is not None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                self._count("hit", "shared")
+                return entry
+        self._count("miss", "shared" if self.shared is not None else "local")
+        return None
+
+    def put(
+        self,
+        key: Hashable,
+        body: bytes,
+        etag: str,
+        tags: Iterable[str],
+        read_token: Tuple[int, Optional[int]],
+    ):
+        """
+        Cache a response, evicting the least recently used ones to make room
+
+        Args:
+            key: key to cache the response under
+            body: the serialized response
+            etag: the response's ETag
+            tags: creator and/or list ids the response was built from
+            read_token: `begin_read` from before the response was read from the database
+        """
+        generation, shared_token = read_token
+        if not self.enabled or generation != self.generation:
+            return
+        entry = CachedResponse(body, etag, (str(tag) for tag in tags))
+        if self.shared is not None:
+            for _ in range(self.shared.put(key, entry, shared_token)):
+                self._count("eviction", "shared")
+        if entry.size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self.size += entry.size
+        for tag in entry.tags:
+            self._keys_by_tag[tag].add(key)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._count("eviction", "local")
+
+    def invalidate(self, creator_id: Optional[str], list_ids: Optional[Iterable]):
+        """
+        Drop the responses built from a creator's library or any of the given lists
+
+        Args:
+            creator_id: user whose lists changed, None if unknown
+            list_ids: ids of the lists that changed, None if unknown
+        """
+        if creator_id is None or list_ids is None:
+            self.clear()
+            return
+        self.generation += 1
+        tags = [creator_id, *(str(list_id) for list_id in list_ids)]
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._remove(key)
+        if self.shared is not None:
+            self.shared.invalidate(tags)
+
+    def clear(self):
+        """
+        Drop every entry, in the shared tier too
+        """
+        self._clear_local()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def _clear_local(self):
+        self.generation += 1
+        self._entries.clear()
+        self._keys_by_tag.clear()
+        self.size = 0
+
+    def _remove(self, key: Hashable):
+        """
+        Args:
+            key: key of the entry to drop, if it's cached
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def _count(self, event: str, tier: str):
+        if self.metrics is not None:
+            self.metrics.add_list_cache_event(event=event, tier=tier)
+
+
+list_cache = ListCache(
+    config.LIST_CACHE_MAX_BYTES,
+    shared=(
+        SharedListCache(
+            config.LIST_CACHE_SHARED_PATH, config.LIST_CACHE_SHARED_MAX_BYTES
+        )
+        if config.LIST_CACHE_SHARED_PATH
+        else None
+    ),
+)
@@ -3,7 +3,7 @@ from json import JSONDecodeError, load
 
 import cdislogging
 from starlette.config import Config
-from starlette.datastructures import Secret
+from starlette.datastructures import CommaSeparatedStrings, Secret
 
 ENV = os.getenv("ENV", "production")
 CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -42,6 +42,20 @@ DB_CONNECTION_STRING = config(
     default=f"{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_DATABASE}",
 )
 
+# optional read replicas, as a comma separated list of connection strings in the same
+# format as DB_CONNECTION_STRING. read-only queries are spread across these round-robin
+DB_REPLICA_CONNECTION_STRINGS = config(
+    "DB_REPLICA_CONNECTION_STRINGS", cast=CommaSeparatedStrings, default=""
+)
+
+# how long a replica that failed a query is skipped before it is tried again
+DB_REPLICA_RETRY_SECONDS = config("DB_REPLICA_RETRY_SECONDS", cast=float, default=30)
+
+# after a user writes, their reads go to the primary for this long so they see their own changes
+DB_REPLICA_READ_YOUR_WRITES_SECONDS = config(
+    "DB_REPLICA_READ_YOUR_WRITES_SECONDS", cast=float, default=5
+)
+
 URL_PREFIX = config("URL_PREFIX", default=None)
 
 # enable Prometheus Metrics for observability purposes
@@ -67,7 +81,66 @@ logging = cdislogging.get_logger(__name__, log_level="debug" if DEBUG else "info
 
 MAX_LISTS = config("MAX_LISTS", cast=int, default=100)
 
-MAX_LIST_ITEMS = config("MAX_LIST_ITEMS", cast=int, default=1000)
+# where list items are stored:
+#   jsonb: in the `items` JSONB column of user_lists
+#   dual: in both the `items` column (which reads still come from) and the user_list_items table,
+#         for moving an existing deployment over
+#   normalized: one row per item in the user_list_items table, for very large lists
+ITEM_STORAGE = config("ITEM_STORAGE", default="jsonb")
+if ITEM_STORAGE not in ("jsonb", "dual", "normalized"):
+    raise ValueError(f"Unknown ITEM_STORAGE: {ITEM_STORAGE}")
+
+MAX_LIST_ITEMS = config(
+    "MAX_LIST_ITEMS",
+    cast=int,
+    default=100000 if ITEM_STORAGE == "normalized" else 1000,
+)
+
+# page size for filtered/paginated item reads of a single list, and the largest page allowed
+ITEMS_PAGE_SIZE = config("ITEMS_PAGE_SIZE", cast=int, default=100)
+MAX_ITEMS_PAGE_SIZE = config("MAX_ITEMS_PAGE_SIZE", cast=int, default=1000)
+
+# max number of list ids a single batch request (e.g. POST /lists/_batch_get) can take
+MAX_BATCH_LIST_IDS = config("MAX_BATCH_LIST_IDS", cast=int, default=100)
+
+# how far back a GET /lists/changes cursor starts from when it was issued, so lists committed
+# a little after their updated_time (or by an instance with a slightly different clock) are
+# still returned by the next sync
+LIST_CHANGES_CURSOR_OVERLAP_SECONDS = config(
+    "LIST_CHANGES_CURSOR_OVERLAP_SECONDS", cast=float, default=5
+)
+# how long deleted lists are remembered for GET /lists/changes, older cursors get a 410
+LIST_DELETIONS_RETENTION_DAYS = config(
+    "LIST_DELETIONS_RETENTION_DAYS", cast=int, default=30
+)
+
+# push list change notifications to clients over server-sent events (GET /lists/events). Each
+# worker holds one extra database connection to LISTEN on, and writes NOTIFY it on commit
+ENABLE_LIST_EVENTS = config("ENABLE_LIST_EVENTS", cast=bool, default=False)
+# events buffered per subscriber before it's sent a single "resync" event instead
+LIST_EVENTS_QUEUE_SIZE = config("LIST_EVENTS_QUEUE_SIZE", cast=int, default=100)
+# seconds between keepalive comments on an idle event stream
+LIST_EVENTS_KEEPALIVE_SECONDS = config(
+    "LIST_EVENTS_KEEPALIVE_SECONDS", cast=float, default=15
+)
+
+# max total size of the serialized list responses each worker caches, 0 disables the cache.
+# like list events, this holds one extra database connection per worker to LISTEN on
+LIST_CACHE_MAX_BYTES = config("LIST_CACHE_MAX_BYTES", cast=int, default=0)
+
+# sqlite file for a second list cache tier shared by the workers on a host, e.g. under
+# /dev/shm, and the max total size of the responses in it. Empty disables the shared tier
+LIST_CACHE_SHARED_PATH = config("LIST_CACHE_SHARED_PATH", default="")
+LIST_CACHE_SHARED_MAX_BYTES = config(
+    "LIST_CACHE_SHARED_MAX_BYTES", cast=int, default=256 * 1024 * 1024
+)
+
+# let concurrent identical reads of a user's lists, or of a list, in a worker share one query
+COALESCE_READS = config("COALESCE_READS", cast=bool, default=True)
+
+# number of hash partitions (on creator) for the user_lists table, 0 leaves it unpartitioned.
+# must be set before running the migrations and must match the migrated database
+USER_LISTS_HASH_PARTITIONS = config("USER_LISTS_HASH_PARTITIONS", cast=int, default=0)
 
 
 def read_json_if_exists(file_path):
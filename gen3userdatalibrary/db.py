@@ -20,28 +20,84 @@ What do we do in this file?
 
 - We create a sqlalchemy engine and session maker factory as globals
     - This reads in the db URL from config
+- If read replicas are configured, we create a `ReplicaRouter` global as well
+    - Read-only queries are spread across the replicas round-robin, skipping any that
+      recently failed, and fall back to the primary
+    - After a user writes, their reads stick to the primary for a short period so they
+      always see their own changes
 - We define a data access layer class here which isolates the database manipulations
     - All CRUD operations go through this interface instead of bleeding specific database
       manipulations into the higher level web app endpoint code
+    - A subclass of it stores list items as rows of their own table instead of in the
+      `items` column, which one is used depends on ITEM_STORAGE
 - We create a function which yields an instance of the data access layer class with
   a fresh session from the session maker factory
     - This is what gets injected into endpoint code using FastAPI's dep injections
 """
 
+import asyncio
+import copy
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from collections.abc import AsyncIterable
-from typing import List, Optional, Tuple, Union, Any, Dict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import delete, func, text, tuple_
+from sqlalchemy import (
+    String,
+    any_,
+    bindparam,
+    column,
+    delete,
+    distinct,
+    func,
+    insert,
+    inspect as sa_inspect,
+    literal,
+    text,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
 from starlette import status
 
 from gen3userdatalibrary import config
+from gen3userdatalibrary.config import logging
 from gen3userdatalibrary.auth import get_list_by_id_endpoint
+from gen3userdatalibrary.cache import list_cache
+from gen3userdatalibrary.events import (
+    LIST_EVENTS_CHANNEL,
+    list_changes_are_broadcast,
+    make_notify_payload,
+)
 from gen3userdatalibrary.models.helpers import derive_changes_to_make
-from gen3userdatalibrary.models.user_list import UserList
+from gen3userdatalibrary.models.user_list import (
+    UserList,
+    UserListDeletion,
+    UserListItem,
+)
 from gen3userdatalibrary.utils.metrics import MetricModel
 
 engine = create_async_engine(str(config.DB_CONNECTION_STRING), echo=True)
@@ -50,6 +106,238 @@ engine = create_async_engine(str(config.DB_CONNECTION_STRING), echo=True)
 async_sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
 
 
+class ReplicaRouter:
+    """
+    Picks which read replica a read-only query should go to. Replicas are used round-robin,
+    and a replica that failed a query is skipped until its retry period has passed.
+
+    Also tracks which users and lists were recently written to, so that reads for them
+    can stick to the primary until the replicas have caught up (read-your-writes).
+    """
+
+    def __init__(
+        self,
+        connection_strings: List[str],
+        retry_seconds: float = 30,
+        read_your_writes_seconds: float = 5,
+    ):
+        self.engines = [
+            create_async_engine(str(connection_string))
+            for connection_string in connection_strings
+        ]
+        self.retry_seconds = retry_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._unhealthy_until = [0.0] * len(self.engines)
+        self._next_index = 0
+        self._recent_writes: Dict[str, float] = {}
+
+    def next_healthy_replica(self) -> Optional[int]:
+        """
+        Returns:
+            the index of the next healthy replica in round-robin order, or None if none are healthy
+        """
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = self._next_index
+            self._next_index = (self._next_index + 1) % len(self.engines)
+            if self._unhealthy_until[index] <= now:
+                return index
+        return None
+
+    def create_session(self, index: int) -> AsyncSession:
+        """
+        Args:
+            index: index of the replica to connect to
+
+        Returns:
+            a new session bound to that replica
+        """
+        return AsyncSession(self.engines[index], expire_on_commit=False)
+
+    def mark_unhealthy(self, index: int):
+        """
+        Skip the replica at `index` until the retry period has passed
+
+        Args:
+            index: index of the replica that failed
+        """
+        self._unhealthy_until[index] = time.monotonic() + self.retry_seconds
+
+    def mark_write(self, *keys: str):
+        """
+        Record that the given users/lists were just written to
+
+        Args:
+            keys: creator ids and/or list ids that were written to
+        """
+        expires_at = time.monotonic() + self.read_your_writes_seconds
+        for key in keys:
+            self._recent_writes[str(key)] = expires_at
+
+    def mark_notified_write(
+        self, creator_id: Optional[str], list_ids: Optional[List[str]]
+    ):
+        """
+        Record a write another worker notified the list events channel about
+
+        Args:
+            creator_id: user whose lists changed, None if unknown
+            list_ids: ids of the lists that changed, None if unknown
+        """
+        if creator_id is not None:
+            self.mark_write(creator_id, *(list_ids or ()))
+
+    def has_recent_write(self, *keys: str) -> bool:
+        """
+        Args:
+            keys: creator ids and/or list ids about to be read
+
+        Returns:
+            True if any of the keys was written to within the read-your-writes period
+        """
+        now = time.monotonic()
+        self._recent_writes = {
+            key: expires_at
+            for key, expires_at in self._recent_writes.items()
+            if expires_at > now
+        }
+        return any(str(key) in self._recent_writes for key in keys)
+
+    async def dispose(self):
+        """
+        Close all replica connection pools
+        """
+        for replica_engine in self.engines:
+            await replica_engine.dispose()
+
+
+replica_router = (
+    ReplicaRouter(
+        config.DB_REPLICA_CONNECTION_STRINGS,
+        retry_seconds=config.DB_REPLICA_RETRY_SECONDS,
+        read_your_writes_seconds=config.DB_REPLICA_READ_YOUR_WRITES_SECONDS,
+    )
+    if config.DB_REPLICA_CONNECTION_STRINGS
+    else None
+)
+
+
+class _Flight:
+    """
+    A query in flight, which identical reads can wait on instead of running it again
+    """
+
+    def __init__(self, tags: Iterable[str]):
+        self.tags = {str(tag) for tag in tags}
+        self.followers = 0
+        self.future = asyncio.get_running_loop().create_future()
+
+
+# what followers get if the leader's query failed, so they run their own
+_FAILED_FLIGHT = object()
+
+
+class ReadCoalescer:
+    """
+    Shares one in-flight query between concurrent identical reads in a worker (single-flight),
+    e.g. a user's library opened in several tabs at once, or the burst of reads after a deploy.
+
+    Every caller is still authorized by its own request before it reads, and gets its own copy
+    of the result, taken when the query finished, attached to its own session. Flights reading
+    users/lists that are written to are forgotten as soon as this worker commits the write or
+    hears about it, so reads starting after that don't join a query that began before it.
+    """
+
+    def __init__(self):
+        self.metrics = None
+        self.coalesced = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    async def run(
+        self,
+        key: Hashable,
+        tags: Iterable[str],
+        load: Callable[[], Awaitable[Any]],
+        snapshot: Callable[[Any], Any],
+    ) -> Tuple[Any, bool]:
+        """
+        Args:
+            key: identifies the query
+            tags: creator ids and/or list ids the query reads
+            load: runs the query
+            snapshot: copies the query's result for the reads that joined it
+
+        Returns:
+            the result and False if this read ran the query, or the snapshot of another
+            read's result and True if it joined that read's query
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.followers += 1
+            outcome = await asyncio.shield(flight.future)
+            if outcome is not _FAILED_FLIGHT:
+                self.coalesced += 1
+                if self.metrics is not None:
+                    self.metrics.add_coalesced_read(query=key[0])
+                return outcome, True
+            return await load(), False
+
+        flight = _Flight(tags)
+        self._flights[key] = flight
+        try:
+            result = await load()
+        except BaseException:
+            flight.future.set_result(_FAILED_FLIGHT)
+            raise
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.future.set_result(snapshot(result) if flight.followers else None)
+        return result, False
+
+    def forget(self, creator_id: Optional[str], list_ids: Optional[Iterable]):
+        """
+        Stop new reads from joining the flights reading any of the given users/lists
+
+        Args:
+            creator_id: user whose lists changed, None if unknown
+            list_ids: ids of the lists that changed, None if unknown
+        """
+        if creator_id is None or list_ids is None:
+            self._flights.clear()
+            return
+        tags = {creator_id, *(str(list_id) for list_id in list_ids)}
+        for key, flight in list(self._flights.items()):
+            if flight.tags & tags:
+                del self._flights[key]
+
+
+read_coalescer = ReadCoalescer()
+
+
+def snapshot_user_lists(
+    user_lists: Union[None, UserList, List[UserList]],
+) -> Union[None, Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Args:
+        user_lists: a list, lists or None, as loaded by a query
+
+    Returns:
+        copies of the lists' loaded attributes, in the same shape
+    """
+    if user_lists is None:
+        return None
+    if isinstance(user_lists, list):
+        return [snapshot_user_lists(user_list) for user_list in user_lists]
+    return copy.deepcopy(
+        {
+            attribute: user_lists.__dict__[attribute]
+            for attribute in USER_LIST_ATTRIBUTES
+            if attribute in user_lists.__dict__
+        }
+    )
+
+
 def get_items_added_and_deleted(amount_of_new_items: int):
     """
     Calcs items added and items deleted
@@ -68,14 +356,193 @@ def get_items_added_and_deleted(amount_of_new_items: int):
     return items_added, items_deleted
 
 
+USER_LIST_ATTRIBUTES = tuple(
+    column_attribute.key for column_attribute in sa_inspect(UserList).column_attrs
+)
+
+LIST_METADATA_COLUMNS = (
+    UserList.id,
+    UserList.version,
+    UserList.creator,
+    UserList.authz,
+    UserList.name,
+    UserList.created_time,
+    UserList.updated_time,
+)
+
+
+def metadata_row_to_dict(row) -> Optional[Dict[str, Any]]:
+    """
+    Args:
+        row: a row of LIST_METADATA_COLUMNS, or None
+
+    Returns:
+        the row as a dict in the same format as `UserList.to_dict`, or None if there's no row
+    """
+    if row is None:
+        return None
+    metadata = dict(row._mapping)
+    for time_key in ("created_time", "updated_time"):
+        if metadata[time_key] is not None:
+            metadata[time_key] = metadata[time_key].isoformat()
+    return metadata
+
+
 class DataAccessLayer:
     """
     Defines an abstract interface to manipulate the database. Instances are given a session to
-    act within.
+    act within, and optionally a replica router to send read-only queries to read replicas.
     """
 
-    def __init__(self, db_session: AsyncSession):
+    def __init__(
+        self, db_session: AsyncSession, replica_router: Optional[ReplicaRouter] = None
+    ):
         self.db_session = db_session
+        self.replica_router = replica_router
+        self.replica_session: Optional[AsyncSession] = None
+        self._replica_index: Optional[int] = None
+        self._has_written = False
+        self._changed_list_ids: Dict[str, set] = defaultdict(set)
+
+    def _mark_write(self, creator_id: Optional[str], *list_ids):
+        """
+        Record a write so later reads by this request, and reads of the same users/lists by
+        other requests for a short while, go to the primary. Also remembers which lists changed
+        so the creator's event subscribers, the list caches and in-flight reads can be told
+        once it's committed.
+
+        Args:
+            creator_id: creator of the lists being written to, None if unknown
+            list_ids: ids of the lists being written to
+        """
+        self._has_written = True
+        keys = list_ids if creator_id is None else (creator_id, *list_ids)
+        if self.replica_router is not None:
+            self.replica_router.mark_write(*keys)
+        if creator_id is not None:
+            self._changed_list_ids[creator_id].update(list_ids)
+
+    async def notify_changes(self):
+        """
+        NOTIFY the list events channel about the lists this request changed, one notification
+        per creator. Must be called inside the request's transaction, Postgres delivers the
+        notifications only if and when it commits.
+        """
+        if not list_changes_are_broadcast():
+            return
+        for creator_id, list_ids in self._changed_list_ids.items():
+            payload = make_notify_payload(creator_id, list_ids)
+            await self.db_session.execute(
+                select(func.pg_notify(LIST_EVENTS_CHANNEL, payload))
+            )
+
+    def invalidate_cached_lists(self):
+        """
+        Drop this worker's cached responses and in-flight reads for the lists this request
+        changed, once its transaction has committed. Other workers drop theirs when the
+        notification arrives.
+        """
+        for creator_id, list_ids in self._changed_list_ids.items():
+            list_cache.invalidate(creator_id, list_ids)
+            read_coalescer.forget(creator_id, list_ids)
+
+    async def _coalesce_read(
+        self, query_name: str, keys: Tuple, load: Callable[[], Awaitable[Any]]
+    ):
+        """
+        Run a read of lists, or join an identical one already running in this worker.
+        Reads by a request that has written, or of users/lists it recently wrote to, always
+        run their own query so they see the write.
+
+        Args:
+            query_name: names the kind of read
+            keys: creator ids and/or list ids the read is for, which with `query_name`
+                identify it
+            load: runs the read, returning a list, lists or None
+
+        Returns:
+            the lists read, attached to this request's session
+        """
+        if (
+            not config.COALESCE_READS
+            or self._has_written
+            or (
+                self.replica_router is not None
+                and self.replica_router.has_recent_write(*keys)
+            )
+        ):
+            return await load()
+        key = (query_name, type(self).__name__, *(str(key) for key in keys))
+        result, coalesced = await read_coalescer.run(
+            key, keys, load, snapshot_user_lists
+        )
+        if not coalesced:
+            return result
+        if isinstance(result, list):
+            return [await self._attach_snapshot(state) for state in result]
+        return await self._attach_snapshot(result)
+
+    async def _attach_snapshot(
+        self, state: Optional[Dict[str, Any]]
+    ) -> Optional[UserList]:
+        """
+        Args:
+            state: a list's attributes as copied by `snapshot_user_lists`
+
+        Returns:
+            the list as if this request's session had loaded it
+        """
+        if state is None:
+            return None
+        user_list = UserList()
+        for attribute, value in state.items():
+            setattr(user_list, attribute, value)
+        make_transient_to_detached(user_list)
+        return await self.db_session.merge(user_list, load=False)
+
+    async def _execute_read(self, query, *keys):
+        """
+        Execute a read-only query, on a read replica if one is configured and healthy.
+        Falls back to the primary if this request or a recent one wrote to any of the keys,
+        or if the replica fails.
+
+        Args:
+            query: any valid read-only query obj
+            keys: creator ids and/or list ids the query reads
+        """
+        use_primary = (
+            self.replica_router is None
+            or self._has_written
+            or self.replica_router.has_recent_write(*keys)
+        )
+        if use_primary:
+            return await self.db_session.execute(query)
+
+        if self.replica_session is None:
+            self._replica_index = self.replica_router.next_healthy_replica()
+            if self._replica_index is None:
+                return await self.db_session.execute(query)
+            self.replica_session = self.replica_router.create_session(
+                self._replica_index
+            )
+
+        try:
+            return await self.replica_session.execute(query)
+        except (OperationalError, InterfaceError, OSError) as exc:
+            logging.warning(
+                f"Read replica {self._replica_index} failed, falling back to primary. Exc: {exc}"
+            )
+            self.replica_router.mark_unhealthy(self._replica_index)
+            await self.close_replica_session()
+            return await self.db_session.execute(query)
+
+    async def close_replica_session(self):
+        """
+        Release the replica connection used by this instance, if any
+        """
+        if self.replica_session is not None:
+            await self.replica_session.close()
+            self.replica_session = None
 
     async def ensure_user_has_not_reached_max_lists(
         self, creator_id: str, lists_to_add: int = 0
@@ -102,30 +569,126 @@ class DataAccessLayer:
             user_id: same as creator id
             user_list: data object of the UserList type
         """
-        self.db_session.add(user_list)
-        # correct authz with id, but flush to get the autoincrement id
-        await self.db_session.flush()
-
+        # pick the id up front so authz has it from the start, changing authz after the
+        # insert would be a second UPDATE and bump the new list's version
+        if user_list.id is None:
+            user_list.id = uuid.uuid4()
         authz = {
             "version": 0,
             "authz": [get_list_by_id_endpoint(user_id, user_list.id)],
         }
         user_list.authz = authz
+        self.db_session.add(user_list)
+        await self.db_session.flush()
+        self._mark_write(user_id, user_list.id)
         return user_list
 
+    @staticmethod
+    def _ensure_version_matches(version: int, expected_versions: Optional[List[int]]):
+        """
+        Args:
+            version: the list's current version
+            expected_versions: the versions the request expects the list to be at (from
+                If-Match), or None for any
+
+        Raises:
+            HTTPException: 412 if the list isn't at any of the expected versions
+        """
+        if expected_versions is not None and version not in expected_versions:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="The list has changed since the version in If-Match",
+            )
+
+    async def _ensure_list_unchanged(
+        self, list_id: UUID, expected_versions: Optional[List[int]]
+    ):
+        """
+        For when an `UPDATE ... WHERE version IN (expected versions)` matched nothing, tells
+        apart a list that changed (412) from one that doesn't exist (left to the caller)
+
+        Args:
+            list_id: id of list
+            expected_versions: the versions the request expects the list to be at
+        """
+        if expected_versions is None:
+            return
+        query = select(UserList.version).where(UserList.id == list_id)
+        version = (await self.db_session.execute(query)).scalar_one_or_none()
+        if version is not None:
+            self._ensure_version_matches(version, expected_versions)
+
+    async def _flush_list_changes(self, expected_versions: Optional[List[int]] = None):
+        """
+        Write changes to lists now rather than at commit, so the new versions are known
+        before responding and a list that was changed concurrently (since it was read) is
+        reported instead of overwritten
+
+        Args:
+            expected_versions: the versions the request expected (from If-Match), if any
+
+        Raises:
+            HTTPException: 412 if the request had an If-Match, otherwise 409
+        """
+        try:
+            await self.db_session.flush()
+        except StaleDataError:
+            raise HTTPException(
+                status_code=(
+                    status.HTTP_409_CONFLICT
+                    if expected_versions is None
+                    else status.HTTP_412_PRECONDITION_FAILED
+                ),
+                detail="The list was changed by another request, try again",
+            )
+
     async def get_all_lists(self, creator_id: str) -> List[UserList]:
         """
-        Return all known lists
+        Return all known lists. Concurrent identical reads share one query.
+
+        Args:
+            creator_id: matching name of whoever made the list
+        """
+        return await self._coalesce_read(
+            "all_lists", (creator_id,), lambda: self._query_all_lists(creator_id)
+        )
 
+    async def _query_all_lists(self, creator_id: str) -> List[UserList]:
+        """
         Args:
             creator_id: matching name of whoever made the list
+
+        Returns:
+            all of the creator's lists
         """
         query = (
             select(UserList).order_by(UserList.id).where(UserList.creator == creator_id)
         )
-        result = await self.db_session.execute(query)
+        result = await self._execute_read(query, creator_id)
         return list(result.scalars().all())
 
+    async def get_lists_containing_item(
+        self, creator_id: str, item_key: str
+    ) -> List[Tuple[UUID, str]]:
+        """
+        Find which of a creator's lists contain an item, without loading any list's items
+
+        Args:
+            creator_id: matching name of whoever made the list
+            item_key: key of the item in `items`, e.g. a DRS URI
+
+        Returns:
+            (id, name) of each list containing the item
+        """
+        query = (
+            select(UserList.id, UserList.name)
+            .where(UserList.creator == creator_id)
+            .where(UserList.items.has_key(item_key))
+            .order_by(UserList.id)
+        )
+        result = await self._execute_read(query, creator_id)
+        return [tuple(row) for row in result.all()]
+
     async def get_list_or_none(self, query) -> Optional[UserList]:
         """
         Given a query, executes it and returns the item or none
@@ -175,7 +738,8 @@ class DataAccessLayer:
 
     async def get_user_list_by_list_id(self, list_id: UUID) -> Optional[UserList]:
         """
-        Retrieves a list of users' lists by their list ID.
+        Retrieves a list of users' lists by their list ID. Concurrent identical reads share
+        one query.
 
         Args:
             list_id (UUID, optional): The ID of the list. Defaults to None.
@@ -183,11 +747,175 @@ class DataAccessLayer:
         Returns:
             Optional[UserList]: A list of user's lists that match the given criteria.
         """
+        return await self._coalesce_read(
+            "list", (list_id,), lambda: self._query_user_list_by_list_id(list_id)
+        )
+
+    async def _query_user_list_by_list_id(self, list_id: UUID) -> Optional[UserList]:
+        """
+        Args:
+            list_id: UUID of the list
+
+        Returns:
+            the list, or None if it doesn't exist
+        """
         query = select(UserList).where(UserList.id == list_id)
-        results = await self.db_session.execute(query)
+        results = await self._execute_read(query, list_id)
         user_lists = results.scalar_one_or_none()
         return user_lists
 
+    async def get_list_metadata(self, list_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Get everything about a list except its items
+
+        Args:
+            list_id: UUID of the list
+
+        Returns:
+            the list as a dict (in the same format as `UserList.to_dict`) without `items`,
+            or None if the list doesn't exist
+        """
+        query = select(*LIST_METADATA_COLUMNS).where(UserList.id == list_id)
+        result = await self._execute_read(query, list_id)
+        return metadata_row_to_dict(result.one_or_none())
+
+    def _item_rows(self, list_id: UUID):
+        """
+        Args:
+            list_id: UUID of the list
+
+        Returns:
+            a subquery with a (`key`, `value`) row for each of the list's items
+        """
+        item = (
+            func.jsonb_each(UserList.items)
+            .table_valued(column("key", String), column("value", JSONB))
+            .alias("item")
+        )
+        return (
+            select(item.c.key, item.c.value)
+            .select_from(UserList)
+            .join(item, true())
+            .where(UserList.id == list_id)
+            .subquery("item_rows")
+        )
+
+    async def get_list_item_count(self, list_id: UUID) -> Optional[int]:
+        """
+        Count a list's items without sending them back
+
+        Args:
+            list_id: UUID of the list
+
+        Returns:
+            the number of items in the list, or None if the list doesn't exist
+        """
+        query = select(
+            select(func.count())
+            .select_from(func.jsonb_object_keys(UserList.items))
+            .scalar_subquery()
+        ).where(UserList.id == list_id)
+        row = (await self._execute_read(query, list_id)).one_or_none()
+        return None if row is None else row[0]
+
+    async def get_list_items_page(
+        self,
+        list_id: UUID,
+        item_type: Optional[str] = None,
+        key_prefix: Optional[str] = None,
+        dataset_guid: Optional[str] = None,
+        limit: int = config.ITEMS_PAGE_SIZE,
+        offset: int = 0,
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Filter and paginate the items of a list in the database, so only the requested
+        page of items is ever sent back. Items are ordered by key.
+
+        Args:
+            list_id: UUID of the list
+            item_type: only include items with this `type`, e.g. GA4GH_DRS
+            key_prefix: only include items whose key starts with this, e.g. drs://dg.4503
+            dataset_guid: only include items with this `dataset_guid`
+            limit: max number of items to return
+            offset: number of matching items to skip
+
+        Returns:
+            (the page of items as key => item, total number of items matching the filters)
+        """
+        item = self._item_rows(list_id)
+        filters = []
+        if item_type is not None:
+            filters.append(item.c.value["type"].astext == item_type)
+        if key_prefix is not None:
+            filters.append(item.c.key.startswith(key_prefix, autoescape=True))
+        if dataset_guid is not None:
+            filters.append(item.c.value["dataset_guid"].astext == dataset_guid)
+
+        query = (
+            select(item.c.key, item.c.value, func.count().over())
+            .where(*filters)
+            .order_by(item.c.key)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = (await self._execute_read(query, list_id)).all()
+        if rows:
+            total = rows[0][2]
+        elif offset:
+            # paged past the end, so the window count isn't available
+            count_query = select(func.count()).select_from(item).where(*filters)
+            total = (await self._execute_read(count_query, list_id)).scalar()
+        else:
+            total = 0
+        return {key: value for key, value, _ in rows}, total
+
+    async def get_list_items_after_key(
+        self, list_id: UUID, after_key: Optional[str], limit: int
+    ) -> Optional[Tuple[Dict[str, Any], int, bool]]:
+        """
+        Walk a list's items in key order using keyset pagination, so each page is a range
+        scan from the last key seen rather than an ever growing offset
+
+        Args:
+            list_id: UUID of the list
+            after_key: only return items with keys after this, None to start from the beginning
+            limit: max number of items to return
+
+        Returns:
+            (the page of items as key => item, total number of items in the list, whether
+            there are items after this page), or None if the list doesn't exist
+        """
+        total = await self.get_list_item_count(list_id)
+        if total is None:
+            return None
+
+        item = self._item_rows(list_id)
+        query = select(item.c.key, item.c.value).order_by(item.c.key).limit(limit + 1)
+        if after_key is not None:
+            query = query.where(item.c.key > after_key)
+        rows = (await self._execute_read(query, list_id)).all()
+        has_more = len(rows) > limit
+        return {key: value for key, value in rows[:limit]}, total, has_more
+
+    async def get_list_versions(
+        self, creator_id: str
+    ) -> List[Tuple[UUID, datetime, int]]:
+        """
+        Get what identifies the current version of each of a creator's lists, without
+        loading any of their contents
+
+        Args:
+            creator_id: id of creator
+
+        Returns:
+            (id, updated_time, version) of each of the creator's lists
+        """
+        query = select(UserList.id, UserList.updated_time, UserList.version).where(
+            UserList.creator == creator_id
+        )
+        result = await self._execute_read(query, creator_id)
+        return [tuple(row) for row in result.all()]
+
     async def get_user_lists_by_creator_id(self, creator_id: str):
         """
         Retrieves a list of users' lists by their creator ID
@@ -205,18 +933,22 @@ class DataAccessLayer:
 
     async def get_existing_list_or_throw(self, list_id: UUID) -> UserList:
         """
-        List SHOULD exist, so throw if it doesn't
+        List SHOULD exist, so throw if it doesn't. Always reads from the primary, since the
+        list returned is usually about to be modified
 
         Args:
             list_id: UUID of the list
         """
-        existing_record = await self.get_user_list_by_list_id(list_id)
+        existing_record = await self.get_list(list_id)
         if existing_record is None:
             raise ValueError(f"No UserList found with id {list_id}")
         return existing_record
 
     async def update_and_persist_list(
-        self, list_to_update_id: UUID, changes_to_make: Dict[str, Any]
+        self,
+        list_to_update_id: UUID,
+        changes_to_make: Dict[str, Any],
+        expected_versions: Optional[List[int]] = None,
     ) -> UserList:
         """
         Given an id and list of changes to make, it'll update the list orm with those changes.
@@ -226,8 +958,10 @@ class DataAccessLayer:
         Args:
             list_to_update_id: uuid of list to update
             changes_to_make: contents that go into corresponding UserList properties with their associated names
+            expected_versions: versions the list must be at (from If-Match), or None for any
         """
         db_list_to_update = await self.get_existing_list_or_throw(list_to_update_id)
+        self._ensure_version_matches(db_list_to_update.version, expected_versions)
         changes_that_can_be_made = list(
             filter(
                 lambda kvp: hasattr(db_list_to_update, kvp[0]), changes_to_make.items()
@@ -235,6 +969,8 @@ class DataAccessLayer:
         )
         for key, value in changes_that_can_be_made:
             setattr(db_list_to_update, key, value)
+        await self._flush_list_changes(expected_versions)
+        self._mark_write(db_list_to_update.creator, db_list_to_update.id)
         return db_list_to_update
 
     async def test_connection(self) -> None:
@@ -256,7 +992,7 @@ class DataAccessLayer:
             .select_from(UserList)
             .where(UserList.creator == creator_id)
         )
-        result = await self.db_session.execute(query)
+        result = await self._execute_read(query, creator_id)
         count = result.scalar()
         count = count or 0
         return count
@@ -287,9 +1023,14 @@ class DataAccessLayer:
             sub_id: id of creator
         """
         list_count, item_count = await self.get_list_and_item_count(sub_id)
-        query = delete(UserList).where(UserList.creator == sub_id)
+        query = (
+            delete(UserList).where(UserList.creator == sub_id).returning(UserList.id)
+        )
         query.execution_options(synchronize_session="fetch")
-        await self.db_session.execute(query)
+        result = await self.db_session.execute(query)
+        deleted_ids = result.scalars().all()
+        await self._log_deleted_lists(sub_id, deleted_ids)
+        self._mark_write(sub_id, *deleted_ids)
         return MetricModel(lists_deleted=list_count, items_deleted=item_count)
 
     async def delete_list(self, list_id: UUID):
@@ -303,9 +1044,277 @@ class DataAccessLayer:
         item_count = 0 if list_to_delete is None else len(list_to_delete.items)
         del_query = delete(UserList).where(UserList.id == list_id)
         await self.db_session.execute(del_query)
+        if list_to_delete is None:
+            self._mark_write(None, list_id)
+        else:
+            await self._log_deleted_lists(list_to_delete.creator, [list_id])
+            self._mark_write(list_to_delete.creator, list_id)
         return MetricModel(lists_deleted=1, items_deleted=item_count)
 
-    async def add_items_to_list(self, list_id: UUID, item_data: dict):
+    async def delete_lists(
+        self, creator_id: str, list_ids: List[UUID]
+    ) -> Tuple[List[UUID], int]:
+        """
+        Delete several of a creator's lists in a single DELETE, counting their items as
+        they're deleted. Lists that don't exist or belong to another creator are left alone
+
+        Args:
+            creator_id: id of creator
+            list_ids: ids of the lists to delete
+
+        Returns:
+            (ids of the lists deleted, total number of items they had)
+        """
+        item_count = (
+            select(func.count())
+            .select_from(func.jsonb_object_keys(UserList.items))
+            .scalar_subquery()
+        )
+        ids = bindparam("list_ids", list(list_ids), type_=ARRAY(UserList.id.type))
+        query = (
+            delete(UserList)
+            .where(UserList.id == any_(ids))
+            .where(UserList.creator == creator_id)
+            .returning(UserList.id, item_count)
+            .execution_options(synchronize_session="fetch")
+        )
+        rows = (await self.db_session.execute(query)).all()
+        deleted_ids = [list_id for list_id, _ in rows]
+        await self._log_deleted_lists(creator_id, deleted_ids)
+        self._mark_write(creator_id, *deleted_ids)
+        return deleted_ids, sum(count for _, count in rows)
+
+    async def _log_deleted_lists(self, creator_id: str, list_ids: List[UUID]):
+        """
+        Record that lists were deleted, for GET /lists/changes, and forget the creator's
+        deletions older than LIST_DELETIONS_RETENTION_DAYS
+
+        Args:
+            creator_id: id of creator
+            list_ids: ids of the lists deleted
+        """
+        if not list_ids:
+            return
+        now = datetime.now(timezone.utc)
+        await self.db_session.execute(
+            pg_insert(UserListDeletion)
+            .values(
+                [
+                    {"list_id": list_id, "creator": creator_id, "deleted_time": now}
+                    for list_id in list_ids
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        retention = timedelta(days=config.LIST_DELETIONS_RETENTION_DAYS)
+        await self.db_session.execute(
+            delete(UserListDeletion)
+            .where(UserListDeletion.creator == creator_id)
+            .where(UserListDeletion.deleted_time < now - retention)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_lists_changed_since(
+        self, creator_id: str, since: Optional[datetime]
+    ) -> List[UserList]:
+        """
+        Get a creator's lists created or updated after a point in time. Always reads from
+        the primary, since a sync cursor assumes every change before it can be seen
+
+        Args:
+            creator_id: id of creator
+            since: only lists updated after this, or None for every list
+
+        Returns:
+            the lists, ordered by id
+        """
+        query = select(UserList).where(UserList.creator == creator_id)
+        if since is not None:
+            query = query.where(UserList.updated_time > since)
+        result = await self.db_session.execute(query.order_by(UserList.id))
+        return list(result.scalars().all())
+
+    async def get_lists_deleted_since(
+        self, creator_id: str, since: datetime
+    ) -> List[UUID]:
+        """
+        Args:
+            creator_id: id of creator
+            since: only lists deleted after this
+
+        Returns:
+            ids of the creator's lists deleted since then, oldest deletion first
+        """
+        query = (
+            select(UserListDeletion.list_id)
+            .where(UserListDeletion.creator == creator_id)
+            .where(UserListDeletion.deleted_time > since)
+            .order_by(UserListDeletion.deleted_time, UserListDeletion.list_id)
+        )
+        result = await self.db_session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_existing_list_ids(self, list_ids: List[UUID]) -> List[UUID]:
+        """
+        Args:
+            list_ids: ids to check
+
+        Returns:
+            which of the ids belong to an existing list
+        """
+        query = select(UserList.id).where(UserList.id.in_(list_ids))
+        result = await self._execute_read(query, *list_ids)
+        return list(result.scalars().all())
+
+    async def get_list_creators(self, list_ids: List[UUID]) -> Dict[UUID, str]:
+        """
+        Args:
+            list_ids: ids of lists
+
+        Returns:
+            list id => creator, for each of the ids that belong to an existing list
+        """
+        query = select(UserList.id, UserList.creator).where(UserList.id.in_(list_ids))
+        result = await self._execute_read(query, *list_ids)
+        return dict(result.all())
+
+    def _items_of_lists(self, list_ids: List[UUID]):
+        """
+        Args:
+            list_ids: ids of lists
+
+        Returns:
+            a subquery with a (`position`, `key`, `value`) row for each item of each of the
+            lists, position being where the item's list is in list_ids (starting at 1)
+        """
+        ids = bindparam(
+            "source_list_ids", list(list_ids), type_=ARRAY(UserList.id.type)
+        )
+        item = (
+            func.jsonb_each(UserList.items)
+            .table_valued(column("key", String), column("value", JSONB))
+            .alias("item")
+        )
+        return (
+            select(
+                func.array_position(ids, UserList.id).label("position"),
+                item.c.key,
+                item.c.value,
+            )
+            .select_from(UserList)
+            .join(item, true())
+            .where(UserList.id == any_(ids))
+            .subquery("list_item_rows")
+        )
+
+    def _combined_item_rows(self, list_ids: List[UUID], operation: str):
+        """
+        Args:
+            list_ids: ids of the lists to combine, in order
+            operation: one of
+                union: items in any of the lists, later lists winning when keys collide
+                intersection: items in all of the lists, as they are in the first list
+                difference: items of the first list that aren't in any of the others
+
+        Returns:
+            a subquery with a (`key`, `value`) row for each item of the combined list
+        """
+        rows = self._items_of_lists(list_ids)
+        position = rows.c.position.desc() if operation == "union" else rows.c.position
+        value = func.array_agg(
+            aggregate_order_by(rows.c.value, position), type_=ARRAY(JSONB)
+        )[1]
+        query = select(rows.c.key, value.label("value")).group_by(rows.c.key)
+        if operation == "intersection":
+            query = query.having(func.count() == len(list_ids))
+        elif operation == "difference":
+            query = query.having(func.bool_and(rows.c.position == 1))
+        return query.subquery("combined_item_rows")
+
+    async def count_combined_items(self, list_ids: List[UUID], operation: str) -> int:
+        """
+        Args:
+            list_ids: ids of the lists to combine, in order
+            operation: union, intersection or difference (see `_combined_item_rows`)
+
+        Returns:
+            the number of items the combined list would have
+        """
+        combined = self._combined_item_rows(list_ids, operation)
+        query = select(func.count()).select_from(combined)
+        return (await self.db_session.execute(query)).scalar()
+
+    async def _insert_list(
+        self, creator_id: str, name: str, items
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            creator_id: id of creator
+            name: name of the new list
+            items: the items, or a sql expression for them
+
+        Returns:
+            the metadata of the new list (see `get_list_metadata`), or None if the creator
+            already has a list with that name
+        """
+        list_id = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+        query = (
+            pg_insert(UserList)
+            .values(
+                id=list_id,
+                version=0,
+                creator=creator_id,
+                authz={
+                    "version": 0,
+                    "authz": [get_list_by_id_endpoint(creator_id, list_id)],
+                },
+                name=name,
+                created_time=now,
+                updated_time=now,
+                items=items,
+            )
+            .on_conflict_do_nothing()
+            .returning(*LIST_METADATA_COLUMNS)
+        )
+        result = await self.db_session.execute(query)
+        metadata = metadata_row_to_dict(result.one_or_none())
+        if metadata is not None:
+            self._mark_write(creator_id, list_id)
+        return metadata
+
+    async def create_combined_list(
+        self, creator_id: str, name: str, list_ids: List[UUID], operation: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Create a list out of the items of existing lists with a single INSERT ... SELECT,
+        so the items never leave the database and aren't validated again
+
+        Args:
+            creator_id: id of creator
+            name: name of the new list
+            list_ids: ids of the lists to combine, in order. a single list is cloned
+            operation: union, intersection or difference (see `_combined_item_rows`)
+
+        Returns:
+            the metadata of the new list (see `get_list_metadata`), or None if the creator
+            already has a list with that name
+        """
+        combined = self._combined_item_rows(list_ids, operation)
+        items = select(
+            func.coalesce(
+                func.jsonb_object_agg(combined.c.key, combined.c.value),
+                text("'{}'::jsonb"),
+            )
+        ).scalar_subquery()
+        return await self._insert_list(creator_id, name, items)
+
+    async def add_items_to_list(
+        self,
+        list_id: UUID,
+        item_data: dict,
+        expected_versions: Optional[List[int]] = None,
+    ):
         """
         Gets existing list and adds items to the items property
         # yes, it has automatic sql injection protection
@@ -313,6 +1322,7 @@ class DataAccessLayer:
         Args:
             list_id: id of list
             item_data: dict of items to add to item component of list
+            expected_versions: versions the list must be at (from If-Match), or None for any
         """
         prev_list = await self.get_user_list_by_list_id(list_id)
         prev_item_count = (
@@ -326,11 +1336,149 @@ class DataAccessLayer:
         items_added, items_deleted = get_items_added_and_deleted(amount_of_new_items)
 
         user_list = await self.get_existing_list_or_throw(list_id)
+        self._ensure_version_matches(user_list.version, expected_versions)
         user_list.items.update(item_data)
+        await self._flush_list_changes(expected_versions)
+        self._mark_write(user_list.creator, list_id)
         return user_list, MetricModel(
             items_added=items_added, items_deleted=items_deleted
         )
 
+    async def delete_items_from_list(
+        self,
+        list_id: UUID,
+        item_keys: List[str],
+        expected_versions: Optional[List[int]] = None,
+    ) -> Optional[int]:
+        """
+        Remove items from a list by key in a single UPDATE (`items - keys`), without loading
+        or rewriting the rest of the list in python
+
+        Args:
+            list_id: id of list
+            item_keys: keys of the items to remove, any that aren't in the list are ignored
+            expected_versions: versions the list must be at (from If-Match), or None for any
+
+        Returns:
+            the number of items removed, or None if the list doesn't exist
+        """
+        keys = bindparam("item_keys", list(set(item_keys)), type_=ARRAY(String))
+        # lock the row first so the count of removed keys matches what the update removes
+        old_list = select(UserList.id, UserList.items).where(UserList.id == list_id)
+        if expected_versions is not None:
+            old_list = old_list.where(UserList.version.in_(expected_versions))
+        old_list = old_list.with_for_update().cte("old_list")
+        removed_key = func.jsonb_object_keys(old_list.c["items"]).column_valued(
+            "removed_key"
+        )
+        removed_count = (
+            select(func.count()).where(removed_key == any_(keys)).scalar_subquery()
+        )
+        query = (
+            update(UserList)
+            .where(UserList.id == old_list.c.id)
+            .values(
+                items=old_list.c["items"].op("-", return_type=JSONB)(keys),
+                updated_time=datetime.now(timezone.utc),
+                version=UserList.version + 1,
+            )
+            .returning(UserList.creator, removed_count)
+            .execution_options(synchronize_session="fetch")
+        )
+        row = (await self.db_session.execute(query)).one_or_none()
+        if row is None:
+            await self._ensure_list_unchanged(list_id, expected_versions)
+            return None
+        creator, removed = row
+        self._mark_write(creator, list_id)
+        return removed
+
+    async def get_items_for_patch(
+        self,
+        list_id: UUID,
+        item_keys: List[str],
+        expected_versions: Optional[List[int]] = None,
+    ) -> Optional[Tuple[str, Dict[str, Any], int]]:
+        """
+        Lock a list for a patch and load just the items the patch touches. Always reads
+        from the primary, since the list is about to be modified
+
+        Args:
+            list_id: id of list
+            item_keys: keys of the items to load, any that aren't in the list are left out
+            expected_versions: versions the list must be at (from If-Match), or None for any
+
+        Returns:
+            (name of the list, key => item for the requested items, total number of items
+            in the list), or None if the list doesn't exist
+        """
+        lock_query = (
+            select(UserList.name, UserList.version)
+            .where(UserList.id == list_id)
+            .with_for_update()
+        )
+        row = (await self.db_session.execute(lock_query)).one_or_none()
+        if row is None:
+            return None
+        name, version = row
+        self._ensure_version_matches(version, expected_versions)
+        item = self._item_rows(list_id)
+        keys = bindparam("item_keys", list(set(item_keys)), type_=ARRAY(String))
+        items_query = select(item.c.key, item.c.value).where(item.c.key == any_(keys))
+        items = dict((await self.db_session.execute(items_query)).all())
+        count_query = select(func.count()).select_from(item)
+        item_count = (await self.db_session.execute(count_query)).scalar()
+        return name, items, item_count
+
+    async def patch_list(
+        self,
+        list_id: UUID,
+        name: str,
+        removed_keys: List[str],
+        updated_items: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Apply the result of a patch in a single UPDATE, `(items - removed_keys) ||
+        updated_items`, so the rest of the list is never loaded or rewritten in python
+
+        Args:
+            list_id: id of list
+            name: (possibly new) name of the list
+            removed_keys: keys of the items to remove
+            updated_items: key => item for the items to add or replace
+
+        Returns:
+            the metadata of the updated list (see `get_list_metadata`), or None if the list
+            doesn't exist
+        """
+        new_items = UserList.items
+        if removed_keys:
+            new_items = new_items.op("-", return_type=JSONB)(
+                bindparam("removed_keys", list(removed_keys), type_=ARRAY(String))
+            )
+        if updated_items:
+            new_items = new_items.op("||", return_type=JSONB)(
+                bindparam("updated_items", updated_items, type_=JSONB)
+            )
+        query = (
+            update(UserList)
+            .where(UserList.id == list_id)
+            .values(
+                name=name,
+                items=new_items,
+                updated_time=datetime.now(timezone.utc),
+                version=UserList.version + 1,
+            )
+            .returning(*LIST_METADATA_COLUMNS)
+            .execution_options(synchronize_session="fetch")
+        )
+        metadata = metadata_row_to_dict(
+            (await self.db_session.execute(query)).one_or_none()
+        )
+        if metadata is not None:
+            self._mark_write(metadata["creator"], list_id)
+        return metadata
+
     async def grab_all_lists_that_exist(
         self,
         by: str,
@@ -363,10 +1511,18 @@ class DataAccessLayer:
         return from_sequence_to_list
 
     async def change_list_contents(
-        self, new_user_list: UserList, existing_user_list: UserList
+        self,
+        new_user_list: UserList,
+        existing_user_list: UserList,
+        expected_versions: Optional[List[int]] = None,
     ):
         """
         Change the contents of a list directly, including replaces the contents of `items`
+
+        Args:
+            new_user_list: the new contents
+            existing_user_list: the list to change
+            expected_versions: versions the list must be at (from If-Match), or None for any
         """
         prev_list = await self.get_user_list_by_list_id(existing_user_list.id)
         prev_item_count = (
@@ -381,13 +1537,415 @@ class DataAccessLayer:
 
         changes_to_make = derive_changes_to_make(existing_user_list, new_user_list)
         updated_list = await self.update_and_persist_list(
-            existing_user_list.id, changes_to_make
+            existing_user_list.id, changes_to_make, expected_versions
         )
         return updated_list, MetricModel(
             items_added=items_added, items_deleted=items_deleted
         )
 
 
+class NormalizedItemsDataAccessLayer(DataAccessLayer):
+    """
+    Data access layer that stores each list item as a row of the user_list_items table, so
+    changing or paging through a few items of a very large list only touches those rows
+    instead of rewriting and re-parsing the whole `items` document.
+
+    Lists are still returned as `UserList`s with `items` filled in from the rows. With
+    `dual_write` set, the `items` column is kept up to date as well and is still what reads
+    come from, which lets a deployment move over to (or back from) normalized storage.
+    """
+
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        replica_router: Optional[ReplicaRouter] = None,
+        dual_write: bool = False,
+    ):
+        super().__init__(db_session, replica_router)
+        self.dual_write = dual_write
+
+    async def _load_items(self, user_lists: List[UserList], from_primary: bool = True):
+        """
+        Fill in `items` of each list from its rows, without marking them as changed
+
+        Args:
+            user_lists: lists to load the items of, any Nones are skipped
+            from_primary: read from the primary rather than a replica
+        """
+        user_lists = [user_list for user_list in user_lists if user_list is not None]
+        if self.dual_write or not user_lists:
+            return
+        list_ids = [user_list.id for user_list in user_lists]
+        query = (
+            select(UserListItem.list_id, UserListItem.item_key, UserListItem.value)
+            .where(UserListItem.list_id.in_(list_ids))
+            .order_by(UserListItem.list_id, UserListItem.item_key)
+        )
+        if from_primary:
+            result = await self.db_session.execute(query)
+        else:
+            result = await self._execute_read(query, *list_ids)
+        items_by_list_id = defaultdict(dict)
+        for list_id, item_key, value in result.all():
+            items_by_list_id[list_id][item_key] = value
+        for user_list in user_lists:
+            set_committed_value(user_list, "items", items_by_list_id[user_list.id])
+
+    async def _upsert_items(self, list_id: UUID, items: Dict[str, Any]):
+        """
+        Insert the items into the list, replacing any existing items with the same keys
+
+        Args:
+            list_id: id of list
+            items: key => item
+        """
+        if not items:
+            return
+        insert_query = pg_insert(UserListItem)
+        insert_query = insert_query.on_conflict_do_update(
+            index_elements=[UserListItem.list_id, UserListItem.item_key],
+            set_={"value": insert_query.excluded.value},
+        )
+        await self.db_session.execute(
+            insert_query,
+            [
+                {"list_id": list_id, "item_key": item_key, "value": value}
+                for item_key, value in items.items()
+            ],
+        )
+
+    async def _delete_items(
+        self, list_id: UUID, item_keys: Optional[List[str]] = None
+    ) -> int:
+        """
+        Args:
+            list_id: id of list
+            item_keys: keys of the items to delete, None deletes all of the list's items
+
+        Returns:
+            the number of items deleted
+        """
+        query = delete(UserListItem).where(UserListItem.list_id == list_id)
+        if item_keys is not None:
+            if not item_keys:
+                return 0
+            query = query.where(
+                UserListItem.item_key
+                == any_(bindparam("item_keys", list(item_keys), type_=ARRAY(String)))
+            )
+        result = await self.db_session.execute(
+            query.execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def _item_rows(self, list_id: UUID):
+        if self.dual_write:
+            return super()._item_rows(list_id)
+        return (
+            select(
+                UserListItem.item_key.label("key"), UserListItem.value.label("value")
+            )
+            .where(UserListItem.list_id == list_id)
+            .subquery("item_rows")
+        )
+
+    def _items_of_lists(self, list_ids: List[UUID]):
+        if self.dual_write:
+            return super()._items_of_lists(list_ids)
+        ids = bindparam(
+            "source_list_ids", list(list_ids), type_=ARRAY(UserList.id.type)
+        )
+        return (
+            select(
+                func.array_position(ids, UserListItem.list_id).label("position"),
+                UserListItem.item_key.label("key"),
+                UserListItem.value.label("value"),
+            )
+            .where(UserListItem.list_id == any_(ids))
+            .subquery("list_item_rows")
+        )
+
+    async def create_combined_list(
+        self, creator_id: str, name: str, list_ids: List[UUID], operation: str
+    ) -> Optional[Dict[str, Any]]:
+        if self.dual_write:
+            metadata = await super().create_combined_list(
+                creator_id, name, list_ids, operation
+            )
+        else:
+            metadata = await self._insert_list(creator_id, name, {})
+        if metadata is None:
+            return None
+        combined = self._combined_item_rows(list_ids, operation)
+        copy_query = insert(UserListItem).from_select(
+            ["list_id", "item_key", "value"],
+            select(
+                literal(metadata["id"], UserListItem.list_id.type),
+                combined.c.key,
+                combined.c.value,
+            ),
+        )
+        await self.db_session.execute(copy_query)
+        return metadata
+
+    async def persist_user_list(self, user_id: str, user_list: UserList):
+        items = dict(user_list.items or {})
+        if not self.dual_write:
+            user_list.items = {}
+        await super().persist_user_list(user_id, user_list)
+        await self._upsert_items(user_list.id, items)
+        if not self.dual_write:
+            set_committed_value(user_list, "items", items)
+        return user_list
+
+    async def _query_all_lists(self, creator_id: str) -> List[UserList]:
+        user_lists = await super()._query_all_lists(creator_id)
+        await self._load_items(user_lists, from_primary=False)
+        return user_lists
+
+    async def get_lists_changed_since(
+        self, creator_id: str, since: Optional[datetime]
+    ) -> List[UserList]:
+        user_lists = await super().get_lists_changed_since(creator_id, since)
+        await self._load_items(user_lists)
+        return user_lists
+
+    async def get_lists_containing_item(
+        self, creator_id: str, item_key: str
+    ) -> List[Tuple[UUID, str]]:
+        if self.dual_write:
+            return await super().get_lists_containing_item(creator_id, item_key)
+        query = (
+            select(UserList.id, UserList.name)
+            .join(UserListItem, UserListItem.list_id == UserList.id)
+            .where(UserList.creator == creator_id)
+            .where(UserListItem.item_key == item_key)
+            .order_by(UserList.id)
+        )
+        result = await self._execute_read(query, creator_id)
+        return [tuple(row) for row in result.all()]
+
+    async def get_list_or_none(self, query) -> Optional[UserList]:
+        user_list = await super().get_list_or_none(query)
+        await self._load_items([user_list])
+        return user_list
+
+    async def get_list(
+        self, identifier: Union[UUID, Tuple[str, str]], by: str = "id"
+    ) -> Optional[UserList]:
+        user_list = await super().get_list(identifier, by)
+        await self._load_items([user_list])
+        return user_list
+
+    async def _query_user_list_by_list_id(self, list_id: UUID) -> Optional[UserList]:
+        user_list = await super()._query_user_list_by_list_id(list_id)
+        await self._load_items([user_list], from_primary=False)
+        return user_list
+
+    async def get_user_lists_by_creator_id(self, creator_id: str):
+        user_lists = await super().get_user_lists_by_creator_id(creator_id)
+        await self._load_items(user_lists)
+        return user_lists
+
+    async def grab_all_lists_that_exist(
+        self, by: str, identifier_list
+    ) -> List[UserList]:
+        user_lists = await super().grab_all_lists_that_exist(by, identifier_list)
+        await self._load_items(user_lists)
+        return user_lists
+
+    async def get_list_item_count(self, list_id: UUID) -> Optional[int]:
+        if self.dual_write:
+            return await super().get_list_item_count(list_id)
+        query = select(
+            select(func.count())
+            .where(UserListItem.list_id == UserList.id)
+            .scalar_subquery()
+        ).where(UserList.id == list_id)
+        row = (await self._execute_read(query, list_id)).one_or_none()
+        return None if row is None else row[0]
+
+    async def get_list_and_item_count(self, creator_id: str) -> tuple:
+        if self.dual_write:
+            return await super().get_list_and_item_count(creator_id)
+        query = (
+            select(func.count(distinct(UserList.id)), func.count(UserListItem.item_key))
+            .select_from(UserList)
+            .outerjoin(UserListItem, UserListItem.list_id == UserList.id)
+            .where(UserList.creator == creator_id)
+        )
+        list_count, item_count = (await self._execute_read(query, creator_id)).one()
+        return list_count, item_count
+
+    async def update_and_persist_list(
+        self,
+        list_to_update_id: UUID,
+        changes_to_make: Dict[str, Any],
+        expected_versions: Optional[List[int]] = None,
+    ) -> UserList:
+        if "items" not in changes_to_make:
+            return await super().update_and_persist_list(
+                list_to_update_id, changes_to_make, expected_versions
+            )
+        new_items = dict(changes_to_make["items"] or {})
+        if self.dual_write:
+            # rewrite every row so the rows also converge with the items column
+            await self._delete_items(list_to_update_id)
+            await self._upsert_items(list_to_update_id, new_items)
+            return await super().update_and_persist_list(
+                list_to_update_id, changes_to_make, expected_versions
+            )
+
+        old_list = await self.get_existing_list_or_throw(list_to_update_id)
+        self._ensure_version_matches(old_list.version, expected_versions)
+        old_items = old_list.items
+        removed_keys = [item_key for item_key in old_items if item_key not in new_items]
+        changed_items = {
+            item_key: value
+            for item_key, value in new_items.items()
+            if item_key not in old_items or old_items[item_key] != value
+        }
+        await self._delete_items(list_to_update_id, removed_keys)
+        await self._upsert_items(list_to_update_id, changed_items)
+        other_changes = {
+            key: value for key, value in changes_to_make.items() if key != "items"
+        }
+        # the list row may not otherwise change, but its version has to
+        other_changes["updated_time"] = datetime.now(timezone.utc)
+        updated_list = await super().update_and_persist_list(
+            list_to_update_id, other_changes, expected_versions
+        )
+        set_committed_value(updated_list, "items", new_items)
+        return updated_list
+
+    async def delete_all_lists(self, sub_id: str):
+        await self.db_session.execute(
+            delete(UserListItem)
+            .where(
+                UserListItem.list_id.in_(
+                    select(UserList.id).where(UserList.creator == sub_id)
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return await super().delete_all_lists(sub_id)
+
+    async def delete_list(self, list_id: UUID):
+        metrics_info = await super().delete_list(list_id)
+        await self._delete_items(list_id)
+        return metrics_info
+
+    async def delete_lists(
+        self, creator_id: str, list_ids: List[UUID]
+    ) -> Tuple[List[UUID], int]:
+        deleted_ids, item_count = await super().delete_lists(creator_id, list_ids)
+        if not deleted_ids:
+            return deleted_ids, item_count
+        query = (
+            delete(UserListItem)
+            .where(UserListItem.list_id.in_(deleted_ids))
+            .execution_options(synchronize_session=False)
+        )
+        rows_deleted = (await self.db_session.execute(query)).rowcount
+        return deleted_ids, item_count if self.dual_write else rows_deleted
+
+    async def delete_items_from_list(
+        self,
+        list_id: UUID,
+        item_keys: List[str],
+        expected_versions: Optional[List[int]] = None,
+    ) -> Optional[int]:
+        if self.dual_write:
+            removed = await super().delete_items_from_list(
+                list_id, item_keys, expected_versions
+            )
+            if removed is not None:
+                await self._delete_items(list_id, list(set(item_keys)))
+            return removed
+
+        query = update(UserList).where(UserList.id == list_id)
+        if expected_versions is not None:
+            query = query.where(UserList.version.in_(expected_versions))
+        query = (
+            query.values(
+                updated_time=datetime.now(timezone.utc), version=UserList.version + 1
+            )
+            .returning(UserList.creator)
+            .execution_options(synchronize_session="fetch")
+        )
+        creator = (await self.db_session.execute(query)).scalar_one_or_none()
+        if creator is None:
+            await self._ensure_list_unchanged(list_id, expected_versions)
+            return None
+        removed = await self._delete_items(list_id, list(set(item_keys)))
+        self._mark_write(creator, list_id)
+        return removed
+
+    async def patch_list(
+        self,
+        list_id: UUID,
+        name: str,
+        removed_keys: List[str],
+        updated_items: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        if self.dual_write:
+            metadata = await super().patch_list(
+                list_id, name, removed_keys, updated_items
+            )
+        else:
+            metadata = await super().patch_list(list_id, name, [], {})
+        if metadata is not None:
+            await self._delete_items(list_id, removed_keys)
+            await self._upsert_items(list_id, updated_items)
+        return metadata
+
+    async def add_items_to_list(
+        self,
+        list_id: UUID,
+        item_data: dict,
+        expected_versions: Optional[List[int]] = None,
+    ):
+        if self.dual_write:
+            user_list, metrics_info = await super().add_items_to_list(
+                list_id, item_data, expected_versions
+            )
+            await self._upsert_items(list_id, item_data)
+            return user_list, metrics_info
+
+        user_list = await self.get_existing_list_or_throw(list_id)
+        self._ensure_version_matches(user_list.version, expected_versions)
+        items_added = sum(
+            1 for item_key in item_data if item_key not in user_list.items
+        )
+        await self._upsert_items(list_id, item_data)
+        set_committed_value(user_list, "items", {**user_list.items, **item_data})
+        # the list row itself isn't otherwise changed, but its version has to
+        user_list.updated_time = datetime.now(timezone.utc)
+        await self._flush_list_changes(expected_versions)
+        self._mark_write(user_list.creator, list_id)
+        return user_list, MetricModel(
+            items_added=items_added, items_updated=len(item_data) - items_added
+        )
+
+
+def create_data_access_layer(
+    db_session: AsyncSession, replica_router: Optional[ReplicaRouter] = None
+) -> DataAccessLayer:
+    """
+    Args:
+        db_session: session to act within
+        replica_router: optional router for read-only queries
+
+    Returns:
+        the data access layer for the configured ITEM_STORAGE
+    """
+    if config.ITEM_STORAGE == "jsonb":
+        return DataAccessLayer(db_session, replica_router)
+    return NormalizedItemsDataAccessLayer(
+        db_session, replica_router, dual_write=config.ITEM_STORAGE == "dual"
+    )
+
+
 async def get_data_access_layer() -> AsyncIterable[DataAccessLayer]:
     """
     Create an AsyncSession and yield an instance of the Data Access Layer,
@@ -397,4 +1955,10 @@ async def get_data_access_layer() -> AsyncIterable[DataAccessLayer]:
     """
     async with async_sessionmaker() as session:
         async with session.begin():
-            yield DataAccessLayer(session)
+            data_access_layer = create_data_access_layer(session, replica_router)
+            try:
+                yield data_access_layer
+                await data_access_layer.notify_changes()
+            finally:
+                await data_access_layer.close_replica_session()
+        data_access_layer.invalidate_cached_lists()
@@ -0,0 +1,258 @@
+"""
+Pushes list change notifications to clients.
+
+Writes NOTIFY a single Postgres channel when their transaction commits (see
+`DataAccessLayer.notify_changes`), with the creator whose lists changed in the payload. Each
+worker holds one connection LISTENing on that channel and fans the notifications out to the
+event streams (GET /lists/events) of that creator, so a user can be subscribed from many
+tabs/clients without each of them holding a database connection.
+
+Every subscriber has a bounded queue. A subscriber that can't keep up has its queued events
+replaced by a single "resync" event, telling it to catch up with GET /lists/changes instead.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from gen3userdatalibrary import config
+from gen3userdatalibrary.cache import list_cache_is_configured
+from gen3userdatalibrary.config import logging
+
+LIST_EVENTS_CHANNEL = "user_list_events"
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+
+
+def list_changes_are_broadcast() -> bool:
+    """
+    Returns:
+        True if writes NOTIFY the list events channel, which list events and the list cache
+        both need
+    """
+    return config.ENABLE_LIST_EVENTS or list_cache_is_configured()
+
+
+def make_notify_payload(creator_id: str, list_ids: Iterable) -> str:
+    """
+    Args:
+        creator_id: user whose lists changed
+        list_ids: ids of the lists that changed
+
+    Returns:
+        the NOTIFY payload for the change, which leaves out the ids if there are too many
+        to fit (subscribers then resync)
+    """
+    payload = json.dumps(
+        {"creator": creator_id, "ids": sorted(str(list_id) for list_id in list_ids)}
+    )
+    if len(payload.encode("utf-8")) >= MAX_NOTIFY_PAYLOAD_BYTES:
+        payload = json.dumps({"creator": creator_id, "ids": None})
+    return payload
+
+
+def get_listen_dsn() -> str:
+    """
+    Returns:
+        the configured database as a plain asyncpg connection string
+    """
+    url = make_url(str(config.DB_CONNECTION_STRING)).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class ListEventSubscription:
+    """
+    One client's stream of change events for a user's lists
+    """
+
+    def __init__(self, creator_id: str, max_queued: int):
+        self.creator_id = creator_id
+        # None in the queue means "resync"
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(max_queued, 1))
+
+    def put(self, list_ids: Optional[List[str]]):
+        """
+        Queue an event without waiting. If the queue is full, everything queued is dropped
+        in favour of a single resync event.
+
+        Args:
+            list_ids: ids of the lists that changed, or None if the subscriber should resync
+        """
+        if list_ids is not None:
+            try:
+                self.queue.put_nowait(list_ids)
+                return
+            except asyncio.QueueFull:
+                pass
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def next_event(self, timeout: float) -> Optional[str]:
+        """
+        Args:
+            timeout: seconds to wait for an event
+
+        Returns:
+            the next event formatted for a text/event-stream, or None if there wasn't one in time
+        """
+        try:
+            list_ids = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if list_ids is None:
+            return "event: resync\ndata: {}\n\n"
+        return f"event: lists_changed\ndata: {json.dumps({'ids': list_ids})}\n\n"
+
+
+class ListEventBroker:
+    """
+    Holds a worker's LISTEN connection and its subscribers, by creator
+    """
+
+    def __init__(self, dsn: str, max_queued: int = 100, reconnect_seconds: float = 5):
+        self.dsn = dsn
+        self.max_queued = max_queued
+        self.reconnect_seconds = reconnect_seconds
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopped = False
+        self._subscriptions: Dict[str, Set[ListEventSubscription]] = defaultdict(set)
+        self._change_listeners: List[
+            Callable[[Optional[str], Optional[list]], None]
+        ] = []
+
+    @property
+    def is_listening(self) -> bool:
+        """
+        Returns:
+            True while the LISTEN connection is open, so no notification can be missed
+        """
+        return self._connection is not None
+
+    def add_change_listener(
+        self, listener: Callable[[Optional[str], Optional[list]], None]
+    ):
+        """
+        Call `listener(creator_id, list_ids)` for every notification this worker gets, with
+        `(None, None)` whenever notifications may have been missed
+
+        Args:
+            listener: function to call
+        """
+        self._change_listeners.append(listener)
+
+    async def start(self):
+        """
+        Open the LISTEN connection
+        """
+        self._stopped = False
+        self._connection = await asyncpg.connect(self.dsn)
+        self._connection.add_termination_listener(self._on_connection_lost)
+        await self._connection.add_listener(LIST_EVENTS_CHANNEL, self._on_notification)
+
+    async def stop(self):
+        """
+        Close the LISTEN connection
+        """
+        self._stopped = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+    def subscribe(self, creator_id: str) -> ListEventSubscription:
+        """
+        Args:
+            creator_id: user to receive the change events of
+
+        Returns:
+            a new subscription, which must be passed to `unsubscribe` when the client leaves
+        """
+        subscription = ListEventSubscription(creator_id, self.max_queued)
+        self._subscriptions[creator_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ListEventSubscription):
+        """
+        Args:
+            subscription: subscription to stop sending events to
+        """
+        subscriptions = self._subscriptions.get(subscription.creator_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.creator_id]
+
+    def publish(self, creator_id: str, list_ids: Optional[List[str]]):
+        """
+        Send a change event to every subscriber of a user in this worker
+
+        Args:
+            creator_id: user whose lists changed
+            list_ids: ids of the lists that changed, or None if subscribers should resync
+        """
+        for subscription in self._subscriptions.get(creator_id, ()):
+            subscription.put(list_ids)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        """
+        asyncpg listener callback for NOTIFYs on the list events channel
+        """
+        try:
+            message = json.loads(payload)
+            creator_id, list_ids = message["creator"], message["ids"]
+        except (ValueError, KeyError, TypeError):
+            logging.warning(f"Ignoring malformed list event: {payload!r}")
+            return
+        self._notify_change_listeners(creator_id, list_ids)
+        self.publish(creator_id, list_ids)
+
+    def _notify_change_listeners(
+        self, creator_id: Optional[str], list_ids: Optional[list]
+    ):
+        """
+        Args:
+            creator_id: user whose lists changed, None if unknown
+            list_ids: ids of the lists that changed, None if unknown
+        """
+        for listener in self._change_listeners:
+            listener(creator_id, list_ids)
+
+    def _on_connection_lost(self, connection):
+        """
+        asyncpg termination callback, reopens the connection
+        """
+        if self._stopped or connection is not self._connection:
+            return
+        logging.warning("Lost the list events LISTEN connection, reconnecting")
+        self._connection = None
+        self._notify_change_listeners(None, None)
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        """
+        Reopen the LISTEN connection, retrying until it succeeds or the broker is stopped.
+        Notifications may have been missed meanwhile, so every subscriber then resyncs.
+        """
+        while not self._stopped:
+            try:
+                await self.start()
+            except (OSError, asyncpg.PostgresError) as exc:
+                logging.warning(f"Could not reopen the list events connection: {exc}")
+                await asyncio.sleep(self.reconnect_seconds)
+            else:
+                self._reconnect_task = None
+                self._notify_change_listeners(None, None)
+                for subscriptions in self._subscriptions.values():
+                    for subscription in subscriptions:
+                        subscription.put(None)
+                return
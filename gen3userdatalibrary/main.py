@@ -13,7 +13,18 @@ from starlette.requests import Request
 from gen3userdatalibrary import config
 from gen3userdatalibrary.auth import get_user_id
 from gen3userdatalibrary.config import logging
-from gen3userdatalibrary.db import get_data_access_layer, DataAccessLayer
+from gen3userdatalibrary.cache import list_cache, list_cache_is_configured
+from gen3userdatalibrary.db import (
+    get_data_access_layer,
+    DataAccessLayer,
+    read_coalescer,
+    replica_router,
+)
+from gen3userdatalibrary.events import (
+    ListEventBroker,
+    get_listen_dsn,
+    list_changes_are_broadcast,
+)
 from gen3userdatalibrary.metrics import Metrics
 from gen3userdatalibrary.routes.basic import basic_router
 from gen3userdatalibrary.routes.lists import lists_router
@@ -47,13 +58,16 @@ async def lifespan(app: FastAPI):
     """
     # startup
     app_with_setup = await add_metrics_and_arborist_client(app)
+    read_coalescer.metrics = app_with_setup.state.metrics
     await check_db_connection()
     if not config.DEBUG_SKIP_AUTH:
         await check_arborist_is_healthy(app_with_setup)
+    await start_list_events(app_with_setup)
 
     yield
 
     # teardown
+    await stop_list_events(app_with_setup)
 
     # NOTE: multiprocess.mark_process_dead is called by the gunicorn "child_exit" function for each worker  #
     # "child_exit" is defined in the gunicorn.conf.py
@@ -79,6 +93,43 @@ async def check_db_connection():
         raise
 
 
+async def start_list_events(app):
+    """
+    Open this worker's LISTEN connection for list change events, if list events or the
+    list cache are enabled
+
+    Args:
+        app (FastAPI): the app to keep the broker on, as `app.state.list_events`
+    """
+    app.state.list_events = None
+    if not list_changes_are_broadcast():
+        return
+    broker = ListEventBroker(get_listen_dsn(), max_queued=config.LIST_EVENTS_QUEUE_SIZE)
+    broker.add_change_listener(read_coalescer.forget)
+    if replica_router is not None:
+        # other workers' writes are read from the primary for a while too, so a replica
+        # that hasn't caught up can't refill the list cache with the old lists
+        broker.add_change_listener(replica_router.mark_notified_write)
+    if list_cache_is_configured():
+        list_cache.attach(broker, app.state.metrics)
+    await broker.start()
+    app.state.list_events = broker
+
+
+async def stop_list_events(app):
+    """
+    Close this worker's LISTEN connection for list change events, if there is one
+
+    Args:
+        app (FastAPI): the app the broker was kept on
+    """
+    broker = getattr(app.state, "list_events", None)
+    if broker is not None:
+        list_cache.detach()
+        await broker.stop()
+        app.state.list_events = None
+
+
 async def check_arborist_is_healthy(app_with_setup):
     """
     Checks that we can talk to arborist
@@ -20,6 +20,18 @@ API_REQUESTS_COUNTER = {
     "all CRUD actions.",
 }
 
+LIST_CACHE_COUNTER = {
+    "name": "gen3_user_data_library_list_cache",
+    "description": "Gen3 User Data Library list cache lookups and evictions, by event (hit, "
+    "miss or eviction) and tier (local to the worker, or shared by the host's workers).",
+}
+
+COALESCED_READS_COUNTER = {
+    "name": "gen3_user_data_library_coalesced_reads",
+    "description": "Gen3 User Data Library reads that joined an identical query already in "
+    "flight instead of running their own, by query.",
+}
+
 
 class Metrics(BaseMetrics):
     def __init__(self, prometheus_dir: str, enabled: bool = True) -> None:
@@ -84,3 +96,30 @@ class Metrics(BaseMetrics):
             return
 
         self.increment_counter(labels=kwargs, **API_REQUESTS_COUNTER)
+
+    def add_list_cache_event(self, **kwargs: Dict[str, Any]) -> None:
+        """
+        Increment the counter for list cache events.
+
+        Args:
+            **kwargs: Arbitrary keyword arguments used as labels for the counter.
+                must contain event: hit, miss or eviction
+                and tier: local or shared
+        """
+        if not self.enabled:
+            return
+
+        self.increment_counter(labels=kwargs, **LIST_CACHE_COUNTER)
+
+    def add_coalesced_read(self, **kwargs: Dict[str, Any]) -> None:
+        """
+        Increment the counter for reads deduplicated by joining an identical query.
+
+        Args:
+            **kwargs: Arbitrary keyword arguments used as labels for the counter.
+                must contain query: the kind of read, e.g. all_lists or list
+        """
+        if not self.enabled:
+            return
+
+        self.increment_counter(labels=kwargs, **COALESCED_READS_COUNTER)
@@ -1,15 +1,31 @@
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import UUID, Column, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    UUID,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import declarative_base
 
+from gen3userdatalibrary import config
+
 Base = declarative_base()
 
+# postgres requires the partition key to be part of every unique constraint on a partitioned
+# table, so when partitioned the primary key becomes (id, creator)
+IS_USER_LISTS_PARTITIONED = config.USER_LISTS_HASH_PARTITIONS > 0
+
 USER_LIST_UPDATE_ALLOW_LIST = {"items", "name", "updated_time"}
 
 
@@ -41,6 +57,47 @@ class ItemToUpdateModel(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class ItemKeysModel(BaseModel):
+    keys: List[str] = Field(min_length=1)
+    model_config = ConfigDict(extra="forbid")
+
+
+class ListIdsModel(BaseModel):
+    ids: List[uuid.UUID] = Field(min_length=1, max_length=config.MAX_BATCH_LIST_IDS)
+    model_config = ConfigDict(extra="forbid")
+
+
+class CloneListModel(BaseModel):
+    name: str = Field(min_length=1)
+    model_config = ConfigDict(extra="forbid")
+
+
+class CombineListsModel(BaseModel):
+    """
+    union: items in any of the lists, later lists winning when keys collide
+    intersection: items in all of the lists, as they are in the first list
+    difference: items of the first list that aren't in any of the others
+    """
+
+    name: str = Field(min_length=1)
+    operation: Literal["union", "intersection", "difference"]
+    ids: List[uuid.UUID] = Field(min_length=2, max_length=config.MAX_BATCH_LIST_IDS)
+    model_config = ConfigDict(extra="forbid")
+
+
+class JsonPatchOperationModel(BaseModel):
+    """
+    One operation of an RFC 6902 JSON Patch, e.g.
+    {"op": "replace", "path": "/items/CF_1/name", "value": "Cohort Filter 2"}
+    """
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(default=None, alias="from")
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+
 class UpdateItemsModel(BaseModel):
     lists: List[ItemToUpdateModel]
     model_config = {
@@ -99,26 +156,45 @@ class UserList(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False
     )
     version = Column(Integer, nullable=False)
-    creator = Column(String, nullable=False, index=True)
+    creator = Column(
+        String, nullable=False, index=True, primary_key=IS_USER_LISTS_PARTITIONED
+    )
     authz = Column(JSONB, nullable=False)
 
     name = Column(String, nullable=False)
 
     created_time = Column(
         DateTime(timezone=True),
-        default=datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
     updated_time = Column(
         DateTime(timezone=True),
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
 
     items = Column(MutableDict.as_mutable(JSONB))
 
-    __table_args__ = (UniqueConstraint("name", "creator", name="_name_creator_uc"),)
+    __table_args__ = (
+        UniqueConstraint("name", "creator", name="_name_creator_uc"),
+        # supports looking up which lists contain an item key (the `?` operator)
+        Index("ix_user_lists_items_gin", "items", postgresql_using="gin"),
+        # supports finding a user's lists changed since a sync (GET /lists/changes)
+        Index("ix_user_lists_creator_updated_time", "creator", "updated_time"),
+        (
+            {"postgresql_partition_by": "HASH (creator)"}
+            if IS_USER_LISTS_PARTITIONED
+            else {}
+        ),
+    )
+    # every UPDATE through the ORM is `... WHERE version = <version it was read at>` and
+    # bumps the version, so a concurrent change makes the flush fail instead of being lost
+    __mapper_args__ = {
+        "version_id_col": version,
+        "version_id_generator": lambda version: 0 if version is None else version + 1,
+    }
 
     def to_dict(self) -> Dict:
         return {
@@ -137,6 +213,67 @@ class UserList(Base):
         }
 
 
+class UserListItem(Base):
+    """
+    One item of a list, used instead of `UserList.items` when ITEM_STORAGE is "dual" or
+    "normalized". There's no foreign key to user_lists since its primary key includes
+    `creator` when partitioned, so the data access layer deletes a list's items itself.
+    """
+
+    __tablename__ = "user_list_items"
+
+    list_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    item_key = Column(String, primary_key=True, nullable=False)
+    value = Column(JSONB, nullable=False)
+
+
+class UserListDeletion(Base):
+    """
+    A list that was deleted, so GET /lists/changes can tell clients to drop it. Only kept
+    for LIST_DELETIONS_RETENTION_DAYS.
+    """
+
+    __tablename__ = "user_list_deletions"
+
+    list_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    creator = Column(String, nullable=False)
+    deleted_time = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_user_list_deletions_creator_deleted_time", "creator", "deleted_time"),
+    )
+
+
+def get_hash_partition_ddl(table_name: str, partitions: int) -> List[str]:
+    """
+    Builds the statements that create the partitions of a hash partitioned table
+
+    Args:
+        table_name: name of the partitioned (parent) table
+        partitions: number of partitions, which is the modulus of the hash
+
+    Returns:
+        one CREATE TABLE ... PARTITION OF statement per partition
+    """
+    return [
+        f"CREATE TABLE IF NOT EXISTS {table_name}_p{remainder} PARTITION OF {table_name} "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+
+
+# partitions are plain tables as far as the ORM is concerned, so create them whenever
+# the partitioned table is created (dropping the parent drops them as well)
+for partition_statement in get_hash_partition_ddl(
+    UserList.__tablename__, config.USER_LISTS_HASH_PARTITIONS
+):
+    event.listen(UserList.__table__, "after_create", DDL(partition_statement))
+
+
 def is_dict(v: Any):
     assert isinstance(v, dict)
     return v
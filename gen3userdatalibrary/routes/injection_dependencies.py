@@ -26,6 +26,8 @@ from gen3userdatalibrary.routes.route_configurations import (
 )
 from gen3userdatalibrary.utils.core import build_switch_case
 
+JSON_PATCH_CONTENT_TYPE = "application/json-patch+json"
+
 
 async def validate_upsert_items(lists_to_upsert, dal, user_id):
     """
@@ -168,14 +170,24 @@ async def parse_and_auth_request(request: Request):
         raise Exception(f"Undefined route '{route_function}', unable to auth")
 
     endpoint_context = ENDPOINT_TO_CONTEXT[route_function]
-    resource = get_resource_from_endpoint_context(
-        endpoint_context, user_id, path_params
-    )
+    try:
+        # only endpoints whose resources come from the body need it parsed
+        body = json.loads(await request.body()) if "ids" in endpoint_context else None
+        resource = get_resource_from_endpoint_context(
+            endpoint_context, user_id, path_params, body
+        )
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unable to find the list ids in the request body",
+        )
+    # a batch of lists is authorized in one request to arborist
+    authz_resources = resource if isinstance(resource, list) else [resource]
     logging.debug(f"Authorizing user: {user_id}")
     await authorize_request(
         request=request,
         authz_access_method=endpoint_context["method"],
-        authz_resources=[resource],
+        authz_resources=authz_resources,
     )
 
 
@@ -294,6 +306,18 @@ def raise_exception(e):
     raise e
 
 
+def is_json_patch_request(request: Request) -> bool:
+    """
+    Args:
+        request (Request): fastapi request entity
+
+    Returns:
+        whether the body is an RFC 6902 JSON Patch rather than plain json
+    """
+    content_type = request.headers.get("content-type", "")
+    return content_type.split(";")[0].strip().lower() == JSON_PATCH_CONTENT_TYPE
+
+
 async def validate_items(
     request: Request, dal: DataAccessLayer = Depends(get_data_access_layer)
 ):
@@ -308,6 +332,9 @@ async def validate_items(
         HTTPException if body is not correctly formatted
     """
     route_function = request.scope["route"].name
+    if route_function == "append_items_to_list" and is_json_patch_request(request):
+        # only the items a patch touches are known, so they're validated once it's applied
+        return
     endpoint_context = ENDPOINT_TO_CONTEXT.get(route_function, {})
     conformed_body = json.loads(await request.body())
     user_id = await get_user_id(request=request)
@@ -373,16 +400,14 @@ async def validate_items_to_append(
         dal (DataAccessLayer): data access interface
         list_id (UUID): id of list
     Raises:
-        ValueError if list not found
-        HTTP Exception if error checking item length
+        HTTPException if list not found or if there would be too many items
     """
-    try:
-        list_to_append = await dal.get_existing_list_or_throw(list_id)
-    except ValueError:
+    existing_item_count = await dal.get_list_item_count(list_id)
+    if existing_item_count is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="list_id not recognized!"
         )
-    ensure_items_less_than_max(len(item_list), len(list_to_append.items))
+    ensure_items_less_than_max(len(item_list), existing_item_count)
 
 
 # endregion
@@ -1,32 +1,47 @@
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, AsyncIterator, List, Optional, Tuple
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from starlette import status
 from starlette.responses import JSONResponse
 
 from gen3userdatalibrary.auth import (
     get_user_id,
 )
+from gen3userdatalibrary import config
+from gen3userdatalibrary.cache import list_cache
 from gen3userdatalibrary.config import logging
 from gen3userdatalibrary.db import DataAccessLayer, get_data_access_layer
+from gen3userdatalibrary.events import ListEventBroker
 from gen3userdatalibrary.models.helpers import (
     try_conforming_list,
     derive_changes_to_make,
 )
 from gen3userdatalibrary.models.user_list import (
+    CombineListsModel,
     ItemToUpdateModel,
+    ListIdsModel,
     UpdateItemsModel,
     UserList,
     UserListResponseModel,
 )
 from gen3userdatalibrary.routes.injection_dependencies import (
+    ensure_items_less_than_max,
     sort_lists_into_create_or_update,
     validate_items,
     validate_lists,
     parse_and_auth_request,
 )
+from gen3userdatalibrary.utils.core import (
+    as_isoformat,
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    make_etag,
+)
 from gen3userdatalibrary.utils.metrics import update_user_list_metric, MetricModel
 
 lists_router = APIRouter()
@@ -46,13 +61,17 @@ lists_router = APIRouter()
     ],
     response_model=UserListResponseModel,
     status_code=status.HTTP_200_OK,
-    description="Returns all lists that user can read",
+    description="Returns all lists that user can read. Responses carry an `ETag`; send "
+    "it back as `If-None-Match` to get a 304 if none of the lists have changed",
     summary="Get all of user's lists",
     responses={
         status.HTTP_200_OK: {
             "model": UserListResponseModel,
             "description": "A list of all user lists the user owns",
         },
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "None of the lists changed since the ETag in `If-None-Match`"
+        },
         status.HTTP_401_UNAUTHORIZED: {
             "description": "User unauthorized when accessing endpoint"
         },
@@ -69,7 +88,9 @@ async def read_all_lists(
     data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
 ) -> JSONResponse:
     """
-    Return all lists for user
+    Return all lists for user. If the request's If-None-Match has the current ETag of
+    the user's library, a 304 is returned after only reading the lists' versions.
+    Responses are served from this worker's list cache when it has them.
 
     Args:
         request (Request): FastAPI request (so we can check authorization)
@@ -78,6 +99,29 @@ async def read_all_lists(
     user_id = await get_user_id(request=request)
     # dynamically create user policy
 
+    if_none_match = request.headers.get("if-none-match")
+    cache_key = ("library", user_id)
+    cached = list_cache.get(cache_key)
+    if cached is not None:
+        if etag_matches(if_none_match, cached.etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": cached.etag}
+            )
+        return Response(
+            content=cached.body,
+            media_type="application/json",
+            headers={"ETag": cached.etag},
+        )
+    cache_read_token = list_cache.begin_read()
+
+    if if_none_match:
+        list_versions = await data_access_layer.get_list_versions(user_id)
+        etag = get_library_etag(list_versions)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
     try:
         user_lists = await data_access_layer.get_all_lists(user_id)
     except Exception as exc:
@@ -91,10 +135,422 @@ async def read_all_lists(
     id_to_list_dict = _map_list_id_to_list_dict(user_lists)
     json_conformed_data = jsonable_encoder(id_to_list_dict)
     response_data = {"lists": json_conformed_data}
+    etag = get_library_etag(
+        [
+            (user_list.id, user_list.updated_time, user_list.version)
+            for user_list in user_lists
+        ]
+    )
+
+    response = JSONResponse(
+        status_code=status.HTTP_200_OK, content=response_data, headers={"ETag": etag}
+    )
+    list_cache.put(
+        cache_key,
+        response.body,
+        etag,
+        [user_id, *(user_list.id for user_list in user_lists)],
+        cache_read_token,
+    )
+    return response
+
+
+@lists_router.get(
+    "/search",
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+    status_code=status.HTTP_200_OK,
+    description="Returns the id and name of each of the user's lists that contain the given item "
+    "key (e.g. a DRS URI), without returning any list contents",
+    summary="Find user's lists containing an item",
+    responses={
+        status.HTTP_200_OK: {
+            "description": "The lists containing the item, which may be none"
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Something went wrong internally when processing the request"
+        },
+    },
+)
+@lists_router.get(
+    "/search/",
+    include_in_schema=False,
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+)
+async def find_lists_containing_item(
+    request: Request,
+    item_key: str,
+    data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+) -> JSONResponse:
+    """
+    Find which of the user's lists contain an item
 
+    Args:
+        request (Request): FastAPI request (so we can check authorization)
+        item_key (str): key of the item to look for, e.g. a DRS URI
+        data_access_layer (DataAccessLayer): how we interface with db
+    """
+    user_id = await get_user_id(request=request)
+    matching_lists = await data_access_layer.get_lists_containing_item(
+        user_id, item_key
+    )
+    response_data = {
+        "lists": {str(list_id): {"name": name} for list_id, name in matching_lists}
+    }
     return JSONResponse(status_code=status.HTTP_200_OK, content=response_data)
 
 
+@lists_router.get(
+    "/changes",
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+    status_code=status.HTTP_200_OK,
+    description="Returns the user's lists created or updated since the `cursor` of a "
+    "previous response, and the ids of lists deleted since then under `deleted`. Without "
+    "`since`, every list is returned. Lists changed around the time a cursor was issued "
+    "can be returned again by the next sync",
+    summary="Get changes to user's lists since the last sync",
+    responses={
+        status.HTTP_200_OK: {
+            "description": "The changed lists, deleted ids and the cursor for the next sync"
+        },
+        status.HTTP_400_BAD_REQUEST: {"description": "Invalid cursor"},
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_410_GONE: {
+            "description": "The cursor is too old, sync again without `since`"
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Something went wrong internally when processing the request"
+        },
+    },
+)
+@lists_router.get(
+    "/changes/",
+    include_in_schema=False,
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+)
+async def get_list_changes(
+    request: Request,
+    data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+    since: Annotated[
+        Optional[str],
+        Query(
+            description="`cursor` from the previous sync, leave out to get every list"
+        ),
+    ] = None,
+) -> JSONResponse:
+    """
+    Incremental sync of the user's lists
+
+    Args:
+        request (Request): FastAPI request (so we can check authorization)
+        data_access_layer (DataAccessLayer): how we interface with db
+        since (str): cursor from the previous sync
+    """
+    user_id = await get_user_id(request=request)
+    since_time = None if since is None else get_time_from_changes_cursor(since)
+    # issued before reading, so nothing committed while reading can be missed
+    next_since_time = datetime.now(timezone.utc) - timedelta(
+        seconds=config.LIST_CHANGES_CURSOR_OVERLAP_SECONDS
+    )
+    changed_lists = await data_access_layer.get_lists_changed_since(user_id, since_time)
+    deleted_ids = (
+        []
+        if since_time is None
+        else await data_access_layer.get_lists_deleted_since(user_id, since_time)
+    )
+    response_data = {
+        "lists": jsonable_encoder(_map_list_id_to_list_dict(changed_lists)),
+        "deleted": [str(list_id) for list_id in deleted_ids],
+        "cursor": encode_cursor({"since": next_since_time.isoformat()}),
+    }
+    return JSONResponse(status_code=status.HTTP_200_OK, content=response_data)
+
+
+@lists_router.get(
+    "/events",
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+    status_code=status.HTTP_200_OK,
+    description="Streams server-sent events as the user's lists change. A `lists_changed` "
+    "event has the ids of the lists created, updated or deleted under `ids`. A `resync` "
+    "event means events were missed (e.g. the client fell behind), and the client should "
+    "catch up with GET /lists/changes",
+    summary="Subscribe to changes to user's lists",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "A text/event-stream of list changes",
+            "content": {"text/event-stream": {}},
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_404_NOT_FOUND: {"description": "List events are not enabled"},
+    },
+)
+@lists_router.get(
+    "/events/",
+    include_in_schema=False,
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+)
+async def get_list_events(request: Request) -> StreamingResponse:
+    """
+    Stream change events for the user's lists. Doesn't hold a database connection, events
+    come from the worker's shared LISTEN connection.
+
+    Args:
+        request (Request): FastAPI request (so we can check authorization)
+    """
+    broker = getattr(request.app.state, "list_events", None)
+    if broker is None or not config.ENABLE_LIST_EVENTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="List events are not enabled",
+        )
+    user_id = await get_user_id(request=request)
+    return StreamingResponse(
+        stream_list_events(broker, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@lists_router.post(
+    "/_batch_get",
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+    status_code=status.HTTP_200_OK,
+    description="Returns several lists by id at once. Ids of lists that don't exist are "
+    "returned under `not_found`, and ids of lists that belong to another user under "
+    "`forbidden`",
+    summary="Get several of user's lists by id",
+    responses={
+        status.HTTP_200_OK: {
+            "description": "The lists found, and the ids that couldn't be returned"
+        },
+        status.HTTP_400_BAD_REQUEST: {"description": "No list ids in the request"},
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Something went wrong internally when processing the request"
+        },
+    },
+)
+@lists_router.post(
+    "/_batch_get/",
+    include_in_schema=False,
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+)
+async def get_lists_by_ids(
+    request: Request,
+    list_ids: ListIdsModel,
+    data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+) -> JSONResponse:
+    """
+    Get several lists in one request, with one authorization and one query for all of them
+
+    Args:
+        request (Request): FastAPI request (so we can check authorization)
+        list_ids (ListIdsModel): ids of the lists to get
+        data_access_layer (DataAccessLayer): how we interface with db
+    """
+    user_id = await get_user_id(request=request)
+    requested_ids = list(dict.fromkeys(list_ids.ids))
+    existing_lists = await data_access_layer.grab_all_lists_that_exist(
+        "id", requested_ids
+    )
+    id_to_list = {user_list.id: user_list for user_list in existing_lists}
+
+    user_lists, not_found, forbidden = [], [], []
+    for list_id in requested_ids:
+        user_list = id_to_list.get(list_id)
+        if user_list is None:
+            not_found.append(list_id)
+        elif user_list.creator != user_id:
+            forbidden.append(list_id)
+        else:
+            user_lists.append(user_list)
+
+    response_data = {
+        "lists": _map_list_id_to_list_dict(user_lists),
+        "not_found": not_found,
+        "forbidden": forbidden,
+    }
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content=jsonable_encoder(response_data)
+    )
+
+
+@lists_router.post(
+    "/_batch_delete",
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+    status_code=status.HTTP_200_OK,
+    description="Deletes several lists by id at once. Ids of lists that don't exist are "
+    "returned under `not_found`, and ids of lists that belong to another user under "
+    "`forbidden`",
+    summary="Delete several of user's lists by id",
+    responses={
+        status.HTTP_200_OK: {
+            "description": "The ids deleted, and the ids that couldn't be deleted"
+        },
+        status.HTTP_400_BAD_REQUEST: {"description": "No list ids in the request"},
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Something went wrong internally when processing the request"
+        },
+    },
+)
+@lists_router.post(
+    "/_batch_delete/",
+    include_in_schema=False,
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+)
+async def delete_lists_by_ids(
+    request: Request,
+    list_ids: ListIdsModel,
+    data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+) -> JSONResponse:
+    """
+    Delete several lists in one request, with one authorization and one query for all
+    of them
+
+    Args:
+        request (Request): FastAPI request (so we can check authorization)
+        list_ids (ListIdsModel): ids of the lists to delete
+        data_access_layer (DataAccessLayer): how we interface with db
+    """
+    user_id = await get_user_id(request=request)
+    requested_ids = list(dict.fromkeys(list_ids.ids))
+    deleted_ids, items_deleted = await data_access_layer.delete_lists(
+        user_id, requested_ids
+    )
+
+    deleted = set(deleted_ids)
+    not_deleted_ids = [list_id for list_id in requested_ids if list_id not in deleted]
+    # whatever wasn't deleted either doesn't exist or belongs to someone else
+    existing_ids = set()
+    if not_deleted_ids:
+        existing_ids = set(
+            await data_access_layer.get_existing_list_ids(not_deleted_ids)
+        )
+
+    update_user_list_metric(
+        fastapi_app=request.app,
+        user_id=user_id,
+        **MetricModel(
+            lists_deleted=len(deleted_ids), items_deleted=items_deleted
+        ).model_dump(),
+    )
+    response_data = {
+        "deleted": deleted_ids,
+        "not_found": [
+            list_id for list_id in not_deleted_ids if list_id not in existing_ids
+        ],
+        "forbidden": [
+            list_id for list_id in not_deleted_ids if list_id in existing_ids
+        ],
+    }
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content=jsonable_encoder(response_data)
+    )
+
+
+@lists_router.post(
+    "/_combine",
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+    status_code=status.HTTP_201_CREATED,
+    description="Creates a new list out of two or more of the user's lists: the `union` "
+    "of their items (later lists winning when keys collide), their `intersection` (items "
+    "as they are in the first list) or the `difference` of the first list and the rest",
+    summary="Combine user's lists into a new list",
+    responses={
+        status.HTTP_201_CREATED: {"description": "Metadata of the new list"},
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_404_NOT_FOUND: {"description": "Could not find one of the ids"},
+        status.HTTP_409_CONFLICT: {
+            "description": "Name already taken, or too many items in the new list"
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Something went wrong internally when processing the request"
+        },
+    },
+)
+@lists_router.post(
+    "/_combine/",
+    include_in_schema=False,
+    dependencies=[
+        Depends(parse_and_auth_request),
+    ],
+)
+async def combine_lists(
+    request: Request,
+    lists_to_combine: CombineListsModel,
+    data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+) -> JSONResponse:
+    """
+    Create a list from a set operation on the items of other lists, in the database
+
+    Args:
+        request (Request): FastAPI request (so we can check authorization)
+        lists_to_combine (CombineListsModel): name of the new list, operation and list ids
+        data_access_layer (DataAccessLayer): how we interface with db
+    """
+    return await create_list_from_lists(
+        request,
+        data_access_layer,
+        lists_to_combine.name,
+        lists_to_combine.ids,
+        lists_to_combine.operation,
+    )
+
+
 @lists_router.put(
     # most of the following stuff helps populate the openapi docs
     "",
@@ -231,6 +687,76 @@ async def delete_all_lists(
 # region Helpers
 
 
+async def stream_list_events(
+    broker: ListEventBroker, user_id: str
+) -> AsyncIterator[str]:
+    """
+    Args:
+        broker (ListEventBroker): the worker's list events broker
+        user_id (str): user to stream the list events of
+
+    Returns:
+        the user's list events formatted for a text/event-stream, with keepalive comments
+        while there are none, until the client disconnects
+    """
+    subscription = broker.subscribe(user_id)
+    try:
+        yield ": subscribed\n\n"
+        while True:
+            event = await subscription.next_event(config.LIST_EVENTS_KEEPALIVE_SECONDS)
+            yield ": keepalive\n\n" if event is None else event
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def get_time_from_changes_cursor(cursor: str) -> datetime:
+    """
+    Args:
+        cursor (str): a cursor issued by GET /lists/changes
+
+    Returns:
+        the time to sync changes from
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed, or 410 if deletions from back then
+            may have been forgotten already
+    """
+    try:
+        since_time = datetime.fromisoformat(decode_cursor(cursor)["since"])
+        if since_time.tzinfo is None:
+            raise ValueError("Cursor time has no timezone")
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    retention = timedelta(days=config.LIST_DELETIONS_RETENTION_DAYS)
+    if since_time < datetime.now(timezone.utc) - retention:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="The cursor is too old, sync again without `since`",
+        )
+    return since_time
+
+
+def get_library_etag(list_versions: List[Tuple[UUID, datetime, int]]) -> str:
+    """
+    The ETag of all of a user's lists, which changes whenever any list is created,
+    changed or deleted
+
+    Args:
+        list_versions: (id, updated_time, version) of each of the user's lists
+
+    Returns:
+        the strong ETag of the user's library
+    """
+    return make_etag(
+        *sorted(
+            (str(list_id), as_isoformat(updated_time), version)
+            for list_id, updated_time, version in list_versions
+        )
+    )
+
+
 def _map_list_id_to_list_dict(new_user_lists: List[UserList]):
     """
     maps list id => user list, remove user list id from user list (as dict)
@@ -324,4 +850,63 @@ async def persist_lists_to_update(
     return updated_list
 
 
+async def create_list_from_lists(
+    request: Request,
+    data_access_layer: DataAccessLayer,
+    name: str,
+    list_ids: List[UUID],
+    operation: str,
+) -> JSONResponse:
+    """
+    Create a list out of the items of some of the user's existing lists, without the
+    items ever leaving the database. They were validated when they were first saved, so
+    they aren't validated again
+
+    Args:
+        request (Request): FastAPI request
+        data_access_layer (DataAccessLayer): how we interface with db
+        name (str): name of the new list
+        list_ids (List[UUID]): ids of the lists to create it from, a single list is cloned
+        operation (str): union, intersection or difference
+
+    Returns:
+        JSONResponse: the metadata of the new list
+    """
+    user_id = await get_user_id(request=request)
+    list_ids = list(dict.fromkeys(list_ids))
+    creators = await data_access_layer.get_list_creators(list_ids)
+    for list_id in list_ids:
+        if list_id not in creators:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No UserList found with id {list_id}",
+            )
+        if creators[list_id] != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"UserList {list_id} belongs to another user",
+            )
+    await data_access_layer.ensure_user_has_not_reached_max_lists(user_id, 1)
+    item_count = await data_access_layer.count_combined_items(list_ids, operation)
+    ensure_items_less_than_max(item_count)
+
+    list_metadata = await data_access_layer.create_combined_list(
+        user_id, name, list_ids, operation
+    )
+    if list_metadata is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A list with that name already exists",
+        )
+
+    update_user_list_metric(
+        fastapi_app=request.app,
+        user_id=user_id,
+        **MetricModel(lists_added=1, items_added=item_count).model_dump(),
+    )
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED, content=jsonable_encoder(list_metadata)
+    )
+
+
 # endregion
@@ -1,20 +1,42 @@
-from typing import Any, Dict
+import hashlib
+import re
+from typing import Annotated, Any, Dict, List, Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from starlette import status
 from starlette.responses import JSONResponse, Response
 
+from gen3userdatalibrary import config
 from gen3userdatalibrary.auth import get_user_id
+from gen3userdatalibrary.cache import list_cache
 from gen3userdatalibrary.db import DataAccessLayer, get_data_access_layer
 from gen3userdatalibrary.models.helpers import create_user_list_instance
-from gen3userdatalibrary.models.user_list import ItemToUpdateModel
+from gen3userdatalibrary.models.user_list import (
+    CloneListModel,
+    ItemKeysModel,
+    ItemToUpdateModel,
+    JsonPatchOperationModel,
+)
 from gen3userdatalibrary.routes.injection_dependencies import (
+    ensure_items_less_than_max,
+    is_json_patch_request,
     validate_items,
+    validate_user_list_item,
     parse_and_auth_request,
 )
-from gen3userdatalibrary.utils.metrics import update_user_list_metric
+from gen3userdatalibrary.routes.lists import create_list_from_lists
+from gen3userdatalibrary.utils.core import (
+    apply_json_patch,
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    parse_json_pointer,
+)
+from gen3userdatalibrary.utils.metrics import MetricModel, update_user_list_metric
 
 only_auth_deps = [Depends(parse_and_auth_request)]
 auth_and_items_deps = [Depends(parse_and_auth_request), Depends(validate_items)]
@@ -26,10 +48,14 @@ lists_by_id_router = APIRouter()
     "/{list_id}",
     dependencies=only_auth_deps,
     status_code=status.HTTP_200_OK,
-    description="Retrieves the list identified by the id for the user",
+    description="Retrieves the list identified by the id for the user. Responses carry "
+    "an `ETag`; send it back as `If-None-Match` to get a 304 if the list hasn't changed",
     summary="Get user's list by id",
     responses={
         status.HTTP_200_OK: {"description": "Successfully got id"},
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "The list hasn't changed since the ETag in `If-None-Match`"
+        },
         status.HTTP_401_UNAUTHORIZED: {
             "description": "User unauthorized when accessing endpoint"
         },
@@ -51,35 +77,185 @@ async def get_list_by_id(
     list_id: UUID,
     request: Request,
     data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+    item_type: Annotated[
+        Optional[str],
+        Query(
+            alias="type", description="Only return items of this type, e.g. GA4GH_DRS"
+        ),
+    ] = None,
+    key_prefix: Annotated[
+        Optional[str], Query(description="Only return items whose key starts with this")
+    ] = None,
+    dataset_guid: Annotated[
+        Optional[str], Query(description="Only return items with this dataset_guid")
+    ] = None,
+    limit: Annotated[
+        Optional[int],
+        Query(
+            ge=1,
+            le=config.MAX_ITEMS_PAGE_SIZE,
+            description="Max number of items to return",
+        ),
+    ] = None,
+    offset: Annotated[
+        Optional[int], Query(ge=0, description="Number of matching items to skip")
+    ] = None,
 ) -> JSONResponse:
     """
-    Find list by its id
+    Find list by its id. If any of the item filters or pagination params are given, only
+    the matching page of items (ordered by key) is returned, along with the total number
+    of matching items. If the request's If-None-Match has the list's current ETag, a 304
+    is returned after only reading the list's metadata. Responses are served from this
+    worker's list cache when it has them.
 
     Args:
          list_id (UUID): the id of the list you wish to retrieve
          request (Request): FastAPI request (so we can check authorization)
          data_access_layer (DataAccessLayer): how we interface with db
+         item_type (str): only return items of this type
+         key_prefix (str): only return items whose key starts with this
+         dataset_guid (str): only return items with this dataset_guid
+         limit (int): max number of items to return
+         offset (int): number of matching items to skip
 
     Returns:
-        JSONResponse: simple status and timestamp in format: `{"status": "OK", "timestamp": time.time()}`
+        JSONResponse: the list, 304 if the client's copy is current, or 404 if it doesn't exist
     """
-    result = await data_access_layer.get_user_list_by_list_id(list_id)
-    if result is None:
-        response = JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND, content="list_id not found!"
+    if_none_match = request.headers.get("if-none-match")
+    cache_key = ("list", str(list_id), request.url.query)
+    cached = list_cache.get(cache_key)
+    if cached is not None:
+        if etag_matches(if_none_match, cached.etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": cached.etag}
+            )
+        return Response(
+            content=cached.body,
+            media_type="application/json",
+            headers={"ETag": cached.etag},
+        )
+    cache_read_token = list_cache.begin_read()
+
+    if if_none_match:
+        list_metadata = await data_access_layer.get_list_metadata(list_id)
+        if list_metadata is not None:
+            etag = get_list_etag(request, list_metadata)
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+
+    item_query_params = (item_type, key_prefix, dataset_guid, limit, offset)
+    if any(param is not None for param in item_query_params):
+        data = await get_filtered_list_by_id(
+            data_access_layer,
+            list_id,
+            item_type,
+            key_prefix,
+            dataset_guid,
+            limit or config.ITEMS_PAGE_SIZE,
+            offset or 0,
         )
     else:
-        data = jsonable_encoder(result)
-        response = JSONResponse(status_code=status.HTTP_200_OK, content=data)
+        result = await data_access_layer.get_user_list_by_list_id(list_id)
+        data = None if result is None else jsonable_encoder(result)
 
+    if data is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND, content="list_id not found!"
+        )
+    etag = get_list_etag(request, data)
+    response = JSONResponse(
+        status_code=status.HTTP_200_OK, content=data, headers={"ETag": etag}
+    )
+    list_cache.put(cache_key, response.body, etag, [list_id], cache_read_token)
     return response
 
 
+@lists_by_id_router.get(
+    "/{list_id}/items",
+    dependencies=only_auth_deps,
+    status_code=status.HTTP_200_OK,
+    description="Retrieves a page of the list's items in key order. Pass the returned "
+    "`next_cursor` as `cursor` to get the following page",
+    summary="Get page of list's items",
+    responses={
+        status.HTTP_200_OK: {"description": "Successfully got items"},
+        status.HTTP_400_BAD_REQUEST: {"description": "Invalid cursor"},
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_404_NOT_FOUND: {"description": "Could not find id"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Something went wrong internally when processing the request"
+        },
+    },
+)
+@lists_by_id_router.get(
+    "/{list_id}/items/",
+    include_in_schema=False,
+    dependencies=only_auth_deps,
+)
+async def get_list_items(
+    list_id: UUID,
+    request: Request,
+    data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+    limit: Annotated[
+        int,
+        Query(
+            ge=1,
+            le=config.MAX_ITEMS_PAGE_SIZE,
+            description="Max number of items to return",
+        ),
+    ] = config.ITEMS_PAGE_SIZE,
+    cursor: Annotated[
+        Optional[str],
+        Query(description="Cursor from the previous page, omit for the first page"),
+    ] = None,
+) -> JSONResponse:
+    """
+    Get a page of a list's items, in stable key order
+
+    Args:
+         list_id (UUID): the id of the list you wish to retrieve items from
+         request (Request): FastAPI request (so we can check authorization)
+         data_access_layer (DataAccessLayer): how we interface with db
+         limit (int): max number of items to return
+         cursor (str): `next_cursor` from the previous page
+
+    Returns:
+         JSONResponse: the page of items, the total number of items in the list and the
+            cursor for the next page (null on the last page)
+    """
+    after_key = None
+    if cursor is not None:
+        try:
+            after_key = str(decode_cursor(cursor)["key"])
+        except (ValueError, KeyError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor!"
+            )
+
+    result = await data_access_layer.get_list_items_after_key(list_id, after_key, limit)
+    if result is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND, content="list_id not found!"
+        )
+    items, total, has_more = result
+    next_cursor = encode_cursor({"key": list(items)[-1]}) if has_more else None
+    data = {"items": items, "total": total, "next_cursor": next_cursor}
+    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(data))
+
+
 @lists_by_id_router.put(
     "/{list_id}",
     dependencies=auth_and_items_deps,
     status_code=status.HTTP_200_OK,
-    description="Updates contents of user list by id, name or items",
+    description="Updates contents of user list by id, name or items. Send the list's "
+    "`ETag` as `If-Match` to only update it if it hasn't changed since",
     summary="Update list by id",
     responses={
         status.HTTP_200_OK: {"description": "Successfully got id"},
@@ -93,6 +269,12 @@ async def get_list_by_id(
             "description": "User does not have access to requested data"
         },
         status.HTTP_404_NOT_FOUND: {"description": "Could not find id"},
+        status.HTTP_409_CONFLICT: {
+            "description": "The list was changed by a concurrent request"
+        },
+        status.HTTP_412_PRECONDITION_FAILED: {
+            "description": "The list has changed since the version in If-Match"
+        },
         status.HTTP_500_INTERNAL_SERVER_ERROR: {
             "description": "Something went wrong internally when processing the request"
         },
@@ -132,10 +314,14 @@ async def update_list_by_id(
     new_user_list = create_user_list_instance(user_id, info_to_update_with)
 
     replace_result, metrics_info = await data_access_layer.change_list_contents(
-        new_user_list, existing_list
+        new_user_list, existing_list, get_expected_versions(request)
     )
     data = jsonable_encoder(replace_result)
-    response = JSONResponse(status_code=status.HTTP_200_OK, content=data)
+    response = JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=data,
+        headers={"ETag": get_list_etag(request, data)},
+    )
 
     update_user_list_metric(
         fastapi_app=request.app,
@@ -149,7 +335,11 @@ async def update_list_by_id(
     "/{list_id}",
     dependencies=auth_and_items_deps,
     status_code=status.HTTP_200_OK,
-    description="Appends to the existing list",
+    description="Appends to the existing list. If the body is sent as "
+    "`application/json-patch+json`, it's instead applied as an RFC 6902 JSON Patch to "
+    "`/name` and `/items/{key}` (with `/` and `~` in keys escaped as `~1` and `~0`), and "
+    "only the list's metadata is returned. Send the list's `ETag` as `If-Match` to only "
+    "change it if it hasn't changed since",
     summary="Add to list",
     responses={
         status.HTTP_200_OK: {"description": "Successfully got id"},
@@ -163,7 +353,12 @@ async def update_list_by_id(
             "description": "User does not have access to requested data"
         },
         status.HTTP_404_NOT_FOUND: {"description": "Could not find id"},
-        status.HTTP_409_CONFLICT: {"description": "Nothing to append to list!"},
+        status.HTTP_409_CONFLICT: {
+            "description": "Nothing to append to list, or the patch couldn't be applied"
+        },
+        status.HTTP_412_PRECONDITION_FAILED: {
+            "description": "The list has changed since the version in If-Match"
+        },
         status.HTTP_500_INTERNAL_SERVER_ERROR: {
             "description": "Something went wrong internally when processing the request"
         },
@@ -177,21 +372,31 @@ async def update_list_by_id(
 async def append_items_to_list(
     request: Request,
     list_id: UUID,
-    item_list: Dict[str, Any],
+    item_list: Union[Dict[str, Any], List[Dict[str, Any]]],
     data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
 ) -> JSONResponse:
     """
-    Adds a list of provided items to an existing list
+    Adds a list of provided items to an existing list, or applies a JSON Patch to it
 
     Args:
          list_id (UUID): the id of the list you wish to retrieve
          request (Request): FastAPI request (so we can check authorization)
          data_access_layer (DataAccessLayer): how we interface with db
-         item_list (Dict[str, Any): the items to be appended
+         item_list (Dict[str, Any): the items to be appended, or the JSON Patch operations
 
     Returns:
          JSONResponse: json response with info about the request outcome
     """
+    if is_json_patch_request(request):
+        return await apply_json_patch_to_list(
+            request, list_id, item_list, data_access_layer
+        )
+    if not isinstance(item_list, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected items to append, send JSON Patches as "
+            "application/json-patch+json",
+        )
     if not item_list:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Nothing to append!"
@@ -204,10 +409,14 @@ async def append_items_to_list(
         )
 
     append_result, metrics_info = await data_access_layer.add_items_to_list(
-        list_id, item_list
+        list_id, item_list, get_expected_versions(request)
     )
     data = jsonable_encoder(append_result)
-    response = JSONResponse(status_code=status.HTTP_200_OK, content=data)
+    response = JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=data,
+        headers={"ETag": get_list_etag(request, data)},
+    )
     user_id = await get_user_id(request=request)
     update_user_list_metric(
         fastapi_app=request.app,
@@ -217,6 +426,122 @@ async def append_items_to_list(
     return response
 
 
+@lists_by_id_router.delete(
+    "/{list_id}/items",
+    dependencies=only_auth_deps,
+    status_code=status.HTTP_200_OK,
+    description="Removes the items with the given keys from the list, ignoring any keys "
+    "that aren't in it. Send the list's `ETag` as `If-Match` to only change it if it "
+    "hasn't changed since",
+    summary="Remove items from list",
+    responses={
+        status.HTTP_200_OK: {"description": "Number of items removed"},
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_404_NOT_FOUND: {"description": "Could not find id"},
+        status.HTTP_412_PRECONDITION_FAILED: {
+            "description": "The list has changed since the version in If-Match"
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Something went wrong internally when processing the request"
+        },
+    },
+)
+@lists_by_id_router.delete(
+    "/{list_id}/items/",
+    include_in_schema=False,
+    dependencies=only_auth_deps,
+)
+async def delete_items_from_list(
+    request: Request,
+    list_id: UUID,
+    items_to_delete: ItemKeysModel,
+    data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+) -> JSONResponse:
+    """
+    Remove items from a list by key
+
+    Args:
+         request (Request): FastAPI request (so we can check authorization)
+         list_id (UUID): the id of the list you wish to remove items from
+         items_to_delete (ItemKeysModel): keys of the items to remove
+         data_access_layer (DataAccessLayer): how we interface with db
+
+    Returns:
+         JSONResponse: the number of items removed
+    """
+    items_deleted = await data_access_layer.delete_items_from_list(
+        list_id, items_to_delete.keys, get_expected_versions(request)
+    )
+    if items_deleted is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="List does not exist"
+        )
+
+    user_id = await get_user_id(request=request)
+    update_user_list_metric(
+        fastapi_app=request.app,
+        user_id=user_id,
+        **MetricModel(items_deleted=items_deleted).model_dump(),
+    )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content={"items_deleted": items_deleted}
+    )
+
+
+@lists_by_id_router.post(
+    "/{list_id}/_clone",
+    dependencies=only_auth_deps,
+    status_code=status.HTTP_201_CREATED,
+    description="Creates a copy of the list under a new name",
+    summary="Clone list",
+    responses={
+        status.HTTP_201_CREATED: {"description": "Metadata of the new list"},
+        status.HTTP_401_UNAUTHORIZED: {
+            "description": "User unauthorized when accessing endpoint"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "description": "User does not have access to requested data"
+        },
+        status.HTTP_404_NOT_FOUND: {"description": "Could not find id"},
+        status.HTTP_409_CONFLICT: {"description": "Name already taken"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Something went wrong internally when processing the request"
+        },
+    },
+)
+@lists_by_id_router.post(
+    "/{list_id}/_clone/",
+    include_in_schema=False,
+    dependencies=only_auth_deps,
+)
+async def clone_list(
+    request: Request,
+    list_id: UUID,
+    clone_info: CloneListModel,
+    data_access_layer: DataAccessLayer = Depends(get_data_access_layer),
+) -> JSONResponse:
+    """
+    Copy a list in the database, without its items being sent back and forth
+
+    Args:
+         request (Request): FastAPI request (so we can check authorization)
+         list_id (UUID): the id of the list to clone
+         clone_info (CloneListModel): name of the new list
+         data_access_layer (DataAccessLayer): how we interface with db
+
+    Returns:
+         JSONResponse: the metadata of the new list
+    """
+    return await create_list_from_lists(
+        request, data_access_layer, clone_info.name, [list_id], "union"
+    )
+
+
 @lists_by_id_router.delete(
     "/{list_id}",
     dependencies=only_auth_deps,
@@ -272,3 +597,205 @@ async def delete_list_by_id(
         **metrics_info.model_dump(),
     )
     return response
+
+
+# region Helpers
+
+
+async def get_filtered_list_by_id(
+    data_access_layer: DataAccessLayer,
+    list_id: UUID,
+    item_type: Optional[str],
+    key_prefix: Optional[str],
+    dataset_guid: Optional[str],
+    limit: int,
+    offset: int,
+) -> Optional[Dict[str, Any]]:
+    """
+    Get a list with only the requested page of its items, filtered in the database
+
+    Args:
+        data_access_layer (DataAccessLayer): how we interface with db
+        list_id (UUID): the id of the list you wish to retrieve
+        item_type (str): only return items of this type
+        key_prefix (str): only return items whose key starts with this
+        dataset_guid (str): only return items with this dataset_guid
+        limit (int): max number of items to return
+        offset (int): number of matching items to skip
+
+    Returns:
+        the list with the page of items and pagination info, or None if it doesn't exist
+    """
+    list_metadata = await data_access_layer.get_list_metadata(list_id)
+    if list_metadata is None:
+        return None
+    items, total = await data_access_layer.get_list_items_page(
+        list_id,
+        item_type=item_type,
+        key_prefix=key_prefix,
+        dataset_guid=dataset_guid,
+        limit=limit,
+        offset=offset,
+    )
+    data = {
+        **list_metadata,
+        "items": items,
+        "pagination": {"limit": limit, "offset": offset, "total": total},
+    }
+    return jsonable_encoder(data)
+
+
+def get_list_etag(request: Request, list_info: Dict[str, Any]) -> str:
+    """
+    The ETag of a list's representation. Every change to a list bumps its version, so the
+    ETag of the whole list is its version, which writes can send back as If-Match. The
+    query string picks which representation (e.g. which page of items) was asked for, so
+    it's hashed into the ETag of any other representation.
+
+    Args:
+        request (Request): FastAPI request
+        list_info (dict): the list or its metadata, with at least its version
+
+    Returns:
+        the strong ETag of the list as requested
+    """
+    etag = str(list_info["version"])
+    if request.url.query:
+        query_hash = hashlib.sha256(request.url.query.encode("utf-8")).hexdigest()
+        etag = f"{etag}-{query_hash[:16]}"
+    return f'"{etag}"'
+
+
+def get_expected_versions(request: Request) -> Optional[List[int]]:
+    """
+    The versions a write expects the list to be at, from its If-Match header. If-Match uses
+    the strong comparison, so weak ETags and ETags of other representations never match.
+
+    Args:
+        request (Request): FastAPI request
+
+    Returns:
+        the versions, or None if the write isn't conditional (no If-Match, or `*`)
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None or if_match.strip() == "*":
+        return None
+    etags = (candidate.strip() for candidate in if_match.split(","))
+    return [int(etag[1:-1]) for etag in etags if re.fullmatch(r'"\d+"', etag)]
+
+
+async def apply_json_patch_to_list(
+    request: Request,
+    list_id: UUID,
+    patch_body: Any,
+    data_access_layer: DataAccessLayer,
+) -> JSONResponse:
+    """
+    Apply an RFC 6902 JSON Patch to a list. Only the items the patch touches are loaded
+    and validated, and the result is written back in a single update, so small edits to
+    large lists don't need the whole list sent or rewritten.
+
+    Args:
+        request (Request): FastAPI request
+        list_id (UUID): the id of the list to patch
+        patch_body (Any): the JSON Patch, a list of operations on `/name` and `/items/{key}`
+        data_access_layer (DataAccessLayer): how we interface with db
+
+    Returns:
+        JSONResponse: the metadata of the patched list
+    """
+    try:
+        if not isinstance(patch_body, list):
+            raise ValueError("A JSON Patch must be a list of operations")
+        operations = [
+            JsonPatchOperationModel.model_validate(operation).model_dump(
+                by_alias=True, exclude_unset=True
+            )
+            for operation in patch_body
+        ]
+        item_keys = set()
+        for operation in operations:
+            for pointer in (operation["path"], operation.get("from")):
+                tokens = [] if pointer is None else parse_json_pointer(pointer)
+                if pointer is None or tokens == ["name"]:
+                    continue
+                if len(tokens) < 2 or tokens[0] != "items":
+                    raise ValueError("Only /name and /items/{key} can be patched")
+                item_keys.add(tokens[1])
+    except (ValueError, ValidationError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if not operations:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Nothing to update!"
+        )
+
+    loaded = await data_access_layer.get_items_for_patch(
+        list_id, list(item_keys), get_expected_versions(request)
+    )
+    if loaded is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="List does not exist"
+        )
+    name, old_items, item_count = loaded
+    try:
+        patched = apply_json_patch({"name": name, "items": old_items}, operations)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+    new_name, new_items = patched.get("name"), patched["items"]
+    if not isinstance(new_name, str) or not new_name:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="name must be a non-empty string",
+        )
+    removed_keys = [item_key for item_key in old_items if item_key not in new_items]
+    updated_items = {
+        item_key: item
+        for item_key, item in new_items.items()
+        if item_key not in old_items or old_items[item_key] != item
+    }
+    items_added = sum(1 for item_key in updated_items if item_key not in old_items)
+    try:
+        for item_contents in updated_items.values():
+            validate_user_list_item(item_contents)
+    except Exception as exc:
+        config.logging.error(exc)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Problem trying to validate patched items. Are they formatted "
+            "correctly?",
+        )
+    ensure_items_less_than_max(items_added - len(removed_keys), item_count)
+
+    if new_name == name and not removed_keys and not updated_items:
+        # e.g. only test operations
+        list_metadata = await data_access_layer.get_list_metadata(list_id)
+    else:
+        try:
+            list_metadata = await data_access_layer.patch_list(
+                list_id, new_name, removed_keys, updated_items
+            )
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A list with that name already exists",
+            )
+
+    user_id = await get_user_id(request=request)
+    update_user_list_metric(
+        fastapi_app=request.app,
+        user_id=user_id,
+        **MetricModel(
+            items_added=items_added,
+            items_updated=len(updated_items) - items_added,
+            items_deleted=len(removed_keys),
+        ).model_dump(),
+    )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=jsonable_encoder(list_metadata),
+        headers={"ETag": get_list_etag(request, list_metadata)},
+    )
+
+
+# endregion
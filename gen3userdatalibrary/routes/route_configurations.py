@@ -14,11 +14,15 @@ Current recognized properties:
     type: defines how to build the 'resource' path if it needs params
         - all: all lists, takes (user_id)
         - ID: by id, takes (user_id, list_id)
+        - ids: by each of the ids in the request body, takes (user_id, list_id)
     items: defines how to extract the 'items' component from a request body
+    ids: defines how to extract the list ids from a request body, for the 'ids' type
 """
 
 
-def get_resource_from_endpoint_context(endpoint_context, user_id, path_params):
+def get_resource_from_endpoint_context(
+    endpoint_context, user_id, path_params, body=None
+):
     """
     Before any endpoint is hit, we should verify that the requester has access to the endpoint.
     This middleware function handles that.
@@ -27,9 +31,11 @@ def get_resource_from_endpoint_context(endpoint_context, user_id, path_params):
         endpoint_context (Dict[str, Any]): information about an endpoint from the ENDPOINT_TO_CONTEXT data structure
         user_id (str): creator id
         path_params (dict): any params from the request scope
+        body (Any): the parsed request body, only needed for the 'ids' type
 
     Returns:
-        The resource from endpoint_to_context based on the kind of endpoint
+        The resource from endpoint_to_context based on the kind of endpoint, or a list of
+        resources for the 'ids' type
     """
     endpoint_type: Optional[str, None] = endpoint_context.get("type", None)
     get_resource: Optional[Callable, None] = endpoint_context.get("resource", None)
@@ -38,6 +44,9 @@ def get_resource_from_endpoint_context(endpoint_context, user_id, path_params):
     elif endpoint_type == "id":
         list_id = path_params["list_id"]
         resource = get_resource(user_id, list_id)
+    elif endpoint_type == "ids":
+        list_ids = endpoint_context["ids"](body)
+        resource = [get_resource(user_id, list_id) for list_id in list_ids]
     else:  # None
         resource = get_resource
     return resource
@@ -63,6 +72,32 @@ ENDPOINT_TO_CONTEXT = {
         "resource": get_lists_endpoint,
         "method": "read",
     },
+    "find_lists_containing_item": {
+        "type": "all",
+        "resource": get_lists_endpoint,
+        "method": "read",
+    },
+    "get_list_changes": {
+        "type": "all",
+        "resource": get_lists_endpoint,
+        "method": "read",
+    },
+    "get_list_events": {
+        "type": "all",
+        "resource": get_lists_endpoint,
+        "method": "read",
+    },
+    "get_lists_by_ids": {
+        "type": "ids",
+        "resource": get_list_by_id_endpoint,
+        "method": "read",
+        "ids": lambda body: body["ids"],
+    },
+    "combine_lists": {
+        "type": "all",
+        "resource": get_lists_endpoint,
+        "method": "update",
+    },
     "upsert_user_lists": {
         "type": "all",
         "resource": get_lists_endpoint,
@@ -71,6 +106,12 @@ ENDPOINT_TO_CONTEXT = {
             map(lambda item_to_update: item_to_update["items"], body["lists"])
         ),
     },
+    "delete_lists_by_ids": {
+        "type": "ids",
+        "resource": get_list_by_id_endpoint,
+        "method": "delete",
+        "ids": lambda body: body["ids"],
+    },
     "delete_all_lists": {
         "type": "all",
         "resource": get_lists_endpoint,
@@ -81,6 +122,11 @@ ENDPOINT_TO_CONTEXT = {
         "resource": get_list_by_id_endpoint,
         "method": "read",
     },
+    "get_list_items": {
+        "type": "id",
+        "resource": get_list_by_id_endpoint,
+        "method": "read",
+    },
     "update_list_by_id": {
         "type": "id",
         "resource": get_list_by_id_endpoint,
@@ -93,6 +139,16 @@ ENDPOINT_TO_CONTEXT = {
         "method": "update",
         "items": identity,
     },
+    "delete_items_from_list": {
+        "type": "id",
+        "resource": get_list_by_id_endpoint,
+        "method": "update",
+    },
+    "clone_list": {
+        "type": "all",
+        "resource": get_lists_endpoint,
+        "method": "update",
+    },
     "delete_list_by_id": {
         "type": "id",
         "resource": get_list_by_id_endpoint,
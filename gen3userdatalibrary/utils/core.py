@@ -1,8 +1,14 @@
 """ General purpose functions """
 
+import base64
+import copy
+import hashlib
+import json
+import re
+from datetime import datetime
 from functools import reduce
 from logging import Logger
-from typing import Dict, Tuple, Hashable, Any
+from typing import Dict, List, Optional, Tuple, Hashable, Any, Union
 
 from sqlalchemy import inspect
 
@@ -113,3 +119,231 @@ def find_differences(
 def remove_keys(d: dict, keys: set):
     """Given a dictionary d and set of keys k, remove all k in d"""
     return {k: v for k, v in d.items() if k not in keys}
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """
+    Turns a pagination position into an opaque, url safe cursor
+
+    Args:
+        position (Dict[str, Any]): json serializable position, e.g. {"key": last key returned}
+
+    Returns:
+        the cursor string
+    """
+    as_json = json.dumps(position, separators=(",", ":"))
+    return base64.urlsafe_b64encode(as_json.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Reverses `encode_cursor`
+
+    Args:
+        cursor (str): a cursor made by `encode_cursor`
+
+    Returns:
+        the position the cursor was made from
+
+    Raises:
+        ValueError if the cursor is malformed
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError(f"Malformed cursor: {cursor}") from exc
+    if not isinstance(position, dict):
+        raise ValueError(f"Malformed cursor: {cursor}")
+    return position
+
+
+def parse_json_pointer(pointer: str) -> List[str]:
+    """
+    Splits an RFC 6901 JSON Pointer into its unescaped reference tokens, e.g.
+    "/items/drs:~1~1dg.4503" => ["items", "drs://dg.4503"]
+
+    Args:
+        pointer (str): the JSON Pointer, "" refers to the whole document
+
+    Returns:
+        the reference tokens
+
+    Raises:
+        ValueError if the pointer is malformed
+    """
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON Pointer: {pointer}")
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    ]
+
+
+def _get_array_index(array: list, token: str, allow_end: bool = False) -> int:
+    """
+    Args:
+        array (list): the array being indexed
+        token (str): JSON Pointer reference token for the index, "-" being the end
+        allow_end (bool): whether the index just past the last element is allowed
+
+    Returns:
+        the index into the array
+    """
+    if allow_end and token == "-":
+        return len(array)
+    if re.fullmatch(r"0|[1-9][0-9]*", token) is None:
+        raise ValueError(f"Invalid array index: {token}")
+    index = int(token)
+    if index > len(array) or (index == len(array) and not allow_end):
+        raise ValueError(f"Array index out of range: {token}")
+    return index
+
+
+def _resolve_json_pointer(document: Any, tokens: List[str]) -> Any:
+    """
+    Args:
+        document (Any): json document
+        tokens (List[str]): reference tokens from `parse_json_pointer`
+
+    Returns:
+        the value the tokens refer to
+    """
+    value = document
+    for token in tokens:
+        if isinstance(value, dict) and token in value:
+            value = value[token]
+        elif isinstance(value, list):
+            value = value[_get_array_index(value, token)]
+        else:
+            raise ValueError(f"Path does not exist: /{'/'.join(tokens)}")
+    return value
+
+
+def _add_json_value(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve_json_pointer(document, tokens[:-1])
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_get_array_index(parent, tokens[-1], allow_end=True), value)
+    else:
+        raise ValueError(f"Can't add to a non-container: /{'/'.join(tokens)}")
+    return document
+
+
+def _remove_json_value(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise ValueError("Can't remove the whole document")
+    parent = _resolve_json_pointer(document, tokens[:-1])
+    if isinstance(parent, dict) and tokens[-1] in parent:
+        return parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return parent.pop(_get_array_index(parent, tokens[-1]))
+    raise ValueError(f"Path does not exist: /{'/'.join(tokens)}")
+
+
+def apply_json_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    Applies an RFC 6902 JSON Patch to a copy of a json document. The operations are
+    applied in order, and if any of them fail none of them are applied.
+
+    Args:
+        document (Any): json document to patch, which isn't modified
+        operations (List[Dict[str, Any]]): the patch, e.g. [{"op": "remove", "path": "/a/b"}]
+
+    Returns:
+        the patched copy of the document
+
+    Raises:
+        ValueError if an operation is malformed, a path doesn't exist or a test fails
+    """
+    patched = copy.deepcopy(document)
+    for operation in operations:
+        op = operation.get("op")
+        tokens = parse_json_pointer(operation.get("path", ""))
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise ValueError(f"Missing value for {op} operation")
+        if op in ("move", "copy") and "from" not in operation:
+            raise ValueError(f"Missing from for {op} operation")
+
+        if op == "add":
+            patched = _add_json_value(
+                patched, tokens, copy.deepcopy(operation["value"])
+            )
+        elif op == "remove":
+            _remove_json_value(patched, tokens)
+        elif op == "replace":
+            _resolve_json_pointer(patched, tokens)
+            if tokens:
+                _remove_json_value(patched, tokens)
+            patched = _add_json_value(
+                patched, tokens, copy.deepcopy(operation["value"])
+            )
+        elif op == "move":
+            from_tokens = parse_json_pointer(operation["from"])
+            if tokens[: len(from_tokens)] == from_tokens and tokens != from_tokens:
+                raise ValueError("Can't move a value into one of its children")
+            value = _remove_json_value(patched, from_tokens)
+            patched = _add_json_value(patched, tokens, value)
+        elif op == "copy":
+            value = _resolve_json_pointer(
+                patched, parse_json_pointer(operation["from"])
+            )
+            patched = _add_json_value(patched, tokens, copy.deepcopy(value))
+        elif op == "test":
+            if _resolve_json_pointer(patched, tokens) != operation["value"]:
+                raise ValueError(f"Test failed for {operation['path']}")
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+    return patched
+
+
+def as_isoformat(timestamp: Union[datetime, str]) -> str:
+    """
+    Args:
+        timestamp: a datetime, or one already formatted as an ISO 8601 string
+
+    Returns:
+        the timestamp as an ISO 8601 string
+    """
+    if isinstance(timestamp, datetime):
+        return timestamp.isoformat()
+    return timestamp
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Builds a strong ETag out of whatever identifies a version of a resource
+
+    Args:
+        *parts (Any): json serializable parts, e.g. the id, updated_time and version of a list
+
+    Returns:
+        the quoted ETag
+    """
+    as_json = json.dumps(parts, separators=(",", ":"), default=str)
+    return f'"{hashlib.sha256(as_json.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match header against an ETag, with the weak comparison that
+    RFC 9110 specifies for If-None-Match
+
+    Args:
+        if_none_match (str): the header, e.g. '"abc", W/"def"' or '*'
+        etag (str): the current ETag of the resource
+
+    Returns:
+        whether the client already has the current version
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {
+        candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")
+    }
+    return etag.removeprefix("W/") in candidates
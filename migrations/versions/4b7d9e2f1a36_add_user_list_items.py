@@ -0,0 +1,76 @@
+"""add user_list_items for normalized item storage
+
+Revision ID: 4b7d9e2f1a36
+Revises: c5e1a9d4f2b8
+Create Date: 2026-10-19 13:02:45.904317
+
+Creates the table items are stored in when ITEM_STORAGE is "dual" or "normalized". If one
+of those is configured when this runs, the items of existing lists are copied over from
+the `items` column, a batch of lists at a time. The copy skips items that are already
+there, so rerunning it (downgrade then upgrade) is safe while running in "dual".
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from gen3userdatalibrary import config
+
+# revision identifiers, used by Alembic.
+revision: str = "4b7d9e2f1a36"
+down_revision: Union[str, None] = "c5e1a9d4f2b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+
+
+def backfill_user_list_items():
+    """
+    Copies the items of every list into user_list_items, BATCH_SIZE lists at a time.
+    Must run in autocommit mode so each batch is committed on its own.
+    """
+    batch_query = sa.text(
+        """
+        WITH batch AS (
+            SELECT id, items FROM user_lists
+            WHERE CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid)
+            ORDER BY id LIMIT :batch_size
+        ), copied AS (
+            INSERT INTO user_list_items (list_id, item_key, value)
+            SELECT batch.id, item.key, item.value
+            FROM batch, jsonb_each(COALESCE(batch.items, '{}'::jsonb)) AS item
+            ON CONFLICT DO NOTHING
+        )
+        SELECT max(id::text) FROM batch
+        """
+    )
+    last_id = None
+    while True:
+        last_id = (
+            op.get_bind()
+            .execute(batch_query, {"last_id": last_id, "batch_size": BATCH_SIZE})
+            .scalar()
+        )
+        if last_id is None:
+            break
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_list_items",
+        sa.Column("list_id", sa.UUID(), nullable=False),
+        sa.Column("item_key", sa.String(), nullable=False),
+        sa.Column("value", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.PrimaryKeyConstraint("list_id", "item_key"),
+    )
+    if config.ITEM_STORAGE != "jsonb":
+        with op.get_context().autocommit_block():
+            backfill_user_list_items()
+
+
+def downgrade() -> None:
+    op.drop_table("user_list_items")
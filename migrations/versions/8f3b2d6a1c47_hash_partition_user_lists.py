@@ -0,0 +1,94 @@
+"""hash partition user_lists by creator
+
+Revision ID: 8f3b2d6a1c47
+Revises: 3c2cb76ce78c
+Create Date: 2026-10-19 09:12:03.118204
+
+Only changes the schema when USER_LISTS_HASH_PARTITIONS is set. The existing table is
+renamed, a partitioned copy is created with the primary key widened to (id, creator),
+the rows are copied over and the old table is dropped. This rewrites the whole table
+in one transaction, so run it in a maintenance window on large deployments.
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from gen3userdatalibrary import config
+from gen3userdatalibrary.models.user_list import get_hash_partition_ddl
+
+# revision identifiers, used by Alembic.
+revision: str = "8f3b2d6a1c47"
+down_revision: Union[str, None] = "3c2cb76ce78c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def is_user_lists_partitioned() -> bool:
+    """
+    Returns:
+        whether the user_lists table currently in the database is partitioned
+    """
+    relkind = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT relkind::text FROM pg_class WHERE relname = 'user_lists'")
+        )
+        .scalar()
+    )
+    return relkind == "p"
+
+
+def rename_existing_user_lists():
+    """
+    Moves the current user_lists table (and its constraint/index names) out of the way
+    """
+    op.rename_table("user_lists", "user_lists_old")
+    op.execute(
+        "ALTER TABLE user_lists_old RENAME CONSTRAINT user_lists_pkey TO user_lists_old_pkey"
+    )
+    op.execute(
+        "ALTER TABLE user_lists_old RENAME CONSTRAINT _name_creator_uc TO _name_creator_old_uc"
+    )
+    op.execute("ALTER INDEX ix_user_lists_creator RENAME TO ix_user_lists_old_creator")
+
+
+def copy_and_drop_old_user_lists():
+    """
+    Adds the constraints/index to the new user_lists table, copies the rows over and
+    drops the old table
+    """
+    op.create_unique_constraint("_name_creator_uc", "user_lists", ["name", "creator"])
+    op.create_index(
+        op.f("ix_user_lists_creator"), "user_lists", ["creator"], unique=False
+    )
+    op.execute("INSERT INTO user_lists SELECT * FROM user_lists_old")
+    op.drop_table("user_lists_old")
+
+
+def upgrade() -> None:
+    partitions = config.USER_LISTS_HASH_PARTITIONS
+    if not partitions or is_user_lists_partitioned():
+        return
+
+    rename_existing_user_lists()
+    op.execute(
+        "CREATE TABLE user_lists (LIKE user_lists_old INCLUDING DEFAULTS) "
+        "PARTITION BY HASH (creator)"
+    )
+    op.create_primary_key("user_lists_pkey", "user_lists", ["id", "creator"])
+    for statement in get_hash_partition_ddl("user_lists", partitions):
+        op.execute(statement)
+    copy_and_drop_old_user_lists()
+
+
+def downgrade() -> None:
+    if not is_user_lists_partitioned():
+        return
+
+    rename_existing_user_lists()
+    op.execute("CREATE TABLE user_lists (LIKE user_lists_old INCLUDING DEFAULTS)")
+    op.create_primary_key("user_lists_pkey", "user_lists", ["id"])
+    copy_and_drop_old_user_lists()
@@ -0,0 +1,164 @@
+"""convert items and authz to jsonb and index items
+
+Revision ID: c5e1a9d4f2b8
+Revises: 8f3b2d6a1c47
+Create Date: 2026-10-19 10:41:27.530671
+
+The initial migration created `items` and `authz` as JSON while the model declares JSONB.
+Rewriting the columns in place with ALTER COLUMN ... TYPE would hold an exclusive lock for
+the whole rewrite, so instead:
+
+1. new JSONB columns are added and kept in sync with the old ones by a trigger
+2. existing rows are copied over in small batches, each committed on its own
+3. the columns are swapped in one short transaction
+
+Afterwards a GIN index is built on `items` (concurrently, unless the table is partitioned
+since postgres doesn't support that) so key lookups don't have to scan every list.
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e1a9d4f2b8"
+down_revision: Union[str, None] = "8f3b2d6a1c47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+ITEMS_INDEX = "ix_user_lists_items_gin"
+
+
+def get_column_type(column_name: str) -> str:
+    """
+    Args:
+        column_name: column of the user_lists table
+
+    Returns:
+        the postgres data type of the column, e.g. "json" or "jsonb"
+    """
+    return (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = 'user_lists' AND column_name = :column_name"
+            ),
+            {"column_name": column_name},
+        )
+        .scalar()
+    )
+
+
+def is_user_lists_partitioned() -> bool:
+    """
+    Returns:
+        whether the user_lists table currently in the database is partitioned
+    """
+    relkind = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT relkind::text FROM pg_class WHERE relname = 'user_lists'")
+        )
+        .scalar()
+    )
+    return relkind == "p"
+
+
+def add_synced_jsonb_columns():
+    """
+    Adds the new columns and a trigger that fills them for any row written from now on
+    """
+    op.add_column("user_lists", sa.Column("items_jsonb", JSONB))
+    op.add_column("user_lists", sa.Column("authz_jsonb", JSONB))
+    # lets SET NOT NULL at the end skip its full table scan once this is validated
+    op.execute(
+        "ALTER TABLE user_lists ADD CONSTRAINT authz_jsonb_not_null "
+        "CHECK (authz_jsonb IS NOT NULL) NOT VALID"
+    )
+    op.execute(
+        """
+        CREATE FUNCTION user_lists_sync_jsonb() RETURNS trigger AS $$
+        BEGIN
+            NEW.items_jsonb := NEW.items::jsonb;
+            NEW.authz_jsonb := NEW.authz::jsonb;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER user_lists_sync_jsonb BEFORE INSERT OR UPDATE ON user_lists "
+        "FOR EACH ROW EXECUTE FUNCTION user_lists_sync_jsonb()"
+    )
+
+
+def backfill_jsonb_columns():
+    """
+    Copies existing rows over BATCH_SIZE rows at a time. Must run in autocommit mode so
+    each batch only holds its row locks briefly. authz is never null, so a null
+    authz_jsonb marks a row that hasn't been copied yet.
+    """
+    batch_query = sa.text(
+        "UPDATE user_lists SET items_jsonb = items::jsonb, authz_jsonb = authz::jsonb "
+        "WHERE id IN (SELECT id FROM user_lists WHERE authz_jsonb IS NULL LIMIT :batch_size)"
+    )
+    while True:
+        result = op.get_bind().execute(batch_query, {"batch_size": BATCH_SIZE})
+        if result.rowcount == 0:
+            break
+    op.execute("ALTER TABLE user_lists VALIDATE CONSTRAINT authz_jsonb_not_null")
+
+
+def swap_jsonb_columns():
+    """
+    Replaces the old columns with the new ones, which only needs a brief exclusive lock
+    """
+    op.execute("LOCK TABLE user_lists IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER user_lists_sync_jsonb ON user_lists")
+    op.execute("DROP FUNCTION user_lists_sync_jsonb()")
+    op.drop_column("user_lists", "items")
+    op.drop_column("user_lists", "authz")
+    op.alter_column("user_lists", "items_jsonb", new_column_name="items")
+    op.alter_column("user_lists", "authz_jsonb", new_column_name="authz")
+    op.alter_column("user_lists", "authz", nullable=False)
+    op.drop_constraint("authz_jsonb_not_null", "user_lists", type_="check")
+
+
+def upgrade() -> None:
+    if get_column_type("items") == "json":
+        add_synced_jsonb_columns()
+        with op.get_context().autocommit_block():
+            backfill_jsonb_columns()
+        swap_jsonb_columns()
+
+    if is_user_lists_partitioned():
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {ITEMS_INDEX} ON user_lists USING gin (items)"
+        )
+    else:
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {ITEMS_INDEX} "
+                "ON user_lists USING gin (items)"
+            )
+
+
+def downgrade() -> None:
+    op.drop_index(ITEMS_INDEX, table_name="user_lists")
+    op.alter_column(
+        "user_lists",
+        "items",
+        type_=sa.JSON(),
+        postgresql_using="items::json",
+    )
+    op.alter_column(
+        "user_lists",
+        "authz",
+        type_=sa.JSON(),
+        postgresql_using="authz::json",
+    )
@@ -0,0 +1,71 @@
+"""track list changes for delta sync
+
+Revision ID: e2a7c4b19d53
+Revises: 4b7d9e2f1a36
+Create Date: 2026-10-19 15:20:11.482095
+
+Adds what GET /lists/changes needs: an index on user_lists (creator, updated_time) to find a
+user's lists changed since a sync (built concurrently unless the table is partitioned, since
+postgres doesn't support that), and the user_list_deletions table that deleted lists are
+logged to.
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a7c4b19d53"
+down_revision: Union[str, None] = "4b7d9e2f1a36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPDATED_TIME_INDEX = "ix_user_lists_creator_updated_time"
+
+
+def is_user_lists_partitioned() -> bool:
+    """
+    Returns:
+        whether the user_lists table currently in the database is partitioned
+    """
+    relkind = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT relkind::text FROM pg_class WHERE relname = 'user_lists'")
+        )
+        .scalar()
+    )
+    return relkind == "p"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_list_deletions",
+        sa.Column("list_id", sa.UUID(), nullable=False),
+        sa.Column("creator", sa.String(), nullable=False),
+        sa.Column("deleted_time", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("list_id"),
+    )
+    op.create_index(
+        "ix_user_list_deletions_creator_deleted_time",
+        "user_list_deletions",
+        ["creator", "deleted_time"],
+    )
+
+    index_definition = f"{UPDATED_TIME_INDEX} ON user_lists (creator, updated_time)"
+    if is_user_lists_partitioned():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_definition}")
+    else:
+        with op.get_context().autocommit_block():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_definition}")
+
+
+def downgrade() -> None:
+    op.drop_index(UPDATED_TIME_INDEX, table_name="user_lists")
+    op.drop_index(
+        "ix_user_list_deletions_creator_deleted_time",
+        table_name="user_list_deletions",
+    )
+    op.drop_table("user_list_deletions")
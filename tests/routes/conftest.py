@@ -4,7 +4,7 @@ from unittest.mock import MagicMock
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 
-from gen3userdatalibrary.db import DataAccessLayer, get_data_access_layer
+from gen3userdatalibrary.db import create_data_access_layer, get_data_access_layer
 from gen3userdatalibrary.main import get_app
 
 
@@ -27,8 +27,8 @@ class BaseTestRouter:
         """
         app = get_app()
         app.include_router(self.router)
-        app.dependency_overrides[get_data_access_layer] = lambda: DataAccessLayer(
-            session
+        app.dependency_overrides[get_data_access_layer] = (
+            lambda: create_data_access_layer(session)
         )
 
         app.state.metrics = MagicMock()
@@ -48,8 +48,8 @@ class BaseTestRouter:
         """
         app = get_app()
         app.include_router(self.router)
-        app.dependency_overrides[get_data_access_layer] = lambda: DataAccessLayer(
-            session
+        app.dependency_overrides[get_data_access_layer] = (
+            lambda: create_data_access_layer(session)
         )
 
         app.state.metrics = MagicMock()
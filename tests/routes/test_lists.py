@@ -1,23 +1,38 @@
 import json
+from datetime import datetime, timedelta, timezone
 from functools import reduce
 from json import JSONDecodeError
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from black.trans import defaultdict
+from fastapi import HTTPException
 from gen3authz.client.arborist.async_client import ArboristClient
+from starlette.datastructures import Headers
+from starlette.requests import Request
 
 from gen3userdatalibrary import config
 from gen3userdatalibrary.auth import get_list_by_id_endpoint
 from gen3userdatalibrary.db import DataAccessLayer
+from gen3userdatalibrary.events import ListEventBroker, get_listen_dsn
 from gen3userdatalibrary.main import route_aggregator
-from gen3userdatalibrary.models.user_list import UpdateItemsModel, ItemToUpdateModel
+from gen3userdatalibrary.models.user_list import (
+    CombineListsModel,
+    ItemToUpdateModel,
+    ListIdsModel,
+    UpdateItemsModel,
+)
 from gen3userdatalibrary.routes.lists import (
+    combine_lists,
+    delete_lists_by_ids,
+    get_list_changes,
+    get_list_events,
+    get_lists_by_ids,
     read_all_lists,
     upsert_user_lists,
     delete_all_lists,
 )
-from gen3userdatalibrary.utils.core import add_to_dict_set
+from gen3userdatalibrary.utils.core import add_to_dict_set, encode_cursor
 from tests.data.example_lists import VALID_LIST_A, VALID_LIST_B, VALID_LIST_C
 from tests.helpers import create_basic_list, get_id_from_response
 from tests.routes.conftest import BaseTestRouter
@@ -477,6 +492,235 @@ class TestUserListsRouter(BaseTestRouter):
         assert one_matches and two_matches and three_matches
         monkeypatch.setattr(config, "DEBUG_SKIP_AUTH", previous_config)
 
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_reading_lists_with_etag(
+        self, get_token_claims, arborist, client, session, monkeypatch
+    ):
+        """
+        Test reading all lists returns an ETag that changes whenever any list does, and a
+        304 when it hasn't
+
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            client: endpoint interface
+            session: db session the client uses
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "DEBUG_SKIP_AUTH", False)
+        arborist.auth_request.return_value = True
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        get_token_claims.return_value = {"sub": "1"}
+        empty_etag = (await client.get("/lists", headers=headers)).headers["ETag"]
+        first_list = {
+            "name": "first",
+            "items": {"drs://dg.4503:a": {"dataset_guid": "phs1", "type": "GA4GH_DRS"}},
+        }
+        r1 = await create_basic_list(
+            arborist, get_token_claims, client, first_list, headers
+        )
+        response = await client.get("/lists", headers=headers)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag != empty_etag
+
+        response = await client.get(
+            "/lists", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+        # other users' lists aren't part of the user's library
+        get_token_claims.return_value = {"sub": "2"}
+        response = await client.get(
+            "/lists", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == empty_etag
+
+        get_token_claims.return_value = {"sub": "1"}
+        response = await client.patch(
+            f"/lists/{get_id_from_response(r1)}",
+            headers=headers,
+            json={"drs://dg.4503:b": {"dataset_guid": "phs1", "type": "GA4GH_DRS"}},
+        )
+        assert response.status_code == 200
+        # requests commit their own sessions outside of tests
+        await session.flush()
+        response = await client.get(
+            "/lists", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_syncing_list_changes(
+        self, get_token_claims, arborist, client, monkeypatch
+    ):
+        """
+        Test a sync returns every list, and later syncs only what changed and what was
+        deleted since the previous one
+
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            client: endpoint interface
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "LIST_CHANGES_CURSOR_OVERLAP_SECONDS", 0)
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        item = {"dataset_guid": "phs1", "type": "GA4GH_DRS"}
+        response = await client.get("/lists/changes", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["lists"] == {}
+        assert response.json()["deleted"] == []
+        first_cursor = response.json()["cursor"]
+
+        first_id = get_id_from_response(
+            await create_basic_list(
+                arborist,
+                get_token_claims,
+                client,
+                {"name": "first", "items": {"drs://a": item}},
+                headers,
+            )
+        )
+        second_id = get_id_from_response(
+            await create_basic_list(
+                arborist,
+                get_token_claims,
+                client,
+                {"name": "second", "items": {"drs://b": item}},
+                headers,
+            )
+        )
+        for params in [{}, {"since": first_cursor}]:
+            response = await client.get(
+                "/lists/changes/", headers=headers, params=params
+            )
+            assert set(response.json()["lists"]) == {first_id, second_id}
+            assert response.json()["deleted"] == []
+        cursor = response.json()["cursor"]
+
+        response = await client.patch(
+            f"/lists/{first_id}", headers=headers, json={"drs://c": item}
+        )
+        assert response.status_code == 200
+        response = await client.delete(f"/lists/{second_id}", headers=headers)
+        assert response.status_code == 204
+        response = await client.get(
+            "/lists/changes", headers=headers, params={"since": cursor}
+        )
+        assert list(response.json()["lists"]) == [first_id]
+        assert set(response.json()["lists"][first_id]["items"]) == {
+            "drs://a",
+            "drs://c",
+        }
+        assert response.json()["deleted"] == [second_id]
+        cursor = response.json()["cursor"]
+
+        response = await client.get(
+            "/lists/changes", headers=headers, params={"since": cursor}
+        )
+        assert response.json()["lists"] == {}
+        assert response.json()["deleted"] == []
+
+        response = await client.delete("/lists", headers=headers)
+        assert response.status_code == 204
+        response = await client.get(
+            "/lists/changes", headers=headers, params={"since": cursor}
+        )
+        assert response.json()["deleted"] == [first_id]
+
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims", new_callable=AsyncMock)
+    async def test_get_list_changes_directly(
+        self, get_token_claims, arborist, alt_session, monkeypatch
+    ):
+        """
+        Test syncing list changes directly against the endpoint, including bad cursors
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            alt_session: direct session access for db
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "LIST_CHANGES_CURSOR_OVERLAP_SECONDS", 0)
+        get_token_claims.return_value = {"sub": "0"}
+        dal = DataAccessLayer(alt_session)
+        r1 = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        outcome = await get_list_changes(EXAMPLE_ENDPOINT_REQUEST, dal)
+        assert outcome.status_code == 200
+        content = json.loads(outcome.body)
+        assert list(content["lists"]) == [str(r1.id)]
+
+        await dal.delete_list(r1.id)
+        outcome = await get_list_changes(
+            EXAMPLE_ENDPOINT_REQUEST, dal, since=content["cursor"]
+        )
+        assert json.loads(outcome.body)["lists"] == {}
+        assert json.loads(outcome.body)["deleted"] == [str(r1.id)]
+
+        too_old = datetime.now(timezone.utc) - timedelta(
+            days=config.LIST_DELETIONS_RETENTION_DAYS + 1
+        )
+        for cursor, status_code in [
+            ("not-a-cursor", 400),
+            (encode_cursor({}), 400),
+            (encode_cursor({"since": "yesterday"}), 400),
+            (encode_cursor({"since": datetime.now().isoformat()}), 400),
+            (encode_cursor({"since": too_old.isoformat()}), 410),
+        ]:
+            with pytest.raises(HTTPException) as exc_info:
+                await get_list_changes(EXAMPLE_ENDPOINT_REQUEST, dal, since=cursor)
+            assert exc_info.value.status_code == status_code
+
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims", new_callable=AsyncMock)
+    async def test_get_list_events_directly(
+        self, get_token_claims, arborist, monkeypatch
+    ):
+        """
+        Test the event stream sends the user's list events and keepalives, stops listening
+        when the client leaves, and 404s when list events are disabled
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "LIST_EVENTS_KEEPALIVE_SECONDS", 0.01)
+        get_token_claims.return_value = {"sub": "0"}
+        app = MagicMock()
+        app.state.list_events = ListEventBroker(get_listen_dsn())
+        request = Request({**EXAMPLE_ENDPOINT_REQUEST.scope, "app": app})
+        with pytest.raises(HTTPException) as exc_info:
+            await get_list_events(request)
+        assert exc_info.value.status_code == 404
+
+        monkeypatch.setattr(config, "ENABLE_LIST_EVENTS", True)
+        app.state.list_events = None
+        request = Request({**EXAMPLE_ENDPOINT_REQUEST.scope, "app": app})
+        with pytest.raises(HTTPException) as exc_info:
+            await get_list_events(request)
+        assert exc_info.value.status_code == 404
+
+        broker = ListEventBroker(get_listen_dsn())
+        app.state.list_events = broker
+        outcome = await get_list_events(request)
+        assert outcome.media_type == "text/event-stream"
+        events = outcome.body_iterator
+        assert await events.__anext__() == ": subscribed\n\n"
+        assert await events.__anext__() == ": keepalive\n\n"
+        broker.publish("1", ["b"])
+        broker.publish("0", ["a"])
+        assert await events.__anext__() == (
+            'event: lists_changed\ndata: {"ids": ["a"]}\n\n'
+        )
+        await events.aclose()
+        assert broker._subscriptions == {}
+
     @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
     @patch("gen3userdatalibrary.auth._get_token_claims")
     async def test_read_all_lists_unknown_error(
@@ -564,6 +808,21 @@ class TestUserListsRouter(BaseTestRouter):
             json.loads(read_all_outcome.body).get("lists", {}).get(str(r1.id), None)
             is not None
         )
+        conditional_request = Request(
+            {
+                **EXAMPLE_ENDPOINT_REQUEST.scope,
+                "headers": Headers(
+                    {"if-none-match": read_all_outcome.headers["etag"]}
+                ).raw,
+            }
+        )
+        outcome = await read_all_lists(conditional_request, dal)
+        assert outcome.status_code == 304
+        await dal.add_items_to_list(r1.id, {"fizz2": "buzz2"})
+        await alt_session.flush()
+        outcome = await read_all_lists(conditional_request, dal)
+        assert outcome.status_code == 200
+        assert outcome.headers["etag"] != read_all_outcome.headers["etag"]
 
     # endregion
 
@@ -610,7 +869,6 @@ class TestUserListsRouter(BaseTestRouter):
         have_seen_c = False
         have_seen_update = False
         for user_list_id, user_list in response_2.json()["lists"].items():
-            assert user_list["version"] == 0
             assert user_list["created_time"]
             assert user_list["updated_time"]
             assert user_list["creator"] == user_id
@@ -621,6 +879,7 @@ class TestUserListsRouter(BaseTestRouter):
             assert user_list["authz"].get("version", {}) == 0
 
             if user_list["name"] == VALID_LIST_A["name"]:
+                assert user_list["version"] == 1
                 assert user_list["created_time"] != user_list["updated_time"]
                 assert user_list["authz"].get("authz") == [
                     get_list_by_id_endpoint(user_id, user_list_id)
@@ -632,6 +891,7 @@ class TestUserListsRouter(BaseTestRouter):
                     )
                 have_seen_update = True
             elif user_list["name"] == VALID_LIST_C["name"]:
+                assert user_list["version"] == 0
                 assert user_list["created_time"] == user_list["updated_time"]
                 assert user_list["authz"].get("authz") == [
                     get_list_by_id_endpoint(user_id, user_list_id)
@@ -772,6 +1032,384 @@ class TestUserListsRouter(BaseTestRouter):
 
     # endregion
 
+    # region Search Lists
+
+    @pytest.mark.parametrize("endpoint", ["/lists/search", "/lists/search/"])
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_find_lists_containing_item(
+        self, get_token_claims, arborist, endpoint, client, monkeypatch
+    ):
+        """
+        Test searching for an item key only returns the user's lists that contain it
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: endpoints to test
+            client: endpoint interface
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "DEBUG_SKIP_AUTH", False)
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        drs_uri = "drs://dg.4503:943200c3-271d-4a04-a2b6-040272239a64"
+        list_with_item = {
+            "name": "Search List",
+            "items": {
+                drs_uri: {"dataset_guid": "phs000001.v1.p1.c1", "type": "GA4GH_DRS"}
+            },
+        }
+        list_without_item = {
+            "name": "Other Search List",
+            "items": {
+                "drs://dg.4503:other": {
+                    "dataset_guid": "phs000001.v1.p1.c1",
+                    "type": "GA4GH_DRS",
+                }
+            },
+        }
+        r1 = await create_basic_list(
+            arborist, get_token_claims, client, list_with_item, headers
+        )
+        await create_basic_list(
+            arborist, get_token_claims, client, list_without_item, headers
+        )
+        await create_basic_list(
+            arborist, get_token_claims, client, list_with_item, headers, "2"
+        )
+        get_token_claims.return_value = {"sub": "1"}
+
+        response = await client.get(
+            endpoint, headers=headers, params={"item_key": drs_uri}
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "lists": {get_id_from_response(r1): {"name": list_with_item["name"]}}
+        }
+
+        response = await client.get(
+            endpoint, headers=headers, params={"item_key": "drs://not.saved"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"lists": {}}
+
+        response = await client.get(endpoint, headers=headers)
+        assert response.status_code == 422
+
+    # endregion
+
+    # region Batch Lists
+
+    @pytest.mark.parametrize("endpoint", ["/lists/_batch_get", "/lists/_batch_get/"])
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_getting_lists_by_ids(
+        self, get_token_claims, arborist, endpoint, client, monkeypatch
+    ):
+        """
+        Test getting several lists at once authorizes them together and reports the ids
+        that don't exist or belong to someone else
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: endpoints to test
+            client: endpoint interface
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "DEBUG_SKIP_AUTH", False)
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        user_lists = [
+            {
+                "name": f"Batch List {i}",
+                "items": {
+                    "drs://dg.4503:1": {"dataset_guid": "phs1", "type": "GA4GH_DRS"}
+                },
+            }
+            for i in range(3)
+        ]
+        r1 = await create_basic_list(
+            arborist, get_token_claims, client, user_lists[0], headers
+        )
+        r2 = await create_basic_list(
+            arborist, get_token_claims, client, user_lists[1], headers
+        )
+        r3 = await create_basic_list(
+            arborist, get_token_claims, client, user_lists[2], headers, "2"
+        )
+        get_token_claims.return_value = {"sub": "1"}
+        own_ids = [get_id_from_response(r1), get_id_from_response(r2)]
+        other_id = get_id_from_response(r3)
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+
+        arborist.auth_request.reset_mock()
+        response = await client.post(
+            endpoint,
+            headers=headers,
+            json={"ids": [*own_ids, other_id, missing_id, own_ids[0]]},
+        )
+        assert response.status_code == 200
+        assert arborist.auth_request.call_count == 1
+        assert arborist.auth_request.call_args.kwargs["resources"] == [
+            get_list_by_id_endpoint("1", list_id)
+            for list_id in [*own_ids, other_id, missing_id, own_ids[0]]
+        ]
+        assert list(response.json()["lists"]) == own_ids
+        assert response.json()["lists"][own_ids[1]]["name"] == "Batch List 1"
+        assert response.json()["not_found"] == [missing_id]
+        assert response.json()["forbidden"] == [other_id]
+
+        response = await client.post(endpoint, headers=headers, json={"ids": []})
+        assert response.status_code == 422
+        response = await client.post(endpoint, headers=headers, json={"ids": ["x"]})
+        assert response.status_code == 422
+        response = await client.post(endpoint, headers=headers, json={"lists": []})
+        assert response.status_code == 400
+        response = await client.post(endpoint, headers=headers, content="not json")
+        assert response.status_code == 400
+
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_get_lists_by_ids_directly(
+        self, get_token_claims, arborist, alt_session
+    ):
+        """
+        Test getting lists by ids directly works as expected
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            alt_session: direct db access
+        """
+        arborist.auth_request.return_value = True
+        get_token_claims.return_value = {"sub": "0"}
+        dal = DataAccessLayer(alt_session)
+        r1 = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        other_list = EXAMPLE_USER_LIST()
+        other_list.creator = "1"
+        r2 = await dal.persist_user_list("1", other_list)
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+        outcome = await get_lists_by_ids(
+            EXAMPLE_ENDPOINT_REQUEST,
+            ListIdsModel(ids=[r1.id, r2.id, missing_id]),
+            dal,
+        )
+        assert outcome.status_code == 200
+        response_data = json.loads(outcome.body)
+        assert list(response_data["lists"]) == [str(r1.id)]
+        assert response_data["lists"][str(r1.id)]["items"] == {"fizz": "buzz"}
+        assert response_data["not_found"] == [missing_id]
+        assert response_data["forbidden"] == [str(r2.id)]
+
+    @pytest.mark.parametrize(
+        "endpoint", ["/lists/_batch_delete", "/lists/_batch_delete/"]
+    )
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_deleting_lists_by_ids(
+        self, get_token_claims, arborist, endpoint, client, monkeypatch
+    ):
+        """
+        Test deleting several lists at once only deletes the user's own lists, and
+        reports the ids that don't exist or belong to someone else
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: endpoints to test
+            client: endpoint interface
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "DEBUG_SKIP_AUTH", False)
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        user_lists = [
+            {
+                "name": f"Batch Delete List {i}",
+                "items": {
+                    f"drs://dg.4503:{j}": {"dataset_guid": "phs1", "type": "GA4GH_DRS"}
+                    for j in range(i + 1)
+                },
+            }
+            for i in range(4)
+        ]
+        responses = [
+            await create_basic_list(
+                arborist, get_token_claims, client, user_list, headers
+            )
+            for user_list in user_lists[:3]
+        ]
+        r4 = await create_basic_list(
+            arborist, get_token_claims, client, user_lists[3], headers, "2"
+        )
+        get_token_claims.return_value = {"sub": "1"}
+        own_ids = [get_id_from_response(response) for response in responses]
+        other_id = get_id_from_response(r4)
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+
+        arborist.auth_request.reset_mock()
+        response = await client.post(
+            endpoint,
+            headers=headers,
+            json={"ids": [own_ids[0], own_ids[2], other_id, missing_id]},
+        )
+        assert response.status_code == 200
+        assert arborist.auth_request.call_count == 1
+        assert arborist.auth_request.call_args.kwargs["methods"] == "delete"
+        assert response.json() == {
+            "deleted": [own_ids[0], own_ids[2]],
+            "not_found": [missing_id],
+            "forbidden": [other_id],
+        }
+        response = await client.get("/lists", headers=headers)
+        assert list(response.json()["lists"]) == [own_ids[1]]
+        get_token_claims.return_value = {"sub": "2"}
+        response = await client.get("/lists", headers=headers)
+        assert list(response.json()["lists"]) == [other_id]
+
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_delete_lists_by_ids_directly(
+        self, get_token_claims, arborist, alt_session
+    ):
+        """
+        Test deleting lists by ids directly works as expected
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            alt_session: direct db access
+        """
+        arborist.auth_request.return_value = True
+        get_token_claims.return_value = {"sub": "0"}
+        dal = DataAccessLayer(alt_session)
+        r1 = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        other_list = EXAMPLE_USER_LIST()
+        other_list.creator = "1"
+        r2 = await dal.persist_user_list("1", other_list)
+        await alt_session.flush()
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+        outcome = await delete_lists_by_ids(
+            EXAMPLE_ENDPOINT_REQUEST,
+            ListIdsModel(ids=[r1.id, r2.id, missing_id]),
+            dal,
+        )
+        assert outcome.status_code == 200
+        assert json.loads(outcome.body) == {
+            "deleted": [str(r1.id)],
+            "not_found": [missing_id],
+            "forbidden": [str(r2.id)],
+        }
+        assert await dal.get_list_item_count(r1.id) is None
+
+    @pytest.mark.parametrize("endpoint", ["/lists/_combine", "/lists/_combine/"])
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_combining_and_cloning_lists(
+        self, get_token_claims, arborist, endpoint, client, monkeypatch
+    ):
+        """
+        Test combining and cloning lists creates new lists with the right items, and
+        rejects other users' lists, missing lists, taken names and too many items
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: endpoints to test
+            client: endpoint interface
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "DEBUG_SKIP_AUTH", False)
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        drs_item = {"dataset_guid": "phs1", "type": "GA4GH_DRS"}
+        responses = [
+            await create_basic_list(
+                arborist,
+                get_token_claims,
+                client,
+                {"name": name, "items": {key: drs_item for key in keys}},
+                headers,
+                user_id,
+            )
+            for name, keys, user_id in [
+                ("Combine A", ["drs://a", "drs://b"], "1"),
+                ("Combine B", ["drs://b", "drs://c"], "1"),
+                ("Combine Other", ["drs://a"], "2"),
+            ]
+        ]
+        get_token_claims.return_value = {"sub": "1"}
+        l_a, l_b, l_other = [get_id_from_response(resp) for resp in responses]
+
+        response = await client.post(
+            endpoint,
+            headers=headers,
+            json={"name": "A and B", "operation": "intersection", "ids": [l_a, l_b]},
+        )
+        assert response.status_code == 201
+        assert response.json()["name"] == "A and B"
+        new_id = response.json()["id"]
+        response = await client.get(f"/lists/{new_id}", headers=headers)
+        assert response.json()["items"] == {"drs://b": drs_item}
+
+        response = await client.post(
+            f"/lists/{l_a}/_clone", headers=headers, json={"name": "Copy of A"}
+        )
+        assert response.status_code == 201
+        response = await client.get(f"/lists/{response.json()['id']}", headers=headers)
+        assert response.json()["items"] == {"drs://a": drs_item, "drs://b": drs_item}
+
+        bad_requests = [
+            ({"name": "A and B", "operation": "union", "ids": [l_a, l_b]}, 409),
+            ({"name": "Other", "operation": "union", "ids": [l_a, l_other]}, 403),
+            (
+                {
+                    "name": "Missing",
+                    "operation": "union",
+                    "ids": [l_a, "550e8400-e29b-41d4-a716-446655440000"],
+                },
+                404,
+            ),
+            ({"name": "One", "operation": "union", "ids": [l_a]}, 422),
+            ({"name": "Xor", "operation": "xor", "ids": [l_a, l_b]}, 422),
+        ]
+        for body, status_code in bad_requests:
+            response = await client.post(endpoint, headers=headers, json=body)
+            assert response.status_code == status_code
+        monkeypatch.setattr(config, "MAX_LIST_ITEMS", 2)
+        response = await client.post(
+            endpoint,
+            headers=headers,
+            json={"name": "Too Big", "operation": "union", "ids": [l_a, l_b]},
+        )
+        assert response.status_code == 409
+        response = await client.get("/lists", headers=headers)
+        assert len(response.json()["lists"]) == 4
+
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_combine_lists_directly(
+        self, get_token_claims, arborist, alt_session
+    ):
+        """
+        Test combining lists directly works as expected
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            alt_session: direct db access
+        """
+        arborist.auth_request.return_value = True
+        get_token_claims.return_value = {"sub": "0"}
+        dal = DataAccessLayer(alt_session)
+        r1 = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        other_list = EXAMPLE_USER_LIST()
+        other_list.name = "other"
+        other_list.items = {"bug": "bear"}
+        r2 = await dal.persist_user_list("0", other_list)
+        await alt_session.flush()
+        outcome = await combine_lists(
+            EXAMPLE_ENDPOINT_REQUEST,
+            CombineListsModel(name="both", operation="union", ids=[r1.id, r2.id]),
+            dal,
+        )
+        assert outcome.status_code == 201
+        new_list = await dal.get_user_list_by_list_id(json.loads(outcome.body)["id"])
+        assert new_list.items == {"fizz": "buzz", "bug": "bear"}
+
+    # endregion
+
     # region Delete Lists
 
     @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
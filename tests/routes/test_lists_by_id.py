@@ -3,14 +3,19 @@ from unittest.mock import AsyncMock, patch, MagicMock
 from uuid import UUID
 
 import pytest
+from fastapi import HTTPException
 from starlette.datastructures import Headers
 from starlette.requests import Request
 
 from gen3userdatalibrary.db import DataAccessLayer
 from gen3userdatalibrary.main import route_aggregator
-from gen3userdatalibrary.models.user_list import ItemToUpdateModel
+from gen3userdatalibrary.models.user_list import CloneListModel, ItemToUpdateModel
 from gen3userdatalibrary.routes.lists_by_id import (
+    clone_list,
+    get_expected_versions,
     get_list_by_id,
+    get_list_etag,
+    get_list_items,
     update_list_by_id,
     append_items_to_list,
     delete_list_by_id,
@@ -128,6 +133,478 @@ class TestUserListsRouter(BaseTestRouter):
         response = await test_client.get(endpoint(l_id), headers=headers)
         assert response.status_code == 404
 
+    @pytest.mark.parametrize(
+        "endpoint", [lambda l_id: f"/lists/{l_id}", lambda l_id: f"/lists/{l_id}/"]
+    )
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_getting_id_with_item_filters(
+        self, get_token_claims, arborist, endpoint, client
+    ):
+        """
+        Ensure item filters and pagination on get by id are applied and paginated
+
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: id endpoint callable strings
+            client: endpoint interface
+        """
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        mixed_list = {
+            "name": "Mixed Items",
+            "items": {
+                "drs://dg.4503:a": {"dataset_guid": "phs1", "type": "GA4GH_DRS"},
+                "drs://dg.4503:b": {"dataset_guid": "phs2", "type": "GA4GH_DRS"},
+                "drs://dg.TEST:c": {"dataset_guid": "phs1", "type": "GA4GH_DRS"},
+                "CF_1": {
+                    "name": "Cohort Filter 1",
+                    "type": "Gen3GraphQL",
+                    "schema_version": "c246d0f",
+                    "data": {"query": "query { subject }", "variables": {}},
+                },
+            },
+        }
+        resp1 = await create_basic_list(
+            arborist, get_token_claims, client, mixed_list, headers
+        )
+        l_id = get_id_from_response(resp1)
+
+        response = await client.get(
+            endpoint(l_id), headers=headers, params={"type": "GA4GH_DRS"}
+        )
+        assert response.status_code == 200
+        content = response.json()
+        assert content["name"] == mixed_list["name"]
+        assert list(content["items"]) == [
+            "drs://dg.4503:a",
+            "drs://dg.4503:b",
+            "drs://dg.TEST:c",
+        ]
+        assert content["pagination"] == {"limit": 100, "offset": 0, "total": 3}
+
+        response = await client.get(
+            endpoint(l_id),
+            headers=headers,
+            params={"key_prefix": "drs://dg.4503", "dataset_guid": "phs1"},
+        )
+        assert response.json()["items"] == {
+            "drs://dg.4503:a": mixed_list["items"]["drs://dg.4503:a"]
+        }
+
+        response = await client.get(
+            endpoint(l_id), headers=headers, params={"limit": 2, "offset": 1}
+        )
+        content = response.json()
+        assert list(content["items"]) == ["drs://dg.4503:a", "drs://dg.4503:b"]
+        assert content["pagination"] == {"limit": 2, "offset": 1, "total": 4}
+
+        response = await client.get(
+            endpoint(l_id), headers=headers, params={"offset": 10}
+        )
+        content = response.json()
+        assert content["items"] == {}
+        assert content["pagination"]["total"] == 4
+
+        response = await client.get(
+            endpoint(l_id), headers=headers, params={"key_prefix": "drs://dg.45%"}
+        )
+        assert response.json()["pagination"]["total"] == 0
+
+        response = await client.get(
+            endpoint(l_id), headers=headers, params={"limit": 0}
+        )
+        assert response.status_code == 422
+
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+        response = await client.get(
+            endpoint(missing_id), headers=headers, params={"type": "GA4GH_DRS"}
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "endpoint", [lambda l_id: f"/lists/{l_id}", lambda l_id: f"/lists/{l_id}/"]
+    )
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_getting_id_with_etag(
+        self, get_token_claims, arborist, endpoint, client, session
+    ):
+        """
+        Ensure get by id returns an ETag, and a 304 when If-None-Match has the current one
+
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: id endpoint callable strings
+            client: endpoint interface
+            session: db session the client uses
+        """
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        user_list = {
+            "name": "ETag List",
+            "items": {"drs://dg.4503:a": {"dataset_guid": "phs1", "type": "GA4GH_DRS"}},
+        }
+        resp1 = await create_basic_list(
+            arborist, get_token_claims, client, user_list, headers
+        )
+        l_id = get_id_from_response(resp1)
+
+        response = await client.get(endpoint(l_id), headers=headers)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        for if_none_match in [etag, f"W/{etag}", f'"other", {etag}', "*"]:
+            response = await client.get(
+                endpoint(l_id), headers={**headers, "If-None-Match": if_none_match}
+            )
+            assert response.status_code == 304
+            assert response.headers["ETag"] == etag
+            assert response.content == b""
+
+        response = await client.get(
+            endpoint(l_id), headers={**headers, "If-None-Match": '"other"'}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == etag
+
+        # each page of items is its own representation
+        response = await client.get(
+            endpoint(l_id),
+            headers={**headers, "If-None-Match": etag},
+            params={"limit": 1},
+        )
+        assert response.status_code == 200
+        page_etag = response.headers["ETag"]
+        assert page_etag != etag
+        response = await client.get(
+            endpoint(l_id),
+            headers={**headers, "If-None-Match": page_etag},
+            params={"limit": 1},
+        )
+        assert response.status_code == 304
+
+        response = await client.patch(
+            endpoint(l_id),
+            headers=headers,
+            json={"drs://dg.4503:b": {"dataset_guid": "phs1", "type": "GA4GH_DRS"}},
+        )
+        assert response.status_code == 200
+        # requests commit their own sessions outside of tests
+        await session.flush()
+        response = await client.get(
+            endpoint(l_id), headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert len(response.json()["items"]) == 2
+
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+        response = await client.get(
+            endpoint(missing_id), headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "endpoint",
+        [lambda l_id: f"/lists/{l_id}/items", lambda l_id: f"/lists/{l_id}/items/"],
+    )
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_getting_items_with_cursor(
+        self, get_token_claims, arborist, endpoint, client
+    ):
+        """
+        Ensure walking a list's items page by page with the cursor returns every item once,
+        in key order
+
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: items endpoint callable strings
+            client: endpoint interface
+        """
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        keys = [f"drs://dg.4503:{i}" for i in range(5)]
+        big_list = {
+            "name": "Paged Items",
+            "items": {
+                key: {"dataset_guid": "phs1", "type": "GA4GH_DRS"} for key in keys
+            },
+        }
+        resp1 = await create_basic_list(
+            arborist, get_token_claims, client, big_list, headers
+        )
+        l_id = get_id_from_response(resp1)
+
+        seen_keys = []
+        params = {"limit": 2}
+        while True:
+            response = await client.get(endpoint(l_id), headers=headers, params=params)
+            assert response.status_code == 200
+            content = response.json()
+            assert content["total"] == 5
+            seen_keys.extend(content["items"])
+            if content["next_cursor"] is None:
+                break
+            params["cursor"] = content["next_cursor"]
+        assert seen_keys == keys
+
+        response = await client.get(
+            endpoint(l_id), headers=headers, params={"cursor": "not a cursor"}
+        )
+        assert response.status_code == 400
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+        response = await client.get(endpoint(missing_id), headers=headers)
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "endpoint",
+        [lambda l_id: f"/lists/{l_id}/items", lambda l_id: f"/lists/{l_id}/items/"],
+    )
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_deleting_items_by_key(
+        self, get_token_claims, arborist, endpoint, client
+    ):
+        """
+        Ensure deleting items by key only removes those items and reports how many were removed
+
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: items endpoint callable strings
+            client: endpoint interface
+        """
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        keys = [f"drs://dg.4503:{i}" for i in range(3)]
+        three_item_list = {
+            "name": "Items To Delete",
+            "items": {
+                key: {"dataset_guid": "phs1", "type": "GA4GH_DRS"} for key in keys
+            },
+        }
+        resp1 = await create_basic_list(
+            arborist, get_token_claims, client, three_item_list, headers
+        )
+        l_id = get_id_from_response(resp1)
+
+        response = await client.request(
+            "DELETE",
+            endpoint(l_id),
+            headers=headers,
+            json={"keys": [keys[0], keys[2], "drs://not.in.list"]},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"items_deleted": 2}
+        response = await client.get(f"/lists/{l_id}", headers=headers)
+        assert list(response.json()["items"]) == [keys[1]]
+
+        response = await client.request(
+            "DELETE", endpoint(l_id), headers=headers, json={"keys": []}
+        )
+        assert response.status_code == 422
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+        response = await client.request(
+            "DELETE", endpoint(missing_id), headers=headers, json={"keys": keys}
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "endpoint", [lambda l_id: f"/lists/{l_id}", lambda l_id: f"/lists/{l_id}/"]
+    )
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_patching_by_id_with_json_patch(
+        self, get_token_claims, arborist, endpoint, client
+    ):
+        """
+        Ensure a JSON Patch only changes the items it touches, and that invalid patches
+        or patched items are rejected without changing the list
+
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: id endpoint callable strings
+            client: endpoint interface
+        """
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        patch_headers = {**headers, "Content-Type": "application/json-patch+json"}
+        keys = [f"drs://dg.4503:{i}" for i in range(3)]
+        escaped_keys = [key.replace("/", "~1") for key in keys]
+        three_item_list = {
+            "name": "Items To Patch",
+            "items": {
+                key: {"dataset_guid": "phs1", "type": "GA4GH_DRS"} for key in keys
+            },
+        }
+        resp1 = await create_basic_list(
+            arborist, get_token_claims, client, three_item_list, headers
+        )
+        l_id = get_id_from_response(resp1)
+
+        json_patch = [
+            {
+                "op": "test",
+                "path": f"/items/{escaped_keys[0]}/dataset_guid",
+                "value": "phs1",
+            },
+            {
+                "op": "replace",
+                "path": f"/items/{escaped_keys[0]}/dataset_guid",
+                "value": "phs2",
+            },
+            {"op": "remove", "path": f"/items/{escaped_keys[1]}"},
+            {
+                "op": "add",
+                "path": "/items/drs:~1~1dg.4503:3",
+                "value": {"dataset_guid": "phs3", "type": "GA4GH_DRS"},
+            },
+            {"op": "replace", "path": "/name", "value": "Patched"},
+        ]
+        response = await client.patch(
+            endpoint(l_id), headers=patch_headers, content=json.dumps(json_patch)
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == "Patched"
+        assert "items" not in response.json()
+        response = await client.get(f"/lists/{l_id}", headers=headers)
+        assert response.json()["items"] == {
+            keys[0]: {"dataset_guid": "phs2", "type": "GA4GH_DRS"},
+            keys[2]: {"dataset_guid": "phs1", "type": "GA4GH_DRS"},
+            "drs://dg.4503:3": {"dataset_guid": "phs3", "type": "GA4GH_DRS"},
+        }
+
+        bad_patches = {
+            400: [
+                {"op": "replace", "path": "/authz", "value": {}},
+                {"op": "remove", "path": f"/items/{escaped_keys[0]}/type"},
+                {"op": "replace", "path": "/name", "value": ""},
+                {"op": "frobnicate", "path": "/name"},
+            ],
+            409: [
+                {"op": "test", "path": "/name", "value": "Items To Patch"},
+                {"op": "remove", "path": f"/items/{escaped_keys[1]}"},
+            ],
+        }
+        for status_code, operations in bad_patches.items():
+            for operation in operations:
+                response = await client.patch(
+                    endpoint(l_id),
+                    headers=patch_headers,
+                    content=json.dumps([operation]),
+                )
+                assert response.status_code == status_code
+        for body, status_code in [({"op": "remove"}, 400), ([], 409)]:
+            response = await client.patch(
+                endpoint(l_id), headers=patch_headers, content=json.dumps(body)
+            )
+            assert response.status_code == status_code
+        response = await client.patch(endpoint(l_id), headers=headers, json=json_patch)
+        assert response.status_code == 400
+        missing_id = "550e8400-e29b-41d4-a716-446655440000"
+        response = await client.patch(
+            endpoint(missing_id), headers=patch_headers, content=json.dumps(json_patch)
+        )
+        assert response.status_code == 404
+        response = await client.get(f"/lists/{l_id}", headers=headers)
+        assert response.json()["name"] == "Patched"
+        assert len(response.json()["items"]) == 3
+
+    @pytest.mark.parametrize(
+        "endpoint", [lambda l_id: f"/lists/{l_id}", lambda l_id: f"/lists/{l_id}/"]
+    )
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_updating_by_id_with_if_match(
+        self, get_token_claims, arborist, endpoint, client
+    ):
+        """
+        Ensure every write bumps the list's ETag, and writes with an If-Match that isn't the
+        current ETag are refused with a 412
+
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            endpoint: id endpoint callable strings
+            client: endpoint interface
+        """
+        headers = {"Authorization": "Bearer ofa.valid.token"}
+        item = {"dataset_guid": "phs1", "type": "GA4GH_DRS"}
+        user_list = {"name": "If-Match List", "items": {"drs://dg.4503:a": item}}
+        resp1 = await create_basic_list(
+            arborist, get_token_claims, client, user_list, headers
+        )
+        l_id = get_id_from_response(resp1)
+        etag = (await client.get(endpoint(l_id), headers=headers)).headers["ETag"]
+        assert etag == '"0"'
+
+        updated_list = {**user_list, "name": "Updated If-Match List"}
+        response = await client.put(
+            endpoint(l_id), headers={**headers, "If-Match": etag}, json=updated_list
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"1"'
+        assert response.json()["version"] == 1
+        response = await client.put(
+            endpoint(l_id), headers={**headers, "If-Match": etag}, json=user_list
+        )
+        assert response.status_code == 412
+
+        response = await client.patch(
+            endpoint(l_id),
+            headers={**headers, "If-Match": '"0", "1"'},
+            json={"drs://dg.4503:b": item},
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"2"'
+        for stale_if_match in ['"1"', 'W/"2"', "not-an-etag"]:
+            response = await client.patch(
+                endpoint(l_id),
+                headers={**headers, "If-Match": stale_if_match},
+                json={"drs://dg.4503:c": item},
+            )
+            assert response.status_code == 412
+
+        json_patch = [{"op": "replace", "path": "/name", "value": "Renamed"}]
+        patch_headers = {**headers, "Content-Type": "application/json-patch+json"}
+        response = await client.patch(
+            endpoint(l_id),
+            headers={**patch_headers, "If-Match": '"1"'},
+            content=json.dumps(json_patch),
+        )
+        assert response.status_code == 412
+        response = await client.patch(
+            endpoint(l_id),
+            headers={**patch_headers, "If-Match": "*"},
+            content=json.dumps(json_patch),
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"3"'
+
+        items_endpoint = f"/lists/{l_id}/items"
+        to_delete = {"keys": ["drs://dg.4503:b"]}
+        response = await client.request(
+            "DELETE",
+            items_endpoint,
+            headers={**headers, "If-Match": '"2"'},
+            json=to_delete,
+        )
+        assert response.status_code == 412
+        response = await client.request(
+            "DELETE",
+            items_endpoint,
+            headers={**headers, "If-Match": '"3"'},
+            json=to_delete,
+        )
+        assert response.status_code == 200
+        assert response.json() == {"items_deleted": 1}
+
+        response = await client.get(endpoint(l_id), headers=headers)
+        assert response.headers["ETag"] == '"4"'
+        assert response.json()["name"] == "Renamed"
+        assert list(response.json()["items"]) == ["drs://dg.4503:a"]
+
     @pytest.mark.parametrize(
         "endpoint", [lambda l_id: f"/lists/{l_id}", lambda l_id: f"/lists/{l_id}/"]
     )
@@ -501,6 +978,62 @@ class TestUserListsRouter(BaseTestRouter):
         outcome = await get_list_by_id(r1.id, EXAMPLE_REQUEST, dal)
         assert outcome.status_code == 200
         assert json.loads(outcome.body).get("id", None) == str(r1.id)
+        outcome = await get_list_by_id(r1.id, EXAMPLE_REQUEST, dal, limit=1)
+        assert outcome.status_code == 200
+        assert json.loads(outcome.body)["pagination"]["total"] == 1
+        outcome = await get_list_by_id(l_id, EXAMPLE_REQUEST, dal, offset=1)
+        assert outcome.status_code == 404
+        outcome = await get_list_by_id(r1.id, EXAMPLE_REQUEST, dal)
+        conditional_request = Request(
+            {
+                **EXAMPLE_REQUEST.scope,
+                "headers": Headers(
+                    {"host": "127.0.0.1:8000", "if-none-match": outcome.headers["etag"]}
+                ).raw,
+            }
+        )
+        outcome = await get_list_by_id(r1.id, conditional_request, dal)
+        assert outcome.status_code == 304
+        outcome = await get_list_by_id(l_id, conditional_request, dal)
+        assert outcome.status_code == 404
+
+        outcome = await get_list_items(r1.id, EXAMPLE_REQUEST, dal, limit=1)
+        assert json.loads(outcome.body) == {
+            "items": {"fizz": "buzz"},
+            "total": 1,
+            "next_cursor": None,
+        }
+        outcome = await get_list_items(l_id, EXAMPLE_REQUEST, dal)
+        assert outcome.status_code == 404
+        with pytest.raises(HTTPException):
+            await get_list_items(r1.id, EXAMPLE_REQUEST, dal, cursor="e30=")
+
+    async def test_list_etags_and_if_match(self):
+        """
+        Test list ETags are the list's version, and If-Match is parsed into the versions a
+        write expects
+        """
+
+        def request_with(headers, query_string=b""):
+            return Request(
+                {
+                    "type": "http",
+                    "method": "PUT",
+                    "path": "/example",
+                    "headers": Headers(headers).raw,
+                    "query_string": query_string,
+                }
+            )
+
+        assert get_list_etag(request_with({}), {"version": 3}) == '"3"'
+        page_etag = get_list_etag(request_with({}, b"limit=1"), {"version": 3})
+        assert page_etag.startswith('"3-') and page_etag.endswith('"')
+        assert get_expected_versions(request_with({})) is None
+        assert get_expected_versions(request_with({"if-match": " * "})) is None
+        assert get_expected_versions(
+            request_with({"if-match": f'"1", W/"2", {page_etag},"4"'})
+        ) == [1, 4]
+        assert get_expected_versions(request_with({"if-match": "3"})) == []
 
     @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
     @patch("gen3userdatalibrary.auth._get_token_claims")
@@ -558,6 +1091,77 @@ class TestUserListsRouter(BaseTestRouter):
             "bug": "bear",
         }
 
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_json_patch_list_directly(
+        self, get_token_claims, arborist, alt_session
+    ):
+        """
+        Test applying a JSON Patch directly works as expected
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            alt_session: direct db access
+        """
+        arborist.auth_request.return_value = True
+        get_token_claims.return_value = {"sub": "0"}
+        dal = DataAccessLayer(alt_session)
+        example_list = EXAMPLE_USER_LIST()
+        example_list.items = {"a": {"type": "GA4GH_DRS", "dataset_guid": "phs1"}}
+        r1 = await dal.persist_user_list("0", example_list)
+        await alt_session.flush()
+        json_patch = [
+            {"op": "copy", "from": "/items/a", "path": "/items/b"},
+            {"op": "remove", "path": "/items/a"},
+        ]
+        patch_outcome = await append_items_to_list(
+            EXAMPLE_JSON_PATCH_REQUEST, r1.id, json_patch, dal
+        )
+        assert patch_outcome.status_code == 200
+        assert json.loads(patch_outcome.body)["id"] == str(r1.id)
+        get_outcome = await dal.get_user_list_by_list_id(r1.id)
+        assert get_outcome.items == {"b": {"type": "GA4GH_DRS", "dataset_guid": "phs1"}}
+
+        test_only_patch = [
+            {"op": "test", "path": "/items/b/type", "value": "GA4GH_DRS"}
+        ]
+        patch_outcome = await append_items_to_list(
+            EXAMPLE_JSON_PATCH_REQUEST, r1.id, test_only_patch, dal
+        )
+        assert patch_outcome.status_code == 200
+        with pytest.raises(HTTPException) as exc_info:
+            await append_items_to_list(
+                EXAMPLE_JSON_PATCH_REQUEST,
+                r1.id,
+                [{"op": "add", "path": "/items/c", "value": {"type": "unknown"}}],
+                dal,
+            )
+        assert exc_info.value.status_code == 400
+
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims")
+    async def test_clone_list_directly(self, get_token_claims, arborist, alt_session):
+        """
+        Test cloning directly works as expected
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            alt_session: direct db access
+        """
+        arborist.auth_request.return_value = True
+        get_token_claims.return_value = {"sub": "0"}
+        dal = DataAccessLayer(alt_session)
+        r1 = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        await alt_session.flush()
+        clone_outcome = await clone_list(
+            EXAMPLE_ENDPOINT_REQUEST, r1.id, CloneListModel(name="clone"), dal
+        )
+        assert clone_outcome.status_code == 201
+        clone_id = json.loads(clone_outcome.body)["id"]
+        assert clone_id != str(r1.id)
+        clone = await dal.get_user_list_by_list_id(clone_id)
+        assert (clone.name, clone.items) == ("clone", {"fizz": "buzz"})
+
     @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
     @patch("gen3userdatalibrary.auth._get_token_claims")
     async def test_delete_list_by_id_directly(
@@ -592,3 +1196,17 @@ EXAMPLE_ENDPOINT_REQUEST = Request(
         "app": MagicMock(),
     }
 )
+
+EXAMPLE_JSON_PATCH_REQUEST = Request(
+    {
+        "type": "http",
+        "method": "PATCH",
+        "path": "/example",
+        "headers": Headers(
+            {"host": "127.0.0.1:8000", "content-type": "application/json-patch+json"}
+        ).raw,
+        "query_string": b"",
+        "client": ("127.0.0.1", 8000),
+        "app": MagicMock(),
+    }
+)
@@ -0,0 +1,298 @@
+import json
+import sqlite3
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from gen3userdatalibrary import config, db
+from gen3userdatalibrary.cache import (
+    ENTRY_OVERHEAD_BYTES,
+    CachedResponse,
+    ListCache,
+    SharedListCache,
+    list_cache,
+)
+from gen3userdatalibrary.db import DataAccessLayer, get_data_access_layer
+from gen3userdatalibrary.events import ListEventBroker, get_listen_dsn
+from gen3userdatalibrary.main import route_aggregator
+from gen3userdatalibrary.models.user_list import UserList
+from gen3userdatalibrary.routes.lists import read_all_lists
+from gen3userdatalibrary.routes.lists_by_id import get_list_by_id
+from tests.routes.conftest import BaseTestRouter
+from tests.routes.test_lists_by_id import EXAMPLE_ENDPOINT_REQUEST
+from tests.test_db import EXAMPLE_USER_LIST
+
+
+@pytest_asyncio.fixture
+async def listening_cache(monkeypatch):
+    """
+    The app's list cache, attached to a started broker like it is when it's enabled
+    """
+    monkeypatch.setattr(config, "LIST_CACHE_MAX_BYTES", 100000)
+    monkeypatch.setattr(list_cache, "max_bytes", 100000)
+    broker = ListEventBroker(get_listen_dsn())
+    metrics = MagicMock()
+    list_cache.attach(broker, metrics)
+    await broker.start()
+    yield list_cache
+    list_cache.detach()
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+class TestListCache(BaseTestRouter):
+    router = route_aggregator
+
+    async def test_cache_is_a_bounded_lru(self):
+        """
+        Test entries are evicted least recently used first to stay under the byte limit,
+        and that the cache is bypassed while it can't hear about writes
+        """
+        broker = MagicMock(is_listening=True)
+        metrics = MagicMock()
+        cache = ListCache(max_bytes=3 * (ENTRY_OVERHEAD_BYTES + 10))
+        cache.attach(broker, metrics)
+        broker.add_change_listener.assert_called_once_with(cache.invalidate)
+        for key in "abc":
+            cache.put(key, b"0123456789", f'"{key}"', [key], cache.begin_read())
+        assert cache.get("a").etag == '"a"'
+        cache.put("d", b"0123456789", '"d"', ["d"], cache.begin_read())
+        assert cache.get("b") is None
+        assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+        assert cache.size == 3 * (ENTRY_OVERHEAD_BYTES + 10)
+        cache.put("e", b"0" * cache.max_bytes, '"e"', ["e"], cache.begin_read())
+        assert cache.get("e") is None
+        events = [
+            call.kwargs["event"] for call in metrics.add_list_cache_event.mock_calls
+        ]
+        assert events.count("eviction") == 1
+        assert events.count("miss") == 2
+        assert events.count("hit") == 4
+
+        broker.is_listening = False
+        assert cache.get("a") is None
+        cache.put("f", b"", '"f"', ["f"], cache.begin_read())
+        broker.is_listening = True
+        assert cache.get("f") is None
+
+        cache.detach()
+        assert cache.size == 0
+        assert not cache.enabled
+
+    async def test_cache_invalidation(self):
+        """
+        Test writes drop the entries tagged with their creator or lists, and that responses
+        read before an invalidation aren't cached after it
+        """
+        cache = ListCache(max_bytes=100000)
+        cache.attach(MagicMock(is_listening=True))
+        cache.put("library-0", b"{}", '"l0"', ["0", "a", "b"], cache.begin_read())
+        cache.put("list-a", b"{}", '"a"', ["a"], cache.begin_read())
+        cache.put("list-b", b"{}", '"b"', ["b"], cache.begin_read())
+        cache.put("library-1", b"{}", '"l1"', ["1", "c"], cache.begin_read())
+
+        cache.invalidate("0", ["a"])
+        assert cache.get("library-0") is None
+        assert cache.get("list-a") is None
+        assert cache.get("list-b") is not None
+        assert cache.get("library-1") is not None
+
+        read_token = cache.begin_read()
+        cache.invalidate("1", [])
+        cache.put("library-1", b"{}", '"l1"', ["1", "c"], read_token)
+        assert cache.get("library-1") is None
+
+        cache.invalidate(None, None)
+        assert cache.get("list-b") is None
+        assert cache.size == 0
+
+    async def test_shared_cache_between_workers(self, tmp_path):
+        """
+        Test responses cached by one worker are hits for another, that invalidations by any
+        worker stop responses read before them from being cached, and LRU eviction
+        Args:
+            tmp_path: directory for the cache file
+        """
+        path = str(tmp_path / "lists.sqlite")
+        entry_size = ENTRY_OVERHEAD_BYTES + 2
+        first = SharedListCache(path, max_bytes=3 * entry_size)
+        second = SharedListCache(path, max_bytes=3 * entry_size)
+        response = CachedResponse(b"{}", '"a"', ["0", "a"])
+
+        assert first.put("list-a", response, first.begin_read()) == 0
+        cached = second.get("list-a")
+        assert (cached.body, cached.etag) == (b"{}", '"a"')
+        assert second.get("list-b") is None
+
+        read_token = first.begin_read()
+        second.invalidate(["a"])
+        assert second.get("list-a") is None
+        first.put("list-a", response, read_token)
+        assert first.get("list-a") is None
+        first.put("list-b", CachedResponse(b"{}", '"b"', ["b"]), read_token)
+        assert first.get("list-b") is not None
+
+        for key in ["list-c", "list-d"]:
+            first.put(key, CachedResponse(b"{}", "", [key]), first.begin_read())
+        second.get("list-b")
+        assert first.put("list-e", response, first.begin_read()) == 1
+        assert second.get("list-c") is None
+        assert [second.get(key) is not None for key in ["list-b", "list-d"]] == [
+            True,
+            True,
+        ]
+
+        first.invalidation_log_size = 1
+        read_token = first.begin_read()
+        first.invalidate(["x"])
+        first.invalidate(["y"])
+        first.put("list-f", response, read_token)
+        assert second.get("list-f") is None
+        assert first.put("too-big", CachedResponse(b"0" * 1000, "", []), 0) == 0
+        assert first.put("busy", response, None) == 0
+
+        second.clear()
+        assert first.get("list-e") is None
+        first.close()
+        second._pid = -1
+        assert second.get("list-b") is None
+        second.close()
+
+    async def test_shared_cache_gives_up_when_locked(self, tmp_path):
+        """
+        Test lookups still hit, and puts and invalidations don't wait long, while another
+        worker holds the write lock
+        Args:
+            tmp_path: directory for the cache file
+        """
+        path = str(tmp_path / "lists.sqlite")
+        cache = SharedListCache(path, 100000, read_timeout=0, invalidate_timeout=0)
+        cache.put("list-a", CachedResponse(b"{}", "", ["a"]), cache.begin_read())
+        locker = sqlite3.connect(path, isolation_level=None)
+        locker.execute("BEGIN EXCLUSIVE")
+        try:
+            assert cache.get("list-a") is not None
+            assert cache.put("list-b", CachedResponse(b"{}", "", []), 0) == 0
+            cache.invalidate(["a"])
+        finally:
+            locker.execute("ROLLBACK")
+            locker.close()
+        assert cache.get("list-a") is not None
+        cache.close()
+
+    async def test_list_cache_with_shared_tier(self, tmp_path):
+        """
+        Test the worker's cache falls back to the shared tier and invalidates it too
+        Args:
+            tmp_path: directory for the cache file
+        """
+        path = str(tmp_path / "lists.sqlite")
+        metrics = MagicMock()
+        worker = ListCache(0, SharedListCache(path, 100000))
+        other_worker = ListCache(0, SharedListCache(path, 100000))
+        worker.attach(MagicMock(is_listening=True), metrics)
+        other_worker.attach(MagicMock(is_listening=True))
+        worker.put("library-0", b"{}", '"l"', ["0", "a"], worker.begin_read())
+        assert other_worker.get("library-0").etag == '"l"'
+        assert worker.get("library-0") is not None
+        assert worker.size == 0
+
+        other_worker.invalidate("1", ["a"])
+        assert worker.get("library-0") is None
+        events = {
+            (call.kwargs["event"], call.kwargs["tier"])
+            for call in metrics.add_list_cache_event.mock_calls
+        }
+        assert events == {("hit", "shared"), ("miss", "shared")}
+
+        worker.put("library-0", b"{}", '"l"', ["0"], worker.begin_read())
+        other_worker.invalidate(None, None)
+        assert worker.get("library-0") is None
+        worker.detach()
+        other_worker.detach()
+
+    @patch("gen3userdatalibrary.auth.arborist", new_callable=AsyncMock)
+    @patch("gen3userdatalibrary.auth._get_token_claims", new_callable=AsyncMock)
+    async def test_list_responses_are_cached(
+        self, get_token_claims, arborist, alt_session, listening_cache
+    ):
+        """
+        Test GET /lists and GET /lists/{id} are served from the cache until the list changes
+        Args:
+            get_token_claims: mock token
+            arborist: bypass auth
+            alt_session: direct session access for db
+            listening_cache: the enabled list cache
+        """
+        get_token_claims.return_value = {"sub": "0"}
+        dal = DataAccessLayer(alt_session)
+        created = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        await alt_session.flush()
+
+        first = await get_list_by_id(created.id, EXAMPLE_ENDPOINT_REQUEST, dal)
+        library = await read_all_lists(EXAMPLE_ENDPOINT_REQUEST, dal)
+        # change the list behind the cache's back
+        await alt_session.execute(update(UserList).values(name="changed"))
+        cached = await get_list_by_id(created.id, EXAMPLE_ENDPOINT_REQUEST, dal)
+        assert cached.body == first.body
+        assert cached.headers["ETag"] == first.headers["ETag"]
+        cached_library = await read_all_lists(EXAMPLE_ENDPOINT_REQUEST, dal)
+        assert cached_library.body == library.body
+
+        not_modified_request = MagicMock(
+            headers={"if-none-match": first.headers["ETag"]},
+            url=EXAMPLE_ENDPOINT_REQUEST.url,
+        )
+        outcome = await get_list_by_id(created.id, not_modified_request, dal)
+        assert outcome.status_code == 304
+        not_modified_request.headers = {"if-none-match": library.headers["ETag"]}
+        outcome = await read_all_lists(not_modified_request, dal)
+        assert outcome.status_code == 304
+
+        await dal.update_and_persist_list(created.id, {"name": "updated"})
+        dal.invalidate_cached_lists()
+        updated = await get_list_by_id(created.id, EXAMPLE_ENDPOINT_REQUEST, dal)
+        assert json.loads(updated.body)["name"] == "updated"
+        updated_library = await read_all_lists(EXAMPLE_ENDPOINT_REQUEST, dal)
+        assert updated_library.body != library.body
+
+    async def test_other_workers_writes_invalidate(
+        self, engine, listening_cache, monkeypatch
+    ):
+        """
+        Test a committed write reaches the cache through LISTEN/NOTIFY, and that losing the
+        LISTEN connection empties the cache
+        Args:
+            engine: creates the tables for the request's session
+            listening_cache: the enabled list cache
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(
+            db, "async_sessionmaker", async_sessionmaker(engine, expire_on_commit=False)
+        )
+        subscription = listening_cache.broker.subscribe("0")
+        listening_cache.put(
+            "library-0", b"{}", '"l0"', ["0"], listening_cache.begin_read()
+        )
+        listening_cache.put("list-x", b"{}", '"x"', ["x"], listening_cache.begin_read())
+
+        data_access_layers = get_data_access_layer()
+        dal = await data_access_layers.__anext__()
+        await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        await dal.notify_changes()
+        # as if the write came from another worker, which invalidates its own cache
+        dal._changed_list_ids.clear()
+        with pytest.raises(StopAsyncIteration):
+            await data_access_layers.__anext__()
+
+        assert await subscription.next_event(5) is not None
+        assert listening_cache.get("library-0") is None
+        assert listening_cache.get("list-x") is not None
+
+        listening_cache.broker._connection.terminate()
+        assert await subscription.next_event(5) == "event: resync\ndata: {}\n\n"
+        assert listening_cache.get("list-x") is None
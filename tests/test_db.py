@@ -1,16 +1,32 @@
-from datetime import datetime
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
 from uuid import UUID
 
 import pytest
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from gen3userdatalibrary import config
+from gen3userdatalibrary import config, db
 from gen3userdatalibrary.auth import get_lists_endpoint
-from gen3userdatalibrary.db import DataAccessLayer
+from gen3userdatalibrary.db import (
+    DataAccessLayer,
+    NormalizedItemsDataAccessLayer,
+    ReadCoalescer,
+    ReplicaRouter,
+    create_data_access_layer,
+    get_data_access_layer,
+    read_coalescer,
+)
 from gen3userdatalibrary.main import route_aggregator
 from gen3userdatalibrary.models.helpers import create_user_list_instance
-from gen3userdatalibrary.models.user_list import ItemToUpdateModel, UserList
+from gen3userdatalibrary.models.user_list import (
+    ItemToUpdateModel,
+    UserList,
+    UserListItem,
+)
 from tests.routes.conftest import BaseTestRouter
 
 
@@ -223,6 +239,555 @@ class TestConfigRouter(BaseTestRouter):
         get_outcome = await dal.get_user_list_by_list_id(replace_outcome[0].id)
         assert get_outcome is not None
 
+    async def test_get_list_metadata_and_items_page(self, alt_session):
+        """
+        Test getting a list's metadata and a filtered page of its items
+        Args:
+            alt_session: direct db access
+        """
+        dal = DataAccessLayer(alt_session)
+        l_id = UUID("550e8400-e29b-41d4-a716-446655440000")
+        assert await dal.get_list_metadata(l_id) is None
+
+        example_list = EXAMPLE_USER_LIST()
+        example_list.items = {
+            "drs://a": {"type": "GA4GH_DRS", "dataset_guid": "phs1"},
+            "drs://b": {"type": "GA4GH_DRS", "dataset_guid": "phs2"},
+            "CF_1": {"type": "Gen3GraphQL"},
+        }
+        create_outcome = await dal.persist_user_list("0", example_list)
+        metadata = await dal.get_list_metadata(create_outcome.id)
+        assert "items" not in metadata
+        assert metadata["name"] == example_list.name
+        assert metadata["created_time"] == create_outcome.created_time.isoformat()
+
+        items, total = await dal.get_list_items_page(
+            create_outcome.id, item_type="GA4GH_DRS", limit=1
+        )
+        assert items == {"drs://a": example_list.items["drs://a"]}
+        assert total == 2
+        items, total = await dal.get_list_items_page(
+            create_outcome.id, key_prefix="drs://", dataset_guid="phs2"
+        )
+        assert list(items) == ["drs://b"]
+        assert total == 1
+        items, total = await dal.get_list_items_page(create_outcome.id, offset=5)
+        assert items == {}
+        assert total == 3
+
+    async def test_delete_items_from_list(self, alt_session):
+        """
+        Test deleting items by key removes only those items and counts them
+        Args:
+            alt_session: direct db access
+        """
+        dal = DataAccessLayer(alt_session)
+        l_id = UUID("550e8400-e29b-41d4-a716-446655440000")
+        assert await dal.delete_items_from_list(l_id, ["fizz"]) is None
+
+        example_list = EXAMPLE_USER_LIST()
+        example_list.items = {"a": 1, "b": 2, "c": 3}
+        create_outcome = await dal.persist_user_list("0", example_list)
+        await alt_session.flush()
+        removed = await dal.delete_items_from_list(
+            create_outcome.id, ["a", "c", "c", "missing"]
+        )
+        assert removed == 2
+        get_outcome = await dal.get_user_list_by_list_id(create_outcome.id)
+        assert get_outcome.items == {"b": 2}
+
+    async def test_get_items_for_patch_and_patch_list(self, alt_session):
+        """
+        Test a patch loads only the requested items and writes back only the changes
+        Args:
+            alt_session: direct db access
+        """
+        dal = DataAccessLayer(alt_session)
+        l_id = UUID("550e8400-e29b-41d4-a716-446655440000")
+        assert await dal.get_items_for_patch(l_id, ["a"]) is None
+        assert await dal.patch_list(l_id, "name", ["a"], {}) is None
+
+        example_list = EXAMPLE_USER_LIST()
+        example_list.items = {"a": 1, "b": 2, "c": 3}
+        create_outcome = await dal.persist_user_list("0", example_list)
+        await alt_session.flush()
+        name, items, item_count = await dal.get_items_for_patch(
+            create_outcome.id, ["a", "missing"]
+        )
+        assert (name, items, item_count) == (example_list.name, {"a": 1}, 3)
+
+        metadata = await dal.patch_list(
+            create_outcome.id, "patched", ["a"], {"b": 20, "d": 4}
+        )
+        assert metadata["name"] == "patched"
+        assert "items" not in metadata
+        get_outcome = await dal.get_user_list_by_list_id(create_outcome.id)
+        assert get_outcome.items == {"b": 20, "c": 3, "d": 4}
+
+    async def test_list_versions(self, alt_session):
+        """
+        Test every write bumps a list's version, and that writes expecting another version
+        are refused
+        Args:
+            alt_session: direct db access
+        """
+        dal = DataAccessLayer(alt_session)
+        user_list = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        l_id = user_list.id
+        assert user_list.version == 0
+
+        async def get_version():
+            query = select(UserList.version).where(UserList.id == l_id)
+            return (await alt_session.execute(query)).scalar()
+
+        await dal.update_and_persist_list(l_id, {"name": "renamed"}, [0])
+        assert await get_version() == 1
+        await dal.add_items_to_list(l_id, {"a": 1, "b": 2}, [1])
+        assert await get_version() == 2
+        assert await dal.delete_items_from_list(l_id, ["a"], [2]) == 1
+        assert await get_version() == 3
+        await dal.get_items_for_patch(l_id, ["b"], [3])
+        await dal.patch_list(l_id, "patched", ["b"], {})
+        assert await get_version() == 4
+        await dal.update_and_persist_list(l_id, {"name": "again"})
+        assert await get_version() == 5
+
+        for stale_write in [
+            dal.update_and_persist_list(l_id, {"name": "stale"}, [4]),
+            dal.add_items_to_list(l_id, {"c": 3}, [4]),
+            dal.delete_items_from_list(l_id, ["b"], [4]),
+            dal.get_items_for_patch(l_id, [], [4]),
+        ]:
+            with pytest.raises(HTTPException) as exc_info:
+                await stale_write
+            assert exc_info.value.status_code == 412
+        assert await dal.delete_items_from_list(UUID(int=0), ["a"], [0]) is None
+        assert await get_version() == 5
+
+    @pytest.mark.parametrize("expected_versions,status_code", [(None, 409), ([0], 412)])
+    async def test_concurrent_list_update_conflicts(
+        self, alt_session, expected_versions, status_code
+    ):
+        """
+        Test a list that was changed after it was read isn't overwritten
+        Args:
+            alt_session: direct db access
+            expected_versions: versions the update expects (from If-Match)
+            status_code: the expected error
+        """
+        dal = DataAccessLayer(alt_session)
+        user_list = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        # another request changes the list after this one has read it
+        await alt_session.execute(
+            update(UserList)
+            .where(UserList.id == user_list.id)
+            .values(version=UserList.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        with pytest.raises(HTTPException) as exc_info:
+            await dal.update_and_persist_list(
+                user_list.id, {"name": "renamed"}, expected_versions
+            )
+        assert exc_info.value.status_code == status_code
+
+    async def test_list_changes(self, alt_session, monkeypatch):
+        """
+        Test finding lists changed since a point in time, and that deleted lists are
+        logged until LIST_DELETIONS_RETENTION_DAYS
+        Args:
+            alt_session: direct db access
+            monkeypatch: save attr
+        """
+        dal = DataAccessLayer(alt_session)
+        before = datetime.now(timezone.utc)
+        first = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        other_list = EXAMPLE_USER_LIST()
+        other_list.name = "other"
+        second = await dal.persist_user_list("0", other_list)
+        await dal.persist_user_list(
+            "1",
+            create_user_list_instance("1", ItemToUpdateModel(name="mine", items={})),
+        )
+        assert await dal.get_lists_changed_since("0", None) == sorted(
+            [first, second], key=lambda user_list: user_list.id
+        )
+        between = datetime.now(timezone.utc)
+        await dal.update_and_persist_list(second.id, {"name": "renamed"})
+        assert await dal.get_lists_changed_since("0", between) == [second]
+
+        await dal.delete_list(first.id)
+        await dal.delete_lists("0", [second.id])
+        assert await dal.get_lists_deleted_since("0", before) == [first.id, second.id]
+        assert await dal.get_lists_deleted_since("1", before) == []
+
+        monkeypatch.setattr(config, "LIST_DELETIONS_RETENTION_DAYS", 0)
+        await dal.delete_all_lists("1")
+        assert await dal.get_lists_deleted_since("0", before) == [first.id, second.id]
+        third = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        await dal.delete_all_lists("0")
+        # the older deletions were forgotten
+        assert await dal.get_lists_deleted_since("0", before) == [third.id]
+
+    async def test_create_combined_list(self, alt_session):
+        """
+        Test each way of combining lists, and that a single list is cloned
+        Args:
+            alt_session: direct db access
+        """
+        dal = DataAccessLayer(alt_session)
+        list_ids = []
+        for name, items in [
+            ("first", {"a": 1, "b": 2, "c": 3}),
+            ("second", {"b": 20, "c": 30, "d": 40}),
+            ("third", {"c": 300}),
+        ]:
+            example_list = EXAMPLE_USER_LIST()
+            example_list.name = name
+            example_list.items = items
+            list_ids.append((await dal.persist_user_list("0", example_list)).id)
+        await alt_session.flush()
+        assert await dal.get_list_creators([list_ids[0], UUID(int=0)]) == {
+            list_ids[0]: "0"
+        }
+
+        expected_items = [
+            ("union", [0, 1], {"a": 1, "b": 20, "c": 30, "d": 40}),
+            ("union", [0, 1, 2], {"a": 1, "b": 20, "c": 300, "d": 40}),
+            ("intersection", [0, 1], {"b": 2, "c": 3}),
+            ("intersection", [0, 1, 2], {"c": 3}),
+            ("difference", [0, 1], {"a": 1}),
+            ("difference", [0, 2], {"a": 1, "b": 2}),
+        ]
+        for i, (operation, positions, items) in enumerate(expected_items):
+            source_ids = [list_ids[position] for position in positions]
+            assert await dal.count_combined_items(source_ids, operation) == len(items)
+            metadata = await dal.create_combined_list(
+                "0", f"combined {i}", source_ids, operation
+            )
+            assert metadata["creator"] == "0"
+            assert metadata["authz"]["authz"][0].endswith(str(metadata["id"]))
+            new_list = await dal.get_user_list_by_list_id(metadata["id"])
+            assert new_list.items == items
+
+        metadata = await dal.create_combined_list("0", "clone", list_ids[1:2], "union")
+        clone = await dal.get_user_list_by_list_id(metadata["id"])
+        assert clone.items == {"b": 20, "c": 30, "d": 40}
+        assert await dal.create_combined_list("0", "clone", list_ids, "union") is None
+
+    @pytest.mark.parametrize("dual_write", [False, True])
+    async def test_normalized_items_data_access_layer(self, alt_session, dual_write):
+        """
+        Test storing items as rows gives the same lists back as the items column, and that
+        dual write keeps the items column up to date as well
+        Args:
+            alt_session: direct db access
+            dual_write: whether to write items to the items column too
+        """
+        dal = NormalizedItemsDataAccessLayer(alt_session, dual_write=dual_write)
+        example_list = EXAMPLE_USER_LIST()
+        example_list.items = {"a": {"type": "X"}, "b": {"type": "Y"}}
+        create_outcome = await dal.persist_user_list("0", example_list)
+        l_id = create_outcome.id
+        assert create_outcome.items == {"a": {"type": "X"}, "b": {"type": "Y"}}
+
+        async def get_rows():
+            query = select(UserListItem.item_key, UserListItem.value).where(
+                UserListItem.list_id == l_id
+            )
+            return dict((await alt_session.execute(query)).all())
+
+        async def get_items_column():
+            query = select(UserList.items).where(UserList.id == l_id)
+            return (await alt_session.execute(query)).scalar()
+
+        assert await get_rows() == {"a": {"type": "X"}, "b": {"type": "Y"}}
+        expected_items_column = create_outcome.items if dual_write else {}
+        assert await get_items_column() == expected_items_column
+
+        assert (await dal.get_all_lists("0"))[0].items == create_outcome.items
+        changed_lists = await dal.get_lists_changed_since("0", None)
+        assert changed_lists[0].items == create_outcome.items
+        assert await dal.get_lists_containing_item("0", "a") == [
+            (l_id, example_list.name)
+        ]
+        assert await dal.get_list_item_count(l_id) == 2
+        assert await dal.get_list_and_item_count("0") == (1, 2)
+        by_name = await dal.get_list_by_name_and_creator(("0", example_list.name))
+        assert by_name.items == create_outcome.items
+        assert len(await dal.get_user_lists_by_creator_id("0")) == 1
+        assert len(await dal.grab_all_lists_that_exist("id", [l_id])) == 1
+
+        updated_list = await dal.update_and_persist_list(
+            l_id, {"items": {"a": {"type": "Z"}, "c": {"type": "X"}}}
+        )
+        assert updated_list.items == {"a": {"type": "Z"}, "c": {"type": "X"}}
+        assert await get_rows() == {"a": {"type": "Z"}, "c": {"type": "X"}}
+        renamed_list = await dal.update_and_persist_list(l_id, {"name": "renamed"})
+        assert renamed_list.name == "renamed"
+
+        appended_list, metrics_info = await dal.add_items_to_list(
+            l_id, {"c": {"type": "Y"}, "d": {"type": "X"}}
+        )
+        assert set(appended_list.items) == {"a", "c", "d"}
+        assert (await dal.get_user_list_by_list_id(l_id)).items["c"] == {"type": "Y"}
+        if not dual_write:
+            assert metrics_info.items_added == 1
+            assert metrics_info.items_updated == 1
+
+        # the test sessions don't autoflush before these queries like the app's do
+        await alt_session.flush()
+        items, total = await dal.get_list_items_page(l_id, item_type="X")
+        assert items == {"d": {"type": "X"}}
+        assert total == 1
+        items, total, has_more = await dal.get_list_items_after_key(l_id, "a", 1)
+        assert items == {"c": {"type": "Y"}}
+        assert (total, has_more) == (3, True)
+
+        assert await dal.delete_items_from_list(l_id, ["a", "missing"]) == 1
+        assert await get_rows() == {"c": {"type": "Y"}, "d": {"type": "X"}}
+
+        await alt_session.flush()
+        _, items, item_count = await dal.get_items_for_patch(l_id, ["c"])
+        assert (items, item_count) == ({"c": {"type": "Y"}}, 2)
+        await dal.patch_list(l_id, "patched", ["d"], {"e": {"type": "X"}})
+        assert await get_rows() == {"c": {"type": "Y"}, "e": {"type": "X"}}
+        expected_items_column = await get_rows() if dual_write else {}
+        assert await get_items_column() == expected_items_column
+        assert await dal.delete_items_from_list(UUID(int=0), ["a"]) is None
+
+        other_list = EXAMPLE_USER_LIST()
+        other_list.name = "other"
+        other_id = (await dal.persist_user_list("0", other_list)).id
+        await alt_session.flush()
+        assert await dal.delete_lists("1", [l_id, other_id]) == ([], 0)
+        assert await dal.delete_lists("0", [other_id]) == ([other_id], 1)
+        assert await dal.get_existing_list_ids([l_id, other_id]) == [l_id]
+
+        clone_metadata = await dal.create_combined_list("0", "clone", [l_id], "union")
+        await alt_session.flush()
+        clone = await dal.get_user_list_by_list_id(clone_metadata["id"])
+        assert clone.items == await get_rows()
+        assert await dal.count_combined_items([l_id, clone.id], "difference") == 0
+        await dal.delete_list(clone.id)
+
+        await dal.delete_list(l_id)
+        assert await get_rows() == {}
+        second_list = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        await dal.delete_all_lists("0")
+        assert await dal.get_list_item_count(second_list.id) is None
+        assert (
+            await alt_session.execute(select(func.count()).select_from(UserListItem))
+        ).scalar() == 0
+
+    async def test_create_data_access_layer(self, alt_session, monkeypatch):
+        """
+        Test the data access layer matches the configured item storage
+        Args:
+            alt_session: direct db access
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(config, "ITEM_STORAGE", "jsonb")
+        assert type(create_data_access_layer(alt_session)) is DataAccessLayer
+        monkeypatch.setattr(config, "ITEM_STORAGE", "dual")
+        dal = create_data_access_layer(alt_session)
+        assert isinstance(dal, NormalizedItemsDataAccessLayer)
+        assert dal.dual_write
+        monkeypatch.setattr(config, "ITEM_STORAGE", "normalized")
+        assert not create_data_access_layer(alt_session).dual_write
+
+    async def test_replica_router_round_robin(self):
+        """
+        Test replicas are picked round-robin, skipping unhealthy ones until they can be retried
+        """
+        router = ReplicaRouter(
+            [str(config.DB_CONNECTION_STRING)] * 3,
+            retry_seconds=60,
+        )
+        picked = [router.next_healthy_replica() for _ in range(4)]
+        assert picked == [0, 1, 2, 0]
+        router.mark_unhealthy(1)
+        picked = [router.next_healthy_replica() for _ in range(3)]
+        assert picked == [2, 0, 2]
+        router.mark_unhealthy(0)
+        router.mark_unhealthy(2)
+        assert router.next_healthy_replica() is None
+        router.retry_seconds = 0
+        router.mark_unhealthy(0)
+        assert router.next_healthy_replica() is not None
+        await router.dispose()
+
+    async def test_replica_router_read_your_writes(self, monkeypatch):
+        """
+        Test written keys are sticky only for the read-your-writes period
+        """
+        router = ReplicaRouter(
+            [str(config.DB_CONNECTION_STRING)], read_your_writes_seconds=5
+        )
+        router.mark_write("1")
+        assert router.has_recent_write("1", "2")
+        assert not router.has_recent_write("2")
+        router.mark_notified_write("3", ["list-a"])
+        router.mark_notified_write(None, None)
+        assert router.has_recent_write("3") and router.has_recent_write("list-a")
+        router.read_your_writes_seconds = 0
+        router.mark_write("1")
+        assert not router.has_recent_write("1")
+        await router.dispose()
+
+    async def test_read_coalescer(self):
+        """
+        Test concurrent reads with the same key share one load, that a failed load makes the
+        others load for themselves, and that forgotten flights can't be joined
+        """
+        coalescer = ReadCoalescer()
+        coalescer.metrics = MagicMock()
+        loads = []
+
+        async def load(value):
+            loads.append(value)
+            await asyncio.sleep(0.01)
+            if value == "fail":
+                raise ValueError(value)
+            return {"value": value}
+
+        outcomes = await asyncio.gather(
+            *(
+                coalescer.run(("q", "1"), ["1"], lambda: load("a"), dict)
+                for _ in range(3)
+            ),
+            coalescer.run(("q", "2"), ["2"], lambda: load("b"), dict),
+        )
+        assert loads == ["a", "b"]
+        assert [coalesced for _, coalesced in outcomes] == [False, True, True, False]
+        assert outcomes[1][0] == {"value": "a"} and outcomes[1][0] is not outcomes[0][0]
+        assert coalescer.coalesced == 2
+        coalescer.metrics.add_coalesced_read.assert_called_with(query="q")
+
+        loads.clear()
+        leader = asyncio.ensure_future(
+            coalescer.run(("q", "1"), ["1"], lambda: load("fail"), dict)
+        )
+        await asyncio.sleep(0)
+        follower = coalescer.run(("q", "1"), ["1"], lambda: load("c"), dict)
+        with pytest.raises(ValueError):
+            await leader
+        assert await follower == ({"value": "c"}, False)
+
+        loads.clear()
+        first = asyncio.ensure_future(
+            coalescer.run(("q", "1"), ["0", "1"], lambda: load("d"), dict)
+        )
+        await asyncio.sleep(0)
+        coalescer.forget("0", [])
+        second = coalescer.run(("q", "1"), ["0", "1"], lambda: load("e"), dict)
+        coalescer.forget(None, None)
+        assert [await first, await second] == [
+            ({"value": "d"}, False),
+            ({"value": "e"}, False),
+        ]
+        assert loads == ["d", "e"]
+
+    async def test_dal_reads_are_coalesced(self, engine, monkeypatch):
+        """
+        Test concurrent identical list reads by different requests share one query, and each
+        gets its own clean copy of the lists in its own session that it can write back
+        Args:
+            engine: creates the tables for the requests' sessions
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(
+            db, "async_sessionmaker", async_sessionmaker(engine, expire_on_commit=False)
+        )
+        writer_dals = get_data_access_layer()
+        writer = await writer_dals.__anext__()
+        created = await writer.persist_user_list("0", EXAMPLE_USER_LIST())
+        with pytest.raises(StopAsyncIteration):
+            await writer_dals.__anext__()
+
+        requests = [get_data_access_layer() for _ in range(3)]
+        dals = [await request.__anext__() for request in requests]
+        coalesced_before = read_coalescer.coalesced
+        libraries = await asyncio.gather(*(dal.get_all_lists("0") for dal in dals))
+        assert read_coalescer.coalesced - coalesced_before == 2
+        assert [[user_list.id for user_list in lists] for lists in libraries] == [
+            [created.id]
+        ] * 3
+        user_lists = await asyncio.gather(
+            *(dal.get_user_list_by_list_id(created.id) for dal in dals),
+            *(dal.get_user_list_by_list_id(uuid.uuid4()) for dal in dals),
+        )
+        assert read_coalescer.coalesced - coalesced_before == 6
+        assert user_lists[3:] == [None] * 3
+        for dal, library, user_list in zip(dals, libraries, user_lists):
+            assert library[0] is user_list
+            assert user_list in dal.db_session
+            assert not dal.db_session.dirty
+            assert user_list.items == {"fizz": "buzz"}
+
+        user_lists[1].name = "renamed"
+        user_lists[1].items["fizz"] = "bang"
+        assert user_lists[0].items == {"fizz": "buzz"}
+        await dals[1].db_session.flush()
+        assert user_lists[1].version == 1
+        for request in requests:
+            with pytest.raises(StopAsyncIteration):
+                await request.__anext__()
+
+        monkeypatch.setattr(config, "COALESCE_READS", False)
+        requests = [get_data_access_layer() for _ in range(2)]
+        dals = [await request.__anext__() for request in requests]
+        coalesced_before = read_coalescer.coalesced
+        results = await asyncio.gather(*(dal.get_all_lists("0") for dal in dals))
+        assert read_coalescer.coalesced == coalesced_before
+        assert results[0][0].name == "renamed"
+        for request in requests:
+            with pytest.raises(StopAsyncIteration):
+                await request.__anext__()
+
+    async def test_reads_use_replica_until_write(self, alt_session):
+        """
+        Test read-only queries go to the replica, which can't see this session's uncommitted
+        list, and that reads go back to the primary once the user writes
+        Args:
+            alt_session: direct db access
+        """
+        router = ReplicaRouter([str(config.DB_CONNECTION_STRING)])
+        writer = DataAccessLayer(alt_session)
+        created = await writer.persist_user_list("0", EXAMPLE_USER_LIST())
+
+        dal = DataAccessLayer(alt_session, router)
+        assert await dal.get_all_lists("0") == []
+        assert await dal.get_user_list_by_list_id(created.id) is None
+        assert await dal.get_list_count_for_creator("0") == 0
+        assert dal.replica_session is not None
+
+        await dal.add_items_to_list(created.id, {"foo": "bar"})
+        assert len(await dal.get_all_lists("0")) == 1
+        other_request_dal = DataAccessLayer(alt_session, router)
+        assert await other_request_dal.get_user_list_by_list_id(created.id) is not None
+
+        await dal.close_replica_session()
+        assert dal.replica_session is None
+        await router.dispose()
+
+    async def test_failing_replica_falls_back_to_primary(self, alt_session):
+        """
+        Test a replica that can't be reached is marked unhealthy and the primary is used
+        Args:
+            alt_session: direct db access
+        """
+        unreachable = str(config.DB_CONNECTION_STRING).replace(":5432/", ":1/")
+        router = ReplicaRouter([unreachable])
+        writer = DataAccessLayer(alt_session)
+        await writer.persist_user_list("0", EXAMPLE_USER_LIST())
+
+        dal = DataAccessLayer(alt_session, router)
+        assert len(await dal.get_all_lists("0")) == 1
+        assert dal.replica_session is None
+        assert router.next_healthy_replica() is None
+        assert len(await dal.get_all_lists("0")) == 1
+        await router.dispose()
+
 
 EXAMPLE_USER_LIST = lambda: create_user_list_instance(
     "0",
@@ -0,0 +1,132 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from gen3userdatalibrary import config, db
+from gen3userdatalibrary.db import DataAccessLayer, get_data_access_layer
+from gen3userdatalibrary.events import (
+    ListEventBroker,
+    ListEventSubscription,
+    get_listen_dsn,
+    make_notify_payload,
+)
+from gen3userdatalibrary.main import route_aggregator
+from tests.routes.conftest import BaseTestRouter
+from tests.test_db import EXAMPLE_USER_LIST
+
+
+@pytest.mark.asyncio
+class TestListEvents(BaseTestRouter):
+    router = route_aggregator
+
+    async def test_subscription_backpressure(self):
+        """
+        Test a subscriber that falls behind gets a single resync event instead of its backlog
+        """
+        subscription = ListEventSubscription("0", max_queued=2)
+        assert await subscription.next_event(0) is None
+        subscription.put(["a"])
+        assert await subscription.next_event(1) == (
+            'event: lists_changed\ndata: {"ids": ["a"]}\n\n'
+        )
+        for list_id in ["a", "b", "c", "d"]:
+            subscription.put([list_id])
+        assert await subscription.next_event(1) == "event: resync\ndata: {}\n\n"
+        assert await subscription.next_event(0) is None
+        subscription.put(None)
+        subscription.put(["e"])
+        assert await subscription.next_event(1) == "event: resync\ndata: {}\n\n"
+        assert "lists_changed" in await subscription.next_event(1)
+
+    async def test_broker_fans_out_by_creator(self):
+        """
+        Test notifications only reach the subscribers of the list's creator, and that
+        malformed or oversized notifications are handled
+        """
+        broker = ListEventBroker(get_listen_dsn())
+        first, second = broker.subscribe("0"), broker.subscribe("0")
+        other = broker.subscribe("1")
+        broker._on_notification(None, 1, "c", make_notify_payload("0", ["b", "a"]))
+        broker._on_notification(None, 1, "c", "not json")
+        broker._on_notification(None, 1, "c", json.dumps({"ids": []}))
+        expected = 'event: lists_changed\ndata: {"ids": ["a", "b"]}\n\n'
+        assert await first.next_event(1) == expected
+        assert await second.next_event(1) == expected
+        assert await other.next_event(0) is None
+
+        assert json.loads(make_notify_payload("1", [str(i) for i in range(2000)])) == {
+            "creator": "1",
+            "ids": None,
+        }
+        broker._on_notification(None, 1, "c", make_notify_payload("1", range(2000)))
+        assert await other.next_event(1) == "event: resync\ndata: {}\n\n"
+
+        for subscription in [first, second, other, other]:
+            broker.unsubscribe(subscription)
+        assert broker._subscriptions == {}
+        broker.publish("0", ["a"])
+        await broker.stop()
+
+    async def test_list_events_are_sent_on_commit(self, engine, monkeypatch):
+        """
+        Test a write is pushed to the creator's subscribers over LISTEN/NOTIFY once the
+        request's transaction commits, and not before
+        Args:
+            engine: creates the tables for the request's session
+            monkeypatch: save attr
+        """
+        monkeypatch.setattr(
+            db, "async_sessionmaker", async_sessionmaker(engine, expire_on_commit=False)
+        )
+        monkeypatch.setattr(config, "ENABLE_LIST_EVENTS", True)
+        broker = ListEventBroker(get_listen_dsn())
+        await broker.start()
+        subscription = broker.subscribe("0")
+        try:
+            data_access_layers = get_data_access_layer()
+            dal = await data_access_layers.__anext__()
+            created = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+            assert await subscription.next_event(0.2) is None
+            with pytest.raises(StopAsyncIteration):
+                await data_access_layers.__anext__()
+            event = await subscription.next_event(5)
+            assert json.loads(event.split("data: ")[1]) == {"ids": [str(created.id)]}
+        finally:
+            await broker.stop()
+
+    async def test_notify_changes_only_when_enabled(self, alt_session, monkeypatch):
+        """
+        Test writes are recorded, but only NOTIFY when list events (or the cache) are enabled
+        Args:
+            alt_session: direct db access
+            monkeypatch: save attr
+        """
+        dal = DataAccessLayer(alt_session)
+        created = await dal.persist_user_list("0", EXAMPLE_USER_LIST())
+        assert dal._changed_list_ids == {"0": {created.id}}
+        dal.db_session = MagicMock(execute=AsyncMock())
+        await dal.notify_changes()
+        dal.db_session.execute.assert_not_called()
+
+        monkeypatch.setattr(config, "ENABLE_LIST_EVENTS", True)
+        await dal.notify_changes()
+        dal.db_session.execute.assert_called_once()
+
+    async def test_broker_reconnects(self):
+        """
+        Test losing the LISTEN connection reopens it and makes subscribers resync
+        """
+        broker = ListEventBroker(get_listen_dsn(), reconnect_seconds=0.01)
+        await broker.start()
+        subscription = broker.subscribe("0")
+        lost_connection = broker._connection
+        try:
+            lost_connection.terminate()
+            assert await subscription.next_event(5) == "event: resync\ndata: {}\n\n"
+            assert broker._connection is not None
+            assert broker._connection is not lost_connection
+        finally:
+            await broker.stop()
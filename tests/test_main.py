@@ -66,6 +66,23 @@ class TestConfigRouter(BaseTestRouter):
             assert True
         monkeypatch.setattr(config, "DEBUG_SKIP_AUTH", previous_config)
 
+    async def test_lifespan_with_list_events(self, mocker, monkeypatch):
+        """
+        Test the list events LISTEN connection is opened on startup and closed on teardown
+        Args:
+            mocker: mock objects
+            monkeypatch: save attrs
+        """
+        monkeypatch.setattr(config, "DEBUG_SKIP_AUTH", True)
+        monkeypatch.setattr(config, "ENABLE_LIST_EVENTS", True)
+        mocker.patch("gen3userdatalibrary.db.DataAccessLayer.test_connection")
+        app = FastAPI(lifespan=lifespan)
+        async with lifespan(app) as _:
+            broker = app.state.list_events
+            assert broker._connection is not None
+        assert app.state.list_events is None
+        assert broker._connection is None
+
     async def test_get_app_with_prometheus(self, mocker, monkeypatch):
         """
         Test app mounts prometheus as expected
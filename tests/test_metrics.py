@@ -26,3 +26,10 @@ def test_add_user_list_api_interaction():
     metrics = Metrics("/var/tmp/prometheus_metrics", True)
     metrics.add_user_list_api_interaction(name="CREATE")
     metrics.add_user_list_api_interaction(name="DELETE")
+
+
+def test_add_list_cache_event():
+    metrics = Metrics("/var/tmp/prometheus_metrics", True)
+    metrics.add_list_cache_event(event="hit")
+    metrics.add_list_cache_event(event="miss")
+    Metrics("/var/tmp/prometheus_metrics", False).add_list_cache_event(event="hit")
@@ -1,4 +1,8 @@
-from gen3userdatalibrary.models.user_list import is_dict, is_nonempty
+from gen3userdatalibrary.models.user_list import (
+    get_hash_partition_ddl,
+    is_dict,
+    is_nonempty,
+)
 
 
 def test_is_dict():
@@ -7,3 +11,14 @@ def test_is_dict():
 
 def test_is_nonempty():
     outcome = is_nonempty("aaa")
+
+
+def test_get_hash_partition_ddl():
+    outcome = get_hash_partition_ddl("user_lists", 2)
+    assert outcome == [
+        "CREATE TABLE IF NOT EXISTS user_lists_p0 PARTITION OF user_lists "
+        "FOR VALUES WITH (MODULUS 2, REMAINDER 0)",
+        "CREATE TABLE IF NOT EXISTS user_lists_p1 PARTITION OF user_lists "
+        "FOR VALUES WITH (MODULUS 2, REMAINDER 1)",
+    ]
+    assert get_hash_partition_ddl("user_lists", 0) == []
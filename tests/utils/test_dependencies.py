@@ -431,8 +431,8 @@ class TestConfigRouter(BaseTestRouter):
         )
         l_id = get_id_from_response(response)
         mocker.patch(
-            "gen3userdatalibrary.routes.injection_dependencies.DataAccessLayer.get_existing_list_or_throw",
-            side_effect=ValueError("mock exception"),
+            "gen3userdatalibrary.routes.injection_dependencies.DataAccessLayer.get_list_item_count",
+            return_value=None,
         )
         response = await client.patch(
             f"/lists/{l_id}",
@@ -3,7 +3,12 @@ import re
 import pytest
 
 from gen3userdatalibrary.main import route_aggregator
-from gen3userdatalibrary.utils.core import reg_match_key
+from gen3userdatalibrary.utils.core import (
+    apply_json_patch,
+    etag_matches,
+    make_etag,
+    reg_match_key,
+)
 from tests.routes.conftest import BaseTestRouter
 
 
@@ -45,6 +50,67 @@ class TestConfigRouter(BaseTestRouter):
         result_invalid = reg_match_key(matcher, invalid_dict)
         assert result_invalid == (None, {})
 
+    async def test_apply_json_patch(self):
+        """
+        Test each JSON Patch operation, and that a failing patch leaves the document alone
+        """
+        document = {"name": "a", "items": {"drs://x": {"tags": ["t1"]}}}
+        patched = apply_json_patch(
+            document,
+            [
+                {"op": "test", "path": "/name", "value": "a"},
+                {"op": "replace", "path": "/name", "value": "b"},
+                {"op": "add", "path": "/items/drs:~1~1x/tags/-", "value": "t2"},
+                {"op": "add", "path": "/items/drs:~1~1x/tags/0", "value": "t0"},
+                {"op": "copy", "from": "/items/drs:~1~1x", "path": "/items/y"},
+                {"op": "remove", "path": "/items/y/tags/1"},
+                {"op": "move", "from": "/items/y", "path": "/items/z"},
+            ],
+        )
+        assert patched == {
+            "name": "b",
+            "items": {
+                "drs://x": {"tags": ["t0", "t1", "t2"]},
+                "z": {"tags": ["t0", "t2"]},
+            },
+        }
+        assert document == {"name": "a", "items": {"drs://x": {"tags": ["t1"]}}}
+        assert apply_json_patch(document, [{"op": "add", "path": "", "value": 1}]) == 1
+
+        failing_patches = [
+            [{"op": "test", "path": "/name", "value": "b"}],
+            [{"op": "remove", "path": "/items/missing"}],
+            [{"op": "replace", "path": "/items/drs:~1~1x/tags/1", "value": "t"}],
+            [{"op": "add", "path": "/items/drs:~1~1x/tags/01", "value": "t"}],
+            [{"op": "add", "path": "/name/x", "value": "t"}],
+            [{"op": "move", "from": "/items", "path": "/items/a"}],
+            [{"op": "remove", "path": ""}],
+            [{"op": "add", "path": "/name"}],
+            [{"op": "copy", "path": "/name"}],
+            [{"op": "add", "path": "name", "value": "b"}],
+            [{"op": "unknown", "path": "/name"}],
+        ]
+        for failing_patch in failing_patches:
+            with pytest.raises(ValueError):
+                apply_json_patch(document, failing_patch)
+
+    async def test_etag_matches(self):
+        """
+        Test If-None-Match headers are compared against ETags as RFC 9110 specifies
+        """
+        etag = make_etag("id", "2024-01-01T00:00:00+00:00", 1)
+        assert etag == make_etag("id", "2024-01-01T00:00:00+00:00", 1)
+        assert etag != make_etag("id", "2024-01-01T00:00:00+00:00", 2)
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag_matches(etag, etag)
+        assert etag_matches(f"W/{etag}", etag)
+        assert etag_matches(f'"a", {etag} ,"b"', etag)
+        assert etag_matches(" * ", etag)
+        assert not etag_matches('"a", "b"', etag)
+        assert not etag_matches(etag.strip('"'), etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches("", etag)
+
 
 UUID4_REGEX_PATTERN = (
     "([0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12})"